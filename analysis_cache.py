@@ -0,0 +1,171 @@
+"""
+Persistent loudness analysis cache.
+
+Results are kept in a local SQLite index keyed by path and analysis kind
+and validated by size + mtime, so re-scanning an unchanged library is one
+stat() per file and a batched SELECT. Files that moved or were renamed are
+found again through a partial content hash (head + tail + size). Measured
+values can optionally be written out as ReplayGain tags via mutagen.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_DB = Path.home() / ".mp3gain" / "analysis.db"
+HASH_CHUNK = 64 * 1024
+_BATCH = 500
+
+
+def partial_hash(path, size=None):
+    """blake2b of the first and last 64 KB plus the size; cheap on huge files"""
+    size = os.path.getsize(path) if size is None else size
+    h = hashlib.blake2b(digest_size=16)
+    h.update(size.to_bytes(8, 'little'))
+    with open(path, 'rb') as f:
+        h.update(f.read(HASH_CHUNK))
+        if size > 2 * HASH_CHUNK:
+            f.seek(-HASH_CHUNK, os.SEEK_END)
+            h.update(f.read(HASH_CHUNK))
+    return h.hexdigest()
+
+
+def _encode(result):
+    data = {k: v for k, v in result.items() if k != 'block_powers'}
+    blocks = result.get('block_powers')
+    return json.dumps(data), (blocks.tobytes() if blocks is not None else None)
+
+
+def _decode(text, blocks):
+    result = json.loads(text)
+    if blocks is not None:
+        import numpy as np
+        result['block_powers'] = np.frombuffer(blocks, dtype=np.float32)
+    return result
+
+
+class AnalysisCache:
+    """SQLite-backed store of analysis results, safe to share between threads"""
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS analysis (
+                path TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                result TEXT NOT NULL,
+                blocks BLOB,
+                updated REAL NOT NULL,
+                PRIMARY KEY (path, kind)
+            );
+            CREATE INDEX IF NOT EXISTS analysis_hash ON analysis (hash, kind);
+        """)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def lookup_many(self, paths, kind):
+        """Return {path: result} for every path whose cached entry is still valid.
+
+        Unchanged files cost a stat(); only files with no matching
+        path/size/mtime row are hashed to look for a moved copy.
+        """
+        stats = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (st.st_size, st.st_mtime_ns)
+
+        hits = {}
+        rows = {}
+        keys = list(stats)
+        with self._lock:
+            for i in range(0, len(keys), _BATCH):
+                chunk = keys[i:i + _BATCH]
+                marks = ",".join("?" * len(chunk))
+                for row in self._conn.execute(
+                        f"SELECT path, size, mtime_ns, result, blocks FROM analysis "
+                        f"WHERE kind = ? AND path IN ({marks})", [kind, *chunk]):
+                    rows[row[0]] = row[1:]
+
+        misses = []
+        for path, (size, mtime_ns) in stats.items():
+            row = rows.get(path)
+            if row and row[0] == size and row[1] == mtime_ns:
+                hits[path] = _decode(row[2], row[3])
+            else:
+                misses.append(path)
+
+        for path in misses:
+            size, mtime_ns = stats[path]
+            try:
+                digest = partial_hash(path, size)
+            except OSError:
+                continue
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT result, blocks FROM analysis WHERE kind = ? AND hash = ? LIMIT 1",
+                    (kind, digest)).fetchone()
+                if row is None:
+                    continue
+                # Same content under a new name or after a touch: re-key it
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, kind, size, mtime_ns, digest, row[0], row[1], time.time()))
+                self._conn.commit()
+            hits[path] = _decode(row[0], row[1])
+        return hits
+
+    def store_many(self, items, kind):
+        """Save [(path, result), ...] in one transaction"""
+        records = []
+        for path, result in items:
+            try:
+                st = os.stat(path)
+                digest = partial_hash(path, st.st_size)
+            except OSError:
+                continue
+            text, blocks = _encode(result)
+            records.append((path, kind, st.st_size, st.st_mtime_ns, digest, text, blocks, time.time()))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?, ?, ?, ?)", records)
+            self._conn.commit()
+        return len(records)
+
+    def store(self, path, result, kind):
+        return self.store_many([(path, result)], kind)
+
+    def invalidate(self, path):
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+
+def write_replaygain_tags(path, result, album=None):
+    """Write ReplayGain 2.0 track (and album) gain/peak tags via tag_service.
+
+    ID3 files get TXXX frames, Vorbis-comment formats (FLAC, Ogg) get
+    REPLAYGAIN_* comments, APE files get APEv2 items. Returns False for
+    formats without a supported tag container.
+    """
+    from tag_service import replaygain_values, write_tags
+
+    return write_tags(path, replaygain_values(result, album))
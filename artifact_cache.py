@@ -0,0 +1,256 @@
+"""
+Content-addressed on-disk cache for audio analysis artifacts.
+
+Artifacts (decoded PCM, spectrograms, pitch tracks, HPSS stems, MIDI) are
+keyed by the source file's content hash plus the parameters that produced
+them, so the same song opened under another name or from another tool is
+a cache hit and any parameter change is a miss. The store is shared by
+music_studio_gui.py, mp3tonote.py (via transcription_service) and
+sightsing.py, and is trimmed least-recently-used first to a size budget.
+
+    cache = get_cache()
+    y, sr = load_audio(path, sr=22050)                      # cached librosa.load
+    stems = cache.arrays(path, "hpss", compute, sr=22050)   # any ndarray dict
+    midi = cache.file(path, "basic_pitch", ".mid", produce)  # any output file
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_ROOT = Path.home() / ".cache" / "101python" / "artifacts"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+_HASH_BLOCK = 1024 * 1024
+
+
+class ArtifactCache:
+    """Size-bounded LRU store; entries are files under root/<k[:2]>/<key><suffix>"""
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._db = sqlite3.connect(str(self.root / "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                file TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+        self._db.commit()
+
+    # ----- keys -----
+
+    def content_hash(self, path):
+        """Full-content blake2b, memoised per (path, size, mtime) for this process"""
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            h = hashlib.blake2b(digest_size=20)
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(_HASH_BLOCK), b""):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self._hashes[memo_key] = digest
+        return digest
+
+    def key(self, path, kind, **params):
+        spec = json.dumps(params, sort_keys=True, default=str)
+        h = hashlib.blake2b(digest_size=20)
+        h.update(self.content_hash(path).encode())
+        h.update(kind.encode())
+        h.update(spec.encode())
+        return f"{kind}-{h.hexdigest()}"
+
+    def _path_for(self, key, suffix):
+        digest = key.rsplit("-", 1)[-1]
+        folder = self.root / digest[:2]
+        folder.mkdir(exist_ok=True)
+        return folder / f"{key}{suffix}"
+
+    # ----- raw entries -----
+
+    def lookup(self, key):
+        """Path of a stored entry (and mark it used), or None"""
+        with self._lock:
+            row = self._db.execute("SELECT file FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(row[0]):
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return Path(row[0])
+
+    def store(self, key, src, suffix, move=False):
+        """Copy (or move) a finished file into the cache and evict if over budget"""
+        dest = self._path_for(key, suffix)
+        tmp = dest.with_name(dest.name + ".tmp")
+        (shutil.move if move else shutil.copyfile)(str(src), str(tmp))
+        os.replace(tmp, dest)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                             (key, str(dest), dest.stat().st_size, time.time()))
+            self._db.commit()
+        self.evict()
+        return dest
+
+    def evict(self, max_bytes=None):
+        """Drop least-recently-used entries until the store fits the budget"""
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= budget:
+                return 0
+            removed = 0
+            for key, file, size in self._db.execute(
+                    "SELECT key, file, size FROM entries ORDER BY last_access").fetchall():
+                if total <= budget:
+                    break
+                try:
+                    os.remove(file)
+                except OSError:
+                    pass
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+            self._db.commit()
+        return removed
+
+    def total_bytes(self):
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    # ----- typed helpers -----
+
+    def arrays(self, path, kind, compute, **params):
+        """Cached dict of NumPy arrays; compute() must return such a dict"""
+        import numpy as np
+
+        key = self.key(path, kind, **params)
+        hit = self.lookup(key)
+        if hit is not None:
+            with np.load(hit, allow_pickle=False) as data:
+                return {name: data[name] for name in data.files}
+        result = compute()
+        fd, tmp = tempfile.mkstemp(suffix=".npz", dir=self.root)
+        os.close(fd)
+        np.savez(tmp, **result)
+        self.store(key, tmp, ".npz", move=True)
+        return result
+
+    def file(self, path, kind, suffix, produce, **params):
+        """Cached output file; produce(dest_path) must write it. Returns the cached path"""
+        key = self.key(path, kind, **params)
+        hit = self.lookup(key)
+        if hit is not None:
+            return hit
+        fd, tmp = tempfile.mkstemp(suffix=suffix, dir=self.root)
+        os.close(fd)
+        try:
+            produce(tmp)
+            return self.store(key, tmp, suffix, move=True)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache; ARTIFACT_CACHE_DIR / ARTIFACT_CACHE_MB override the defaults"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            root = os.environ.get("ARTIFACT_CACHE_DIR", DEFAULT_ROOT)
+            max_mb = os.environ.get("ARTIFACT_CACHE_MB")
+            _cache = ArtifactCache(root, int(max_mb) * 1024 ** 2 if max_mb else DEFAULT_MAX_BYTES)
+        return _cache
+
+
+def load_audio(path, sr=22050, mono=True, offset=0.0, duration=None):
+    """librosa.load through the cache; returns (y, sr) like librosa"""
+    import librosa
+    import numpy as np
+
+    def compute():
+        y, rate = librosa.load(path, sr=sr, mono=mono, offset=offset, duration=duration)
+        return {'y': y, 'sr': np.array(rate)}
+
+    data = get_cache().arrays(path, "pcm", compute, sr=sr, mono=mono,
+                              offset=offset, duration=duration)
+    return data['y'], int(data['sr'])
+
+
+def hpss(path, sr=22050):
+    """Cached harmonic/percussive split of a file; returns (y_harmonic, y_percussive, sr)
+
+    Holds the whole track in memory; segment_processing.hpss_file streams
+    long files to disk instead.
+    """
+    import librosa
+
+    y, rate = load_audio(path, sr=sr)
+
+    def compute():
+        harmonic, percussive = librosa.effects.hpss(y)
+        return {'harmonic': harmonic, 'percussive': percussive}
+
+    stems = get_cache().arrays(path, "hpss", compute, sr=sr)
+    return stems['harmonic'], stems['percussive'], rate
+
+
+def pitch_track(path, sr=None, fmin_note='C2', fmax_note='C7'):
+    """Cached librosa.yin f0 track; returns (f0, sr)
+
+    Long files are tracked segment-parallel without loading them whole.
+    """
+    import librosa
+    import numpy as np
+    from audio_stream import probe
+    from segment_processing import is_long, yin_file
+
+    fmin = librosa.note_to_hz(fmin_note)
+    fmax = librosa.note_to_hz(fmax_note)
+
+    def compute():
+        if is_long(path):
+            rate = sr or probe(path)['sample_rate']
+            f0 = yin_file(path, sr=rate, fmin=fmin, fmax=fmax)
+        else:
+            y, rate = load_audio(path, sr=sr)
+            f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=rate)
+        return {'f0': f0, 'sr': np.array(rate)}
+
+    data = get_cache().arrays(path, "yin", compute, sr=sr, fmin=fmin_note, fmax=fmax_note)
+    # Entries written before long-file support carry no 'sr'
+    rate = int(data['sr']) if 'sr' in data else (sr or probe(path)['sample_rate'])
+    return data['f0'], rate
+
+
+def mel_spectrogram(path, sr=22050, n_mels=128, hop_length=512):
+    """Cached power mel spectrogram; returns (S, sr)"""
+    import librosa
+
+    y, rate = load_audio(path, sr=sr)
+
+    def compute():
+        return {'S': librosa.feature.melspectrogram(y=y, sr=rate, n_mels=n_mels,
+                                                    hop_length=hop_length)}
+
+    data = get_cache().arrays(path, "mel", compute, sr=sr, n_mels=n_mels, hop_length=hop_length)
+    return data['S'], rate
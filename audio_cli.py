@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Headless batch front end for the audio tools.
+
+    python audio_cli.py analyze    music/ -r --album --json
+    python audio_cli.py normalize  music/ -r --target -16 --journal norm.jsonl
+    python audio_cli.py transcribe songs/*.mp3 -o midi/ -j 2
+    python audio_cli.py separate   long_mix.flac -o stems/
+    python audio_cli.py sheet      midi/*.mid song.mp3 -o scores/
+
+Every subcommand runs on the engines the GUIs use (loudness_engine /
+loudness_r128, mp3_gain_edit, flac_engine, transcription_service,
+segment_processing, note_extraction) without importing Tk or Kivy.
+
+--journal FILE appends one JSON line per finished file; files already
+recorded there as done (same size and mtime) are skipped, so an
+interrupted run picks up where it stopped. --json prints the same records
+to stdout instead of human-readable lines.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from functools import partial
+
+from loudness_engine import BatchJob, analyze_file, default_workers
+
+AUDIO_EXTENSIONS = (".mp3", ".flac", ".wav", ".ogg", ".m4a")
+MIDI_EXTENSIONS = (".mid", ".midi")
+
+
+# ----- inputs, journal, output -----
+
+def collect_inputs(paths, recursive=False, extensions=AUDIO_EXTENSIONS):
+    """Expand directories (recursively if asked) into a sorted, de-duplicated file list"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            if recursive:
+                for folder, _dirs, names in os.walk(path):
+                    found.extend(os.path.join(folder, n) for n in names)
+            else:
+                found.extend(os.path.join(path, n) for n in os.listdir(path))
+        else:
+            found.append(path)
+    files = {os.path.abspath(p) for p in found
+             if os.path.isfile(p) and p.lower().endswith(extensions)}
+    return sorted(files)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Journal:
+    """Append-only JSON-lines record of finished files, keyed by command"""
+    def __init__(self, path, command):
+        self.path = path
+        self.command = command
+        self._lock = threading.Lock()
+        self._done = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    if entry.get('command') == command and entry.get('ok'):
+                        self._done[entry['path']] = entry.get('stamp')
+
+    def is_done(self, path):
+        return path in self._done and os.path.exists(path) and self._done[path] == _stamp(path)
+
+    def record(self, entry):
+        if not self.path:
+            return
+        if entry['ok'] and os.path.exists(entry['path']):
+            entry = dict(entry, stamp=_stamp(entry['path']))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def _jsonable(value):
+    """Drop arrays and turn NumPy scalars into plain numbers for JSON output"""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items() if not hasattr(v, 'shape') or v.shape == ()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None  # e.g. -inf LUFS for digital silence; JSON has no infinities
+    return value
+
+
+class Reporter:
+    def __init__(self, command, journal, as_json=False):
+        self.command = command
+        self.journal = journal
+        self.as_json = as_json
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def report(self, path, result=None, error=None, summary=None):
+        entry = {'command': self.command, 'path': path, 'ok': error is None}
+        if error is None:
+            self.ok += 1
+            entry['result'] = _jsonable(result)
+        else:
+            self.failed += 1
+            entry['error'] = error
+        self.journal.record(entry)
+        if self.as_json:
+            print(json.dumps(entry), flush=True)
+        elif error:
+            print(f"✗ {os.path.basename(path)}: {error}", flush=True)
+        else:
+            print(f"✓ {os.path.basename(path)}{': ' + summary if summary else ''}", flush=True)
+
+    def finish(self, elapsed, extra=None):
+        totals = {'ok': self.ok, 'failed': self.failed, 'skipped': self.skipped,
+                  'seconds': round(elapsed, 2)}
+        if extra:
+            totals.update(_jsonable(extra))
+        if self.as_json:
+            print(json.dumps({'command': self.command, 'summary': totals}))
+        else:
+            print(f"{self.ok} ok, {self.failed} failed, {self.skipped} skipped "
+                  f"in {elapsed:.1f}s", file=sys.stderr)
+        return 1 if self.failed else 0
+
+
+def run_job(paths, fn, workers, on_result, use_processes=True):
+    """Run a BatchJob to completion, delivering (path, result, error) in this thread"""
+    job = BatchJob(paths, fn=fn, workers=workers, use_processes=use_processes).start()
+    try:
+        while True:
+            finished = job.finished  # read first: drain() must see everything queued before it
+            for index, result, error in job.drain():
+                on_result(job.paths[index], result, error)
+            if finished:
+                break
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        job.cancel()
+        job.wait()
+        raise
+
+
+# ----- analyze / normalize -----
+
+def _analyze(paths, args, reporter=None):
+    """R128 results for `paths` via the shared analysis cache; {path: result}"""
+    from analysis_cache import AnalysisCache
+
+    kind = "r128-sampled" if args.sampled else "r128"
+    cache = AnalysisCache()
+    results = cache.lookup_many(paths, kind)
+    fresh = []
+
+    def on_result(path, result, error):
+        if error is None:
+            results[path] = result
+            fresh.append((path, result))
+        elif reporter:
+            reporter.report(path, error=error)
+
+    todo = [p for p in paths if p not in results]
+    try:
+        if todo:
+            run_job(todo, partial(analyze_file, sampled=args.sampled), args.workers, on_result)
+    finally:
+        cache.store_many(fresh, kind)
+        cache.close()
+    return results
+
+
+def cmd_analyze(args, paths, reporter):
+    from loudness_r128 import album_loudness
+
+    results = _analyze(paths, args, reporter)
+    album = album_loudness([results[p] for p in paths if p in results]) if args.album else None
+    tagged, tag_errors = [], {}
+    if args.write_tags:
+        from tag_service import replaygain_values, write_many
+
+        items = [(p, replaygain_values(results[p], album)) for p in paths if p in results]
+        for path, written, error in write_many(items):
+            if error:
+                tag_errors[path] = error
+            elif written:
+                tagged.append((path, results[path]))
+    for path in paths:
+        if path not in results:
+            continue
+        result = results[path]
+        if path in tag_errors:
+            reporter.report(path, error=f"tagging failed: {tag_errors[path]}")
+            continue
+        reporter.report(path, result, summary=f"{result['lufs']:.1f} LUFS, "
+                        f"{result['true_peak_db']:.1f} dBTP, gain {result['track_gain']:+.1f} dB")
+    if tagged:
+        # Tagging changed the mtimes; re-key so the next run is still a cache hit
+        from analysis_cache import AnalysisCache
+
+        cache = AnalysisCache()
+        cache.store_many(tagged, "r128-sampled" if args.sampled else "r128")
+        cache.close()
+    return album
+
+
+def plan_gains(results, target_lufs, album=False):
+    """Same rule as the MP3Gain GUI: reference gain + target offset, capped at -1 dBTP"""
+    from loudness_r128 import REFERENCE_LUFS, album_loudness, safe_gain
+
+    offset = target_lufs - REFERENCE_LUFS
+    album_result = album_loudness(list(results.values())) if album else None
+    gains = {}
+    for path, result in results.items():
+        if album_result is not None:
+            gain, peak = album_result['album_gain'], album_result['true_peak']
+        else:
+            gain, peak = result['track_gain'], result['true_peak']
+        gains[path] = safe_gain(gain + offset, peak)
+    return gains
+
+
+def normalize_one(path, gains, flac_mode="tag"):
+    """Apply a planned gain: MP3 in place (undoable), FLAC via flac_engine"""
+    gain_db = gains[path]
+    lower = path.lower()
+    if lower.endswith(".mp3"):
+        from mp3_gain_edit import apply_gain_db
+        from tag_service import strip_loudness_tags
+
+        edit = apply_gain_db(path, gain_db)
+        if edit['steps']:
+            # Existing ReplayGain tags describe the old level
+            edit['removed_tags'] = strip_loudness_tags(path)
+        return edit
+    if lower.endswith(".flac"):
+        from flac_engine import process_file
+
+        return process_file(path, flac_mode, gain_db)
+    raise ValueError("only MP3 (in place) and FLAC can be normalized headless")
+
+
+def cmd_normalize(args, paths, reporter):
+    from analysis_cache import AnalysisCache
+
+    results = _analyze(paths, args, reporter)
+    gains = plan_gains(results, args.target, args.album)
+    cache = AnalysisCache()
+
+    def on_result(path, result, error):
+        if error is None and path.lower().endswith(".mp3"):
+            cache.invalidate(path)  # the measurement no longer describes the file
+        summary = f"{result['gain_db']:+.1f} dB" if error is None else None
+        reporter.report(path, result, error, summary)
+
+    try:
+        # File edits are I/O bound (ffmpeg runs out of process anyway)
+        run_job(sorted(gains), partial(normalize_one, gains=gains, flac_mode=args.flac_mode),
+                args.workers, on_result, use_processes=False)
+    finally:
+        cache.close()
+
+
+# ----- transcribe / separate / sheet -----
+
+def cmd_transcribe(args, paths, reporter):
+    from transcription_service import TranscriptionService
+
+    service = TranscriptionService(workers=args.workers, save_notes=not args.no_notes)
+
+    def on_result(path, result, error):
+        summary = f"{result['midi']} ({result['note_count']} notes)" if result else None
+        reporter.report(path, result, error, summary)
+
+    try:
+        service.transcribe_many(paths, args.output, on_result, args.skip_duplicates)
+    finally:
+        service.shutdown()
+
+
+def _output_base(path, output_dir):
+    folder = output_dir or os.path.dirname(path)
+    return os.path.join(folder, os.path.splitext(os.path.basename(path))[0])
+
+
+def cmd_separate(args, paths, reporter):
+    from segment_processing import hpss_file
+
+    # One file at a time; the segments of each file use all the workers
+    for path in paths:
+        base = _output_base(path, args.output)
+        try:
+            harmonic, percussive = hpss_file(path, f"{base}_harmonic.wav", f"{base}_percussive.wav",
+                                             segment_s=args.segment, workers=args.workers)
+        except Exception as e:
+            reporter.report(path, error=str(e))
+            continue
+        reporter.report(path, {'harmonic': harmonic, 'percussive': percussive},
+                        summary=os.path.basename(harmonic))
+
+
+def sheet_one(path, output_dir=None, instrument="piano", high_fidelity=False):
+    """MusicXML from a MIDI file (musicxml_writer) or straight from audio (note_extraction)"""
+    xml_path = f"{_output_base(path, output_dir)}.musicxml"
+    if path.lower().endswith(MIDI_EXTENSIONS):
+        from musicxml_writer import midi_to_musicxml
+
+        midi_to_musicxml(path, xml_path, title=os.path.splitext(os.path.basename(path))[0],
+                         high_fidelity=high_fidelity)
+        return {'musicxml': xml_path}
+
+    from note_extraction import to_stream, transcribe_file
+
+    _features, passes = transcribe_file(path, instruments=(instrument,))
+    notes = passes[instrument]
+    to_stream(notes, part=True).write('musicxml', fp=xml_path)
+    return {'musicxml': xml_path, 'note_count': len(notes)}
+
+
+def cmd_sheet(args, paths, reporter):
+    if not all(p.lower().endswith(MIDI_EXTENSIONS) for p in paths):
+        from note_extraction import INSTRUMENT_RANGES
+
+        if args.instrument not in INSTRUMENT_RANGES:
+            raise SystemExit(f"unknown instrument {args.instrument!r}; "
+                             f"choose from {', '.join(sorted(INSTRUMENT_RANGES))}")
+
+    def on_result(path, result, error):
+        reporter.report(path, result, error, os.path.basename(result['musicxml']) if result else None)
+
+    run_job(paths, partial(sheet_one, output_dir=args.output, instrument=args.instrument,
+                           high_fidelity=args.music21),
+            args.workers, on_result)
+
+
+# ----- entry point -----
+
+COMMANDS = {
+    'analyze': cmd_analyze,
+    'normalize': cmd_normalize,
+    'transcribe': cmd_transcribe,
+    'separate': cmd_separate,
+    'sheet': cmd_sheet,
+}
+
+
+def build_parser():
+    from flac_engine import MODES
+    from loudness_r128 import REFERENCE_LUFS
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("inputs", nargs="+", help="files and/or directories")
+    common.add_argument("-r", "--recursive", action="store_true", help="descend into subdirectories")
+    common.add_argument("-j", "--workers", type=int, default=default_workers(),
+                        help="parallel workers (default: %(default)s)")
+    common.add_argument("--journal", metavar="FILE",
+                        help="record finished files here and skip those already recorded")
+    common.add_argument("--json", action="store_true", help="print one JSON object per file")
+
+    parser = argparse.ArgumentParser(description="Batch audio analysis, normalization and transcription")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("analyze", parents=[common], help="EBU R128 loudness and true peak")
+    p.add_argument("--sampled", action="store_true", help="fast scan of sampled windows")
+    p.add_argument("--album", action="store_true", help="also report album loudness")
+    p.add_argument("--write-tags", action="store_true", help="write ReplayGain 2.0 tags")
+
+    p = sub.add_parser("normalize", parents=[common], help="apply gain toward a loudness target")
+    p.add_argument("--target", type=float, default=REFERENCE_LUFS, help="target LUFS (default: %(default)s)")
+    p.add_argument("--album", action="store_true", help="one gain for the whole set")
+    p.add_argument("--sampled", action="store_true", help="fast scan of sampled windows")
+    p.add_argument("--flac-mode", choices=[m for m in MODES if m != "replaygain"], default="tag",
+                   help="how FLAC gain is applied (default: %(default)s)")
+
+    p = sub.add_parser("transcribe", parents=[common], help="Basic Pitch audio to MIDI")
+    p.add_argument("-o", "--output", help="output directory (default: next to each file)")
+    p.add_argument("--no-notes", action="store_true", help="skip the note-event CSV")
+    p.add_argument("--skip-duplicates", action="store_true",
+                   help="transcribe one copy of songs found more than once (by fingerprint)")
+
+    p = sub.add_parser("separate", parents=[common], help="harmonic/percussive stems")
+    p.add_argument("-o", "--output", help="output directory (default: next to each file)")
+    p.add_argument("--segment", type=float, default=30.0, help="segment length in seconds")
+
+    p = sub.add_parser("sheet", parents=[common], help="MusicXML from MIDI or audio")
+    p.add_argument("-o", "--output", help="output directory (default: next to each file)")
+    # No choices=: note_extraction pulls in librosa, which --help shouldn't need
+    p.add_argument("--instrument", default="piano",
+                   help="pitch range for audio input: guitar, piano, bass, voice or drum "
+                        "(default: %(default)s)")
+    p.add_argument("--music21", action="store_true",
+                   help="convert MIDI through music21 (slower, better spelling and beaming)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    extensions = AUDIO_EXTENSIONS + MIDI_EXTENSIONS if args.command == "sheet" else AUDIO_EXTENSIONS
+    paths = collect_inputs(args.inputs, args.recursive, extensions)
+    if getattr(args, 'output', None):
+        os.makedirs(args.output, exist_ok=True)
+
+    journal = Journal(args.journal, args.command)
+    reporter = Reporter(args.command, journal, args.json)
+    pending = [p for p in paths if not journal.is_done(p)]
+    reporter.skipped = len(paths) - len(pending)
+    if not pending:
+        return reporter.finish(0.0)
+
+    start = time.perf_counter()
+    extra = None
+    try:
+        extra = COMMANDS[args.command](args, pending, reporter)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun with the same --journal to resume", file=sys.stderr)
+    return reporter.finish(time.perf_counter() - start, {'album': extra} if extra else None)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Streaming PCM decoding through ffmpeg.
+
+Audio is piped out of ffmpeg as raw float32 and handed over in fixed-size
+NumPy blocks that reuse one buffer, so measuring a 2-hour mix costs a few
+hundred KB of memory instead of the full decoded AudioSegment.
+"""
+import json
+import math
+import os
+import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+BLOCK_FRAMES = 65536
+
+# Concurrent ffmpeg processes per Python process (FFMPEG_MAX_PROCS overrides)
+_FFMPEG_SLOTS = threading.BoundedSemaphore(
+    int(os.environ.get("FFMPEG_MAX_PROCS") or os.cpu_count() or 2))
+
+
+@contextmanager
+def ffmpeg_slot():
+    """Hold one of the shared ffmpeg slots while a process runs"""
+    _FFMPEG_SLOTS.acquire()
+    try:
+        yield
+    finally:
+        _FFMPEG_SLOTS.release()
+
+
+def ffmpeg_binary():
+    """ffmpeg (or avconv) on PATH; the GUIs prepend ./ffmpeg/bin if present"""
+    binary = shutil.which("ffmpeg") or shutil.which("avconv")
+    if binary is None:
+        raise RuntimeError("ffmpeg or avconv is required for audio decoding")
+    return binary
+
+
+def probe(path):
+    """Return {'sample_rate', 'channels', 'duration'} of the first audio stream"""
+    ffprobe = shutil.which("ffprobe") or shutil.which("avprobe")
+    if ffprobe is None:
+        raise RuntimeError("ffprobe is required to read stream parameters")
+    out = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "a:0",
+         "-show_entries", "stream=sample_rate,channels:format=duration",
+         "-of", "json", str(path)],
+        capture_output=True, check=True)
+    info = json.loads(out.stdout)
+    stream = info["streams"][0]
+    duration = info.get("format", {}).get("duration")
+    return {
+        'sample_rate': int(stream["sample_rate"]),
+        'channels': int(stream["channels"]),
+        'duration': float(duration) if duration not in (None, "N/A") else None,
+    }
+
+
+def _decode_command(path, sample_rate, channels, start=None, length=None):
+    cmd = [ffmpeg_binary(), "-v", "error", "-nostdin"]
+    if start is not None:
+        cmd += ["-ss", f"{start:.3f}"]  # input seek: skips decoding up to start
+    if length is not None:
+        cmd += ["-t", f"{length:.3f}"]
+    cmd += ["-i", str(path), "-vn", "-f", "f32le", "-acodec", "pcm_f32le",
+            "-ar", str(sample_rate), "-ac", str(channels), "pipe:1"]
+    return cmd
+
+
+def _read_blocks(proc, channels, block_frames):
+    frame_bytes = channels * 4
+    buf = bytearray(block_frames * frame_bytes)
+    view = memoryview(buf)
+    samples = np.frombuffer(buf, dtype=np.float32).reshape(block_frames, channels)
+    while True:
+        filled = 0
+        while filled < len(buf):
+            n = proc.stdout.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+        frames = filled // frame_bytes
+        if frames:
+            # The same buffer is refilled on the next iteration
+            yield samples[:frames]
+        if filled < len(buf):
+            return
+
+
+def pcm_blocks(path, sample_rate=None, channels=None, block_frames=BLOCK_FRAMES,
+               start=None, length=None):
+    """Yield (frames, channels) float32 blocks of decoded audio.
+
+    Blocks are views of a single reused buffer: consume or copy each one
+    before asking for the next.
+    """
+    if sample_rate is None or channels is None:
+        info = probe(path)
+        sample_rate = sample_rate or info['sample_rate']
+        channels = channels or info['channels']
+
+    with ffmpeg_slot():
+        proc = subprocess.Popen(_decode_command(path, sample_rate, channels, start, length),
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                bufsize=0)
+        completed = False
+        try:
+            yield from _read_blocks(proc, channels, block_frames)
+            completed = True
+        finally:
+            if not completed:
+                proc.kill()  # consumer stopped early
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            code = proc.wait()
+    if code != 0:
+        raise RuntimeError(f"ffmpeg failed on {os.path.basename(str(path))}: "
+                           f"{stderr.decode(errors='replace').strip()}")
+
+
+def decode_array(path, sample_rate=None, channels=None, block_frames=BLOCK_FRAMES):
+    """Decode a whole file into one (frames, channels) float32 array; returns (pcm, rate).
+
+    The array is sized from the probed duration and filled block by block,
+    so peak memory is the PCM itself rather than bytes plus a copy.
+    """
+    info = probe(path)
+    sample_rate = sample_rate or info['sample_rate']
+    channels = channels or info['channels']
+    estimate = int((info['duration'] or 0) * sample_rate) + block_frames
+    pcm = np.empty((estimate, channels), dtype=np.float32)
+    filled = 0
+    for block in pcm_blocks(path, sample_rate, channels, block_frames):
+        if filled + len(block) > len(pcm):
+            pcm = np.resize(pcm, (max(2 * len(pcm), filled + len(block)), channels))
+        pcm[filled:filled + len(block)] = block
+        filled += len(block)
+    return pcm[:filled], sample_rate
+
+
+def array_blocks(pcm, block_frames=BLOCK_FRAMES):
+    """Blocks of an already decoded array, shaped like pcm_blocks output"""
+    for start in range(0, len(pcm), block_frames):
+        yield np.asarray(pcm[start:start + block_frames], dtype=np.float32)
+
+
+def sampled_blocks(path, windows=16, window_seconds=3.0, block_frames=BLOCK_FRAMES):
+    """Yield blocks from `windows` short excerpts spread evenly over the file.
+
+    Each excerpt is a separate input-seeked decode, so the cost is roughly
+    windows * window_seconds of audio regardless of the track length.
+    """
+    info = probe(path)
+    duration = info['duration']
+    if not duration or duration <= windows * window_seconds:
+        yield from pcm_blocks(path, info['sample_rate'], info['channels'], block_frames)
+        return
+    step = (duration - window_seconds) / (windows - 1) if windows > 1 else 0
+    for i in range(windows):
+        yield from pcm_blocks(path, info['sample_rate'], info['channels'], block_frames,
+                              start=i * step, length=window_seconds)
+
+
+class LevelMeter:
+    """Constant-memory per-channel sum-of-squares and peak accumulator"""
+    def __init__(self, channels):
+        self.channels = channels
+        self.frames = 0
+        self.sum_squares = np.zeros(channels, dtype=np.float64)
+        self.peak = np.zeros(channels, dtype=np.float64)
+
+    def update(self, block):
+        self.frames += len(block)
+        self.sum_squares += np.einsum('ij,ij->j', block, block, dtype=np.float64)
+        np.maximum(self.peak, np.abs(block).max(axis=0), out=self.peak)
+
+    @staticmethod
+    def _db(value):
+        return 20 * math.log10(value) if value > 0 else -float('inf')
+
+    def channel_rms_db(self):
+        # Same reference as _calculate_rms_db: 0 dB = full-scale sine
+        if not self.frames:
+            return [-float('inf')] * self.channels
+        return [self._db(math.sqrt(s / self.frames) * math.sqrt(2)) for s in self.sum_squares]
+
+    def rms_db(self):
+        if not self.frames:
+            return -float('inf')
+        mean_square = float(self.sum_squares.sum()) / (self.frames * self.channels)
+        return self._db(math.sqrt(mean_square) * math.sqrt(2))
+
+    def peak_db(self):
+        return self._db(float(self.peak.max()))
+
+
+def measure_levels(path, sampled=False, block_frames=BLOCK_FRAMES):
+    """Stream a file once and return its RMS/peak figures.
+
+    With sampled=True only a spread of short excerpts is decoded, giving a
+    fast approximate RMS (the peak may be missed).
+    """
+    info = probe(path)
+    meter = LevelMeter(info['channels'])
+    if sampled:
+        blocks = sampled_blocks(path, block_frames=block_frames)
+    else:
+        blocks = pcm_blocks(path, info['sample_rate'], info['channels'], block_frames)
+    for block in blocks:
+        meter.update(block)
+    return {
+        'rms_db': meter.rms_db(),
+        'peak_db': meter.peak_db(),
+        'channel_rms_db': meter.channel_rms_db(),
+        'channel_peak': [float(p) for p in meter.peak],
+        'duration': meter.frames / info['sample_rate'],
+        'sampled': sampled,
+    }
@@ -0,0 +1,60 @@
+"""
+Benchmark: scanner cold-start cost with and without pandas/numpy.
+
+Measures, each in a fresh interpreter:
+  - import time of the old Kivy scanner data stack (pandas + numpy)
+  - import time of the new core (pa_scanner_core + scan_scheduler)
+and reports the installed size of pandas + numpy, which is what the APK
+would have to carry for the old path.
+
+    python bench_android_startup.py
+"""
+import os
+import subprocess
+import sys
+
+
+def import_time(modules, runs=5):
+    """Best-of-N cold import time in ms, measured in a fresh interpreter"""
+    code = ("import time; t = time.perf_counter(); "
+            f"import {', '.join(modules)}; "
+            "print((time.perf_counter() - t) * 1000)")
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        if out.returncode != 0:
+            return None
+        ms = float(out.stdout.strip())
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def package_size_mb(name):
+    try:
+        module = __import__(name)
+    except ImportError:
+        return None
+    root = os.path.dirname(module.__file__)
+    total = 0
+    for dirpath, _, files in os.walk(root):
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+    return total / 1e6
+
+
+def fmt(value, unit):
+    return "n/a (not installed)" if value is None else f"{value:.1f} {unit}"
+
+
+def main():
+    print("Cold import time (best of 5):")
+    print(f"  pandas + numpy (old scanner stack): {fmt(import_time(['pandas', 'numpy']), 'ms')}")
+    print(f"  pa_scanner_core + scan_scheduler:   {fmt(import_time(['pa_scanner_core', 'scan_scheduler']), 'ms')}")
+
+    sizes = [package_size_mb(name) for name in ('pandas', 'numpy')]
+    total = None if None in sizes else sum(sizes)
+    print(f"Installed size of pandas + numpy (APK payload avoided): {fmt(total, 'MB')}")
+
+
+if __name__ == "__main__":
+    main()
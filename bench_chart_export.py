@@ -0,0 +1,89 @@
+"""
+Benchmark: chart export cost per refresh for the Rust supertrade front-end.
+
+The Rust BotBridge holds the GIL for the whole body of its chart refresh, so
+the Python-side time of that body is the GIL hold time. This compares:
+
+  before - latest_data DataFrame -> index.astype('int64') -> tolist(),
+           then per-element extraction into Vec<f64>
+  after  - bars_since(version) memoryviews, memcpy'd (PyBuffer::to_vec)
+
+Run on a machine where supertrade imports (MetaTrader5, torch):
+    python bench_chart_export.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from supertrade import StateChannel, SuperpointTradingBot, CONFIG
+
+
+def make_rates(n_bars, start=1_700_000_000, step=3600):
+    rng = np.random.default_rng(0)
+    close = 2000 + np.cumsum(rng.normal(0, 1, n_bars))
+    df = pd.DataFrame({
+        'open': close + rng.normal(0, 0.5, n_bars),
+        'high': close + 1.0,
+        'low': close - 1.0,
+        'close': close,
+        'tick_volume': rng.integers(100, 1000, n_bars),
+    })
+    df.index = pd.to_datetime(start + np.arange(n_bars) * step, unit='s').rename('time')
+    return df
+
+
+def refresh_before(bot):
+    # Same work the old bot_bridge.rs did inside Python::with_gil
+    df = bot.latest_data.copy()  # the bot used to publish a df.copy() per poll
+    locals_ = {'df': df}
+    exec("timestamps = df.index.astype('int64') // 10**9\n"
+         "closes = df['close'].values.tolist()\n"
+         "timestamps = timestamps.tolist()\n", None, locals_)
+    # pyo3 extracts Vec<f64> element by element
+    time_vec = [float(t) for t in locals_['timestamps']]
+    close_vec = [float(c) for c in locals_['closes']]
+    return time_vec, close_vec
+
+
+def refresh_after(bot, version):
+    version, buffers = bot.bars_since(version)
+    # PyBuffer::to_vec is a single memcpy per series
+    return version, bytes(buffers['time']), bytes(buffers['close'])
+
+
+def timeit(fn, repeat=200):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1e6
+
+
+def main():
+    print(f"{'bars':>6}  {'before (us)':>12}  {'after full (us)':>16}  {'after delta (us)':>17}")
+    for n_bars in (150, 1000, 5000):
+        bot = SuperpointTradingBot(CONFIG)
+        bot.channel = StateChannel(capacity=n_bars)
+        df = make_rates(n_bars)
+        bot.channel.publish_bars(df)
+
+        before = timeit(lambda: refresh_before(bot))
+        full = timeit(lambda: refresh_after(bot, 0))
+
+        # Steady state: one forming-bar tick between refreshes
+        def tick_and_refresh():
+            df.iloc[-1, df.columns.get_loc('close')] += 0.1
+            version = bot.channel.version
+            bot.channel.publish_bars(df)
+            t0 = time.perf_counter()
+            refresh_after(bot, version)
+            return time.perf_counter() - t0
+
+        delta = np.median([tick_and_refresh() for _ in range(200)]) * 1e6
+        print(f"{n_bars:>6}  {before:>12.1f}  {full:>16.1f}  {delta:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
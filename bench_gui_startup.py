@@ -0,0 +1,84 @@
+"""
+Benchmark: start-up cost of the Tk music tools, lazy vs eager imports.
+
+For music_studio_gui.py and mp3tonote.py, each in a fresh interpreter:
+  - total import time reported by `python -X importtime`
+  - time from interpreter start of the script to the first mapped frame
+"lazy" is the module as shipped; "eager" additionally imports every
+module it prewarms before building the window, which is what the old
+top-of-file imports cost.
+
+    python bench_gui_startup.py
+"""
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TOOLS = {
+    # module: (window class, module-level tuples of prewarmed modules)
+    'music_studio_gui': ('MusicStudioGUI', ('PLOT_MODULES', 'ENGINE_MODULES')),
+    'mp3tonote': ('AI_MusicTranscriber', ('HEAVY_MODULES',)),
+}
+
+
+def _eager_imports(module, lists):
+    names = " + ".join(f"m.{name}" for name in lists)
+    return (f"import importlib, {module} as m; "
+            f"[importlib.import_module(n) for n in {names}]")
+
+
+def _run(code, *flags):
+    return subprocess.run([sys.executable, *flags, "-c", code], capture_output=True,
+                          text=True, cwd=HERE)
+
+
+def import_time_ms(code):
+    """Sum of top-level cumulative times from -X importtime, in ms"""
+    out = _run(code, "-X", "importtime")
+    if out.returncode != 0:
+        return None
+    total_us = 0
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # depth 0: a module the code itself imported
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def first_frame_ms(module, cls, eager_code=None, runs=3):
+    """Best-of-N ms from process start until the window is mapped"""
+    code = ("import time; t = time.perf_counter(); "
+            + (eager_code + "; " if eager_code else "")
+            + f"import tkinter as tk, {module}; root = tk.Tk(); app = {module}.{cls}(root); "
+            "root.wait_visibility(); root.update(); "
+            "print((time.perf_counter() - t) * 1000); root.destroy()")
+    best = None
+    for _ in range(runs):
+        out = _run(code)
+        if out.returncode != 0:
+            return None  # no display, or a dependency is missing
+        ms = float(out.stdout.strip().splitlines()[-1])
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def fmt(value):
+    return "n/a" if value is None else f"{value:8.1f} ms"
+
+
+def main():
+    for module, (cls, lists) in TOOLS.items():
+        eager = _eager_imports(module, lists)
+        print(f"{module}:")
+        print(f"  import time     lazy {fmt(import_time_ms(f'import {module}'))}   "
+              f"eager {fmt(import_time_ms(eager))}")
+        print(f"  first frame     lazy {fmt(first_frame_ms(module, cls))}   "
+              f"eager {fmt(first_frame_ms(module, cls, eager))}")
+
+
+if __name__ == "__main__":
+    main()
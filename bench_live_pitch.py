@@ -0,0 +1,64 @@
+"""
+Benchmark: live_pitch.StreamingYIN throughput and per-block latency.
+
+Feeds a synthetic voice-like signal (fundamental + 2 harmonics, gliding
+between notes) in microphone-sized blocks on one core and reports blocks
+per second, real-time factor and p50/p99 compute time per block, for the
+incremental difference function and for a full FFT recompute every hop.
+
+    python bench_live_pitch.py [--rate 44100] [--block 512] [--seconds 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from live_pitch import StreamingYIN
+
+
+def test_signal(rate, seconds):
+    t = np.arange(int(rate * seconds)) / rate
+    # One note per half second, C3..C5, with 5 Hz vibrato
+    midi = 48 + (np.floor(t * 2) * 7) % 24 + 0.3 * np.sin(2 * np.pi * 5 * t)
+    phase = 2 * np.pi * np.cumsum(440.0 * 2 ** ((midi - 69) / 12)) / rate
+    return 0.5 * np.sin(phase) + 0.25 * np.sin(2 * phase) + 0.1 * np.sin(3 * phase)
+
+
+def run(signal, rate, block, **kwargs):
+    tracker = StreamingYIN(rate, **kwargs)
+    timings = []
+    voiced = 0
+    for start in range(0, len(signal), block):
+        t = time.perf_counter()
+        readings = tracker.process(signal[start:start + block])
+        timings.append(time.perf_counter() - t)
+        voiced += sum(r.voiced for r in readings)
+    timings = np.array(timings)
+    return {
+        'blocks_per_s': len(timings) / timings.sum(),
+        'realtime': len(signal) / rate / timings.sum(),
+        'p50_ms': 1000 * np.percentile(timings, 50),
+        'p99_ms': 1000 * np.percentile(timings, 99),
+        'hop_ms': tracker.hop_ms,
+        'voiced': voiced,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--block", type=int, default=512)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+
+    signal = test_signal(args.rate, args.seconds)
+    print(f"{args.seconds:.0f} s at {args.rate} Hz, {args.block}-frame blocks, one core")
+    for label, kwargs in (("incremental", {}), ("full FFT per hop", {'refresh': 0})):
+        r = run(signal, args.rate, args.block, **kwargs)
+        print(f"  {label:<17} {r['blocks_per_s']:8.0f} blocks/s  {r['realtime']:6.1f}x real time  "
+              f"p50 {r['p50_ms']:.2f} ms  p99 {r['p99_ms']:.2f} ms  "
+              f"(+{r['hop_ms']:.1f} ms hop)")
+
+
+if __name__ == "__main__":
+    main()
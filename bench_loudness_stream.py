@@ -0,0 +1,84 @@
+"""
+Benchmark: peak memory and throughput of loudness measurement.
+
+Compares, each in a fresh interpreter:
+  pydub   - AudioSegment.from_file + .rms (the old _calculate_rms_db path)
+  stream  - audio_stream.measure_levels, constant-memory blocks
+  sampled - audio_stream.measure_levels(sampled=True)
+
+    python bench_loudness_stream.py [file] [--minutes 30]
+
+Without a file a stereo test tone of the given length is generated with
+ffmpeg. Peak RSS comes from the resource module (Linux/macOS only).
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from audio_stream import ffmpeg_binary
+
+CHILD = {
+    'pydub': ("from pydub import AudioSegment; import math\n"
+              "a = AudioSegment.from_file(PATH)\n"
+              "r = 20 * math.log10(a.rms / (a.max_possible_amplitude / math.sqrt(2)))\n"),
+    'stream': ("from audio_stream import measure_levels\n"
+               "r = measure_levels(PATH)['rms_db']\n"),
+    'sampled': ("from audio_stream import measure_levels\n"
+                "r = measure_levels(PATH, sampled=True)['rms_db']\n"),
+}
+
+REPORT = ("import sys\n"
+          "try:\n"
+          "    import resource\n"
+          "    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+          "    rss = rss / 1e6 if sys.platform == 'darwin' else rss / 1e3\n"
+          "except ImportError:\n"
+          "    rss = float('nan')\n"
+          "print(r, rss)\n")
+
+
+def make_test_file(minutes):
+    path = os.path.join(tempfile.gettempdir(), f"bench_loudness_{minutes}min.mp3")
+    if not os.path.exists(path):
+        subprocess.run([ffmpeg_binary(), "-v", "error", "-y",
+                        "-f", "lavfi", "-i", f"sine=frequency=440:duration={minutes * 60}",
+                        "-ac", "2", "-b:a", "192k", path], check=True)
+    return path
+
+
+def run(mode, path):
+    code = f"PATH = {path!r}\n" + CHILD[mode] + REPORT
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__)))
+    elapsed = time.perf_counter() - start
+    if out.returncode != 0:
+        return None
+    rms_db, rss_mb = (float(v) for v in out.stdout.split())
+    return rms_db, rss_mb, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?")
+    parser.add_argument("--minutes", type=int, default=30)
+    args = parser.parse_args()
+
+    path = args.file or make_test_file(args.minutes)
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"{os.path.basename(path)} ({size_mb:.1f} MB)")
+    print(f"{'mode':<8} {'rms dB':>8} {'peak RSS':>10} {'time':>8} {'MB/s':>8}")
+    for mode in CHILD:
+        result = run(mode, path)
+        if result is None:
+            print(f"{mode:<8} failed (missing dependency?)")
+            continue
+        rms_db, rss_mb, elapsed = result
+        print(f"{mode:<8} {rms_db:8.2f} {rss_mb:8.0f}MB {elapsed:7.2f}s {size_mb / elapsed:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: CPU time of the PA Scanner scan loop on the MockMT5 demo feed.
+
+Compares the old loop (full scan every 2 s) with ScanScheduler (cheap
+single-bar probe every 2 s, full scan only on a new bar) and with the
+scheduler in background mode (probe every 30 s).
+
+Note: importing pa_scanner_android initialises Kivy's window.
+
+    python bench_scanner_cpu.py --seconds 120 --tf M1
+"""
+import argparse
+import time
+
+from pa_scanner_android import PAPatternScanner, mt5
+from scan_scheduler import ScanScheduler
+
+
+def measure_cpu(step, seconds, interval):
+    """CPU seconds spent calling step() every `interval` for `seconds`"""
+    start_cpu = time.process_time()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        step()
+        time.sleep(interval)
+    return time.process_time() - start_cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--tf', default='M1', choices=['M1', 'M5', 'M15', 'M30', 'H1', 'H4', 'D1'])
+    parser.add_argument('--interval', type=float, default=2.0)
+    parser.add_argument('--background-interval', type=float, default=30.0)
+    args = parser.parse_args()
+
+    scanner = PAPatternScanner(timeframe=getattr(mt5, f"TIMEFRAME_{args.tf}"))
+    scanner.connect()
+
+    legacy = measure_cpu(scanner.scan_once, args.seconds, args.interval)
+
+    scheduler = ScanScheduler(
+        probe=scanner.last_bar_time,
+        scan=lambda: scanner.scan_once(force_refresh=True),
+        on_results=lambda results: None,
+    )
+    foreground = measure_cpu(scheduler.poll_once, args.seconds, args.interval)
+    fg_scans = scheduler.scans
+    background = measure_cpu(scheduler.poll_once, args.seconds, args.background_interval)
+
+    print(f"Mock feed {args.tf}, {args.seconds:.0f}s per mode")
+    print(f"  legacy (scan every {args.interval}s):      {legacy * 1000:8.1f} ms CPU")
+    print(f"  scheduler foreground ({fg_scans} scans):    {foreground * 1000:8.1f} ms CPU")
+    print(f"  scheduler background ({args.background_interval}s): {background * 1000:8.1f} ms CPU")
+    if foreground > 0:
+        print(f"  foreground reduction: {legacy / foreground:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
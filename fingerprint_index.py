@@ -0,0 +1,282 @@
+"""
+Acoustic fingerprints for spotting the same song under another name or bitrate.
+
+A fingerprint is a set of spectral peak-pair hashes (the Shazam scheme):
+the first FINGERPRINT_SECONDS of a file are decoded to 8 kHz mono,
+local maxima of the log spectrogram are kept at a fixed density, and each
+peak is paired with the next few peaks to form (f1, f2, dt) hashes
+anchored at the first peak's time. Encoders move individual samples
+around but not these peaks, so two encodings of a track share most hashes
+at a constant time offset.
+
+FingerprintIndex stores the hashes in SQLite as an inverted index
+(hash -> track, time) on a B-tree, so a lookup costs O(log N) per hash
+however large the library grows. update() fingerprints only new or
+changed files, in a process pool. duplicates() then maps each file in a
+batch to the first file it matches, so batch engines can process one
+copy and reuse its result:
+
+    index = get_index()
+    dupes = index.duplicates(paths, workers=4)    # {duplicate: canonical}
+
+The hashes ignore gain, so a copy that was normalized still matches its
+original. Callers reusing level measurements filter the pairs through
+level_matched() first, which compares a sampled RMS of both files.
+"""
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DB = Path.home() / ".cache" / "101python" / "fingerprints.db"
+SAMPLE_RATE = 8000
+N_FFT = 1024
+HOP = 256                     # 32 ms frames
+FINGERPRINT_SECONDS = 180.0   # enough to identify a recording, bounded cost per file
+PEAKS_PER_SECOND = 10
+FAN_OUT = 4
+MAX_DT = 63                   # frames; 6 bits of the hash
+_BATCH = 900                  # stays under SQLite's host-parameter limit
+
+
+def _spectrogram(y):
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    if len(y) < N_FFT:
+        y = np.pad(y, (0, N_FFT - len(y)))
+    frames = sliding_window_view(y, N_FFT)[::HOP] * np.hanning(N_FFT).astype(np.float32)
+    # Drop the Nyquist bin so frequencies fit in 9 bits
+    return np.log1p(np.abs(np.fft.rfft(frames, axis=1))[:, :N_FFT // 2]).astype(np.float32)
+
+
+def _peaks(spec):
+    """(frame, bin) of the strongest local maxima, time-ordered"""
+    from scipy.ndimage import maximum_filter
+
+    local = (spec == maximum_filter(spec, size=(15, 15))) & (spec > spec.mean())
+    t, f = np.nonzero(local)
+    keep = int(PEAKS_PER_SECOND * len(spec) * HOP / SAMPLE_RATE) + 1
+    if len(t) > keep:
+        strongest = np.argpartition(spec[t, f], -keep)[-keep:]
+        t, f = t[strongest], f[strongest]
+    order = np.lexsort((f, t))
+    return t[order], f[order]
+
+
+def _pair_hashes(t, f):
+    """Vectorised anchor/target pairing; returns (hashes, anchor frames)"""
+    hashes, times = [], []
+    for k in range(1, FAN_OUT + 1):
+        dt = t[k:] - t[:-k]
+        ok = (dt > 0) & (dt <= MAX_DT)
+        anchor = np.flatnonzero(ok)
+        hashes.append((f[anchor].astype(np.int64) << 15) | (f[anchor + k].astype(np.int64) << 6) | dt[ok])
+        times.append(t[anchor])
+    if not hashes:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    return np.concatenate(hashes), np.concatenate(times).astype(np.int64)
+
+
+def fingerprint(path):
+    """(hashes, anchor_frames) of a file; runs in a worker process"""
+    from audio_stream import pcm_blocks
+
+    blocks = [b[:, 0].copy() for b in pcm_blocks(path, SAMPLE_RATE, 1, length=FINGERPRINT_SECONDS)]
+    y = np.concatenate(blocks) if blocks else np.zeros(0, np.float32)
+    return _pair_hashes(*_peaks(_spectrogram(y)))
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class FingerprintIndex:
+    """On-disk inverted index of peak-pair hashes; safe to share between threads"""
+    def __init__(self, db_path=DEFAULT_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                n_hashes INTEGER NOT NULL
+            )""")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                hash INTEGER NOT NULL,
+                track_id INTEGER NOT NULL,
+                t INTEGER NOT NULL,
+                PRIMARY KEY (hash, track_id, t)
+            ) WITHOUT ROWID""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS hashes_track ON hashes (track_id)")
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    # ----- indexing -----
+
+    def stale(self, paths):
+        """Paths that are new or changed since they were last indexed"""
+        with self._lock:
+            known = {}
+            for i in range(0, len(paths), _BATCH):
+                chunk = paths[i:i + _BATCH]
+                marks = ",".join("?" * len(chunk))
+                for path, size, mtime in self._db.execute(
+                        f"SELECT path, size, mtime_ns FROM tracks WHERE path IN ({marks})", chunk):
+                    known[path] = (size, mtime)
+        return [p for p in paths if known.get(p) != _stamp(p)]
+
+    def add(self, path, hashes, times):
+        size, mtime = _stamp(path)
+        with self._lock:
+            row = self._db.execute("SELECT id FROM tracks WHERE path = ?", (path,)).fetchone()
+            if row:
+                self._db.execute("DELETE FROM hashes WHERE track_id = ?", (row[0],))
+                self._db.execute("UPDATE tracks SET size = ?, mtime_ns = ?, n_hashes = ? WHERE id = ?",
+                                 (size, mtime, len(hashes), row[0]))
+                track_id = row[0]
+            else:
+                track_id = self._db.execute(
+                    "INSERT INTO tracks (path, size, mtime_ns, n_hashes) VALUES (?, ?, ?, ?)",
+                    (path, size, mtime, len(hashes))).lastrowid
+            self._db.executemany("INSERT OR IGNORE INTO hashes VALUES (?, ?, ?)",
+                                 zip(hashes.tolist(), [track_id] * len(hashes), times.tolist()))
+            self._db.commit()
+
+    def update(self, paths, workers=None, on_progress=None):
+        """Fingerprint new/changed files in parallel; returns the number indexed"""
+        from loudness_engine import default_workers
+
+        todo = self.stale([os.path.abspath(p) for p in paths])
+        if not todo:
+            return 0
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers or default_workers()) as pool:
+            futures = {pool.submit(fingerprint, path): path for path in todo}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    self.add(path, *future.result())
+                except Exception as e:
+                    print(f"Fingerprint failed for {os.path.basename(path)}: {e}")
+                done += 1
+                if on_progress:
+                    on_progress(done, len(todo))
+        return done
+
+    # ----- queries -----
+
+    def _track_hashes(self, path):
+        with self._lock:
+            row = self._db.execute("SELECT id FROM tracks WHERE path = ?", (path,)).fetchone()
+            if row is None:
+                return None, None, None
+            pairs = self._db.execute("SELECT hash, t FROM hashes WHERE track_id = ?",
+                                     (row[0],)).fetchall()
+        data = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return row[0], data[:, 0], data[:, 1]
+
+    def match(self, hashes, times, exclude_id=None, min_matches=20, min_ratio=0.05):
+        """[(path, score)] of indexed tracks sharing aligned hashes, best first.
+
+        score = hashes agreeing on the single most common time offset; a true
+        duplicate keeps far more than min_ratio of the query aligned.
+        """
+        query_time = {}
+        for h, t in zip(hashes.tolist(), times.tolist()):
+            query_time.setdefault(h, []).append(t)
+        keys = list(query_time)
+        offsets = {}
+        with self._lock:
+            for i in range(0, len(keys), _BATCH):
+                chunk = keys[i:i + _BATCH]
+                marks = ",".join("?" * len(chunk))
+                for h, track_id, t in self._db.execute(
+                        f"SELECT hash, track_id, t FROM hashes WHERE hash IN ({marks})", chunk):
+                    if track_id == exclude_id:
+                        continue
+                    # Offsets quantised to 2 frames to absorb frame-boundary jitter
+                    offsets.setdefault(track_id, []).extend((t - q) // 2 for q in query_time[h])
+        needed = max(min_matches, int(min_ratio * len(hashes)))
+        scores = {}
+        for track_id, values in offsets.items():
+            if len(values) < needed:
+                continue
+            score = int(np.bincount(np.asarray(values) - min(values)).max())
+            if score >= needed:
+                scores[track_id] = score
+        if not scores:
+            return []
+        with self._lock:
+            marks = ",".join("?" * len(scores))
+            names = dict(self._db.execute(f"SELECT id, path FROM tracks WHERE id IN ({marks})",
+                                          list(scores)))
+        return sorted(((names[i], s) for i, s in scores.items()), key=lambda r: -r[1])
+
+    def duplicates(self, paths, workers=None):
+        """{duplicate: canonical} within `paths`; canonical is the earliest listed copy"""
+        paths = [os.path.abspath(p) for p in paths]
+        self.update(paths, workers)
+        order = {p: i for i, p in enumerate(paths)}
+        canonical = {}
+        for path in paths:
+            if path in canonical:
+                continue
+            track_id, hashes, times = self._track_hashes(path)
+            if track_id is None or not len(hashes):
+                continue
+            for other, _score in self.match(hashes, times, exclude_id=track_id):
+                if other in order and order[other] > order[path] and other not in canonical:
+                    canonical[other] = path
+        return canonical
+
+
+def level_matched(dupes, tolerance_db=0.5, workers=None):
+    """The {duplicate: canonical} pairs whose sampled RMS agrees within tolerance_db"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from audio_stream import measure_levels
+    from loudness_engine import default_workers
+
+    paths = sorted(set(dupes) | set(dupes.values()))
+
+    def rms(path):
+        try:
+            return measure_levels(path, sampled=True)['rms_db']
+        except Exception:
+            return None
+
+    # Each measurement is an ffmpeg subprocess, so threads are enough
+    with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+        levels = dict(zip(paths, pool.map(rms, paths)))
+    return {dup: canonical for dup, canonical in dupes.items()
+            if levels[dup] is not None and levels[canonical] is not None
+            and abs(levels[dup] - levels[canonical]) <= tolerance_db}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index; FINGERPRINT_DB overrides the location"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FingerprintIndex(os.environ.get("FINGERPRINT_DB", DEFAULT_DB))
+        return _index
@@ -0,0 +1,64 @@
+"""
+FLAC gain operations for flacgain.py, meant to run inside a BatchJob.
+
+  reencode  - decode, apply gain, re-encode to *_adjusted.flac (ffmpeg;
+              the flac CLI has no gain option). Tags and cover art are
+              copied over by tag_service afterwards.
+  tag       - write the given gain as REPLAYGAIN_TRACK_GAIN, no audio touched
+  replaygain- measure EBU R128 loudness and write ReplayGain 2.0 tags
+"""
+import os
+import subprocess
+
+from audio_stream import ffmpeg_binary
+
+MODES = ("reencode", "tag", "replaygain")
+
+
+def adjusted_path(path):
+    root, ext = os.path.splitext(path)
+    return f"{root}_adjusted{ext}"
+
+
+def reencode_with_gain(path, gain_db, output=None):
+    output = output or adjusted_path(path)
+    cmd = [ffmpeg_binary(), "-v", "error", "-nostdin", "-y", "-i", path,
+           "-map", "0:a", "-map_metadata", "0",
+           "-af", f"volume={gain_db:.2f}dB", "-c:a", "flac", output]
+    proc = subprocess.run(cmd, capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    # -map 0:a drops the attached picture stream; copy everything back from the
+    # source except gain tags, which the new audio already has baked in
+    from tag_service import GAIN_KEY_PREFIXES, copy_tags
+
+    copy_tags(path, output, exclude=GAIN_KEY_PREFIXES)
+    return {'output': output, 'gain_db': gain_db}
+
+
+def write_gain_tag(path, gain_db):
+    """Store a manual gain as ReplayGain Vorbis comments; players apply it on playback"""
+    from tag_service import write_tags
+
+    write_tags(path, {"REPLAYGAIN_TRACK_GAIN": f"{gain_db:+.2f} dB"})
+    return {'output': path, 'gain_db': gain_db}
+
+
+def write_measured_replaygain(path):
+    from analysis_cache import write_replaygain_tags
+    from loudness_r128 import analyze_track
+
+    result = analyze_track(path)
+    write_replaygain_tags(path, result)
+    return {'output': path, 'gain_db': result['track_gain'], 'lufs': result['lufs']}
+
+
+def process_file(path, mode, gain_db=0.0):
+    """BatchJob worker entry point"""
+    if mode == "reencode":
+        return reencode_with_gain(path, gain_db)
+    if mode == "tag":
+        return write_gain_tag(path, gain_db)
+    if mode == "replaygain":
+        return write_measured_replaygain(path)
+    raise ValueError(f"Unknown mode: {mode}")
@@ -1,8 +1,17 @@
 import os
-import subprocess
 import tkinter as tk
+from functools import partial
 from tkinter import filedialog, ttk, messagebox
 
+from flac_engine import process_file
+from loudness_engine import BatchJob, default_workers
+
+MODE_LABELS = {
+    "Re-encode (new file)": "reencode",
+    "Tag only (manual gain)": "tag",
+    "Tag only (measure ReplayGain)": "replaygain",
+}
+
 class FLACVolumeAdjuster:
     def __init__(self, root):
         self.root = root
@@ -17,11 +26,27 @@ class FLACVolumeAdjuster:
         self.gain_entry = ttk.Entry(self.main_frame)
         self.gain_entry.grid(row=0, column=1, padx=10, pady=10)
 
+        self.mode_label = ttk.Label(self.main_frame, text="Mode:")
+        self.mode_label.grid(row=1, column=0, padx=10, pady=10, sticky="e")
+
+        self.mode_var = tk.StringVar(value="Re-encode (new file)")
+        self.mode_combo = ttk.Combobox(self.main_frame, textvariable=self.mode_var,
+                                       values=list(MODE_LABELS), state="readonly", width=30)
+        self.mode_combo.grid(row=1, column=1, padx=10, pady=10)
+
+        self.workers_label = ttk.Label(self.main_frame, text="Workers:")
+        self.workers_label.grid(row=2, column=0, padx=10, pady=10, sticky="e")
+
+        self.workers_var = tk.IntVar(value=default_workers())
+        self.workers_spin = ttk.Spinbox(self.main_frame, from_=1, to=(os.cpu_count() or 1) * 2,
+                                        textvariable=self.workers_var, width=5)
+        self.workers_spin.grid(row=2, column=1, padx=10, pady=10, sticky="w")
+
         self.select_button = ttk.Button(self.main_frame, text="Select FLAC Files", command=self.select_files)
-        self.select_button.grid(row=1, column=0, columnspan=2, padx=10, pady=10)
+        self.select_button.grid(row=3, column=0, columnspan=2, padx=10, pady=10)
 
         self.file_list_frame = ttk.Frame(self.main_frame)
-        self.file_list_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10)
+        self.file_list_frame.grid(row=4, column=0, columnspan=2, padx=10, pady=10)
 
         self.file_listbox = tk.Listbox(self.file_list_frame, selectmode=tk.MULTIPLE, width=50)
         self.file_listbox.pack(side=tk.LEFT, fill=tk.BOTH)
@@ -32,40 +57,98 @@ class FLACVolumeAdjuster:
         self.file_listbox.config(yscrollcommand=self.scrollbar.set)
 
         self.adjust_button = ttk.Button(self.main_frame, text="Adjust Selected FLAC Volume", command=self.adjust_flac_volume)
-        self.adjust_button.grid(row=3, column=0, columnspan=2, padx=10, pady=10)
+        self.adjust_button.grid(row=5, column=0, padx=10, pady=10)
+
+        self.cancel_button = ttk.Button(self.main_frame, text="Cancel", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.grid(row=5, column=1, padx=10, pady=10)
+
+        self.progress = ttk.Progressbar(self.main_frame, mode="determinate", length=360)
+        self.progress.grid(row=6, column=0, columnspan=2, padx=10, pady=(0, 5))
+
+        self.status_label = ttk.Label(self.main_frame, text="Ready")
+        self.status_label.grid(row=7, column=0, columnspan=2, padx=10, pady=(0, 10))
+
+        self.job = None
+        self.errors = []
 
     def select_files(self):
         directory = filedialog.askdirectory()
         if directory:
             self.file_listbox.delete(0, tk.END)  # Clear the listbox
             for filename in os.listdir(directory):
-                if filename.endswith(".flac"):
+                if filename.lower().endswith(".flac"):
                     self.file_listbox.insert(tk.END, os.path.join(directory, filename))
 
     def adjust_flac_volume(self):
-        gain_value = self.gain_entry.get()
-        if not gain_value:
-            messagebox.showwarning("Input Error", "Please enter a gain value.")
+        if self.job is not None:
             return
+        mode = MODE_LABELS[self.mode_var.get()]
 
-        try:
-            gain_value = float(gain_value)
-        except ValueError:
-            messagebox.showwarning("Input Error", "Gain value must be a number.")
+        gain_value = self.gain_entry.get()
+        if mode == "replaygain":
+            gain_value = 0.0  # measured per file
+        elif not gain_value:
+            messagebox.showwarning("Input Error", "Please enter a gain value.")
             return
+        else:
+            try:
+                gain_value = float(gain_value)
+            except ValueError:
+                messagebox.showwarning("Input Error", "Gain value must be a number.")
+                return
 
         selected_indices = self.file_listbox.curselection()
         if not selected_indices:
             messagebox.showwarning("Selection Error", "Please select at least one FLAC file.")
             return
 
-        for index in selected_indices:
-            flac_file = self.file_listbox.get(index)
-            output_file = flac_file.replace(".flac", "_adjusted.flac")
-            # Run the FLAC command to adjust the volume
-            subprocess.run(["flac", "--gain", str(gain_value), "--output-file", output_file, flac_file])
+        try:
+            workers = max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            workers = None
+
+        paths = [self.file_listbox.get(index) for index in selected_indices]
+        # Each worker thread drives its own ffmpeg/mutagen call, so the pool
+        # size bounds the number of concurrent encoder processes
+        fn = partial(process_file, mode=mode, gain_db=gain_value)
+        self.job = BatchJob(paths, fn=fn, workers=workers, use_processes=False).start()
+        self.errors = []
+        self.progress.configure(maximum=max(1, len(paths)), value=0)
+        self.adjust_button.configure(state=tk.DISABLED)
+        self.cancel_button.configure(state=tk.NORMAL)
+        self.status_label.configure(text=f"Processing 0/{len(paths)}...")
+        self.root.after(100, self._poll_job)
+
+    def _poll_job(self):
+        job = self.job
+        finished = job.finished  # read before draining so no late result is missed
+        for index, result, error in job.drain():
+            if error:
+                self.errors.append(f"{os.path.basename(job.paths[index])}: {error}")
+        self.progress.configure(value=job.done)
+        self.status_label.configure(text=f"Processing {job.done}/{job.total}...")
+
+        if not finished:
+            self.root.after(100, self._poll_job)
+            return
 
-        messagebox.showinfo("Volume Adjustment", "Selected FLAC files adjusted successfully!")
+        self.job = None
+        self.adjust_button.configure(state=tk.NORMAL)
+        self.cancel_button.configure(state=tk.DISABLED)
+        done = job.done - len(self.errors)
+        summary = f"{done} of {job.total} file(s) adjusted"
+        if job.cancelled:
+            summary += " (cancelled)"
+        self.status_label.configure(text=summary)
+        if self.errors:
+            messagebox.showwarning("Volume Adjustment", summary + ".\n\nErrors:\n" + "\n".join(self.errors[:10]))
+        else:
+            messagebox.showinfo("Volume Adjustment", summary + ".")
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.status_label.configure(text="Cancelling...")
 
 if __name__ == "__main__":
     root = tk.Tk()
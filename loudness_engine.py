@@ -0,0 +1,93 @@
+"""
+Batch loudness analysis engine shared by mp3gain_gui.py and mp3gain_android.py.
+
+Files are decoded and measured concurrently in a worker pool. Results are
+queued and drained by the UI once per tick, so a 5,000-file job costs one
+widget refresh per tick instead of two list rebuilds per file.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+
+def default_workers():
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def analyze_file(path, sampled=False):
+    """EBU R128 loudness, true peak and RMS of one file (runs in a worker)"""
+    from loudness_r128 import analyze_track
+
+    return analyze_track(path, sampled=sampled)
+
+
+def measure_file(path, sampled=False):
+    """RMS and sample peak only; no scipy needed (used by the Android app)"""
+    from audio_stream import measure_levels
+
+    return measure_levels(path, sampled=sampled)
+
+
+class BatchJob:
+    """Runs `fn(path)` over `paths` in a pool on a background thread.
+
+    Call `drain()` from the UI tick to collect `(index, result, error)`
+    tuples finished since the last call; `done`/`total` give progress and
+    `finished` turns True once every task has completed or been cancelled.
+    """
+    def __init__(self, paths, fn=analyze_file, workers=None, use_processes=True):
+        self.paths = list(paths)
+        self.fn = fn
+        self.workers = workers or default_workers()
+        self.use_processes = use_processes
+        self.total = len(self.paths)
+        self.done = 0
+        self.finished = False
+        self._updates = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Drop queued files; files already being decoded still finish"""
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def drain(self):
+        updates = []
+        try:
+            while True:
+                updates.append(self._updates.get_nowait())
+        except queue.Empty:
+            pass
+        return updates
+
+    def _run(self):
+        executor_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        pool = executor_cls(max_workers=self.workers)
+        try:
+            futures = {pool.submit(self.fn, path): i for i, path in enumerate(self.paths)}
+            for future in as_completed(futures):
+                if self._cancel.is_set():
+                    break
+                index = futures[future]
+                try:
+                    self._updates.put((index, future.result(), None))
+                except Exception as e:
+                    self._updates.put((index, None, str(e)))
+                self.done += 1
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.finished = True
@@ -0,0 +1,188 @@
+"""
+EBU R128 / ReplayGain 2.0 loudness measurement (ITU-R BS.1770-4).
+
+Runs on the audio_stream block decoder: each block is K-weighted with a
+stateful biquad pair, reduced to 100 ms mean-square sub-blocks, and
+oversampled 4x for true peak, so one decode pass yields integrated
+loudness, true peak and the gated block list needed for album gain.
+"""
+import math
+
+import numpy as np
+from scipy.signal import resample_poly, sosfilt
+
+from audio_stream import BLOCK_FRAMES, LevelMeter, array_blocks, pcm_blocks, probe, sampled_blocks
+
+REFERENCE_LUFS = -18.0      # ReplayGain 2.0 reference level
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+TRUE_PEAK_OVERSAMPLE = 4
+_TP_HALO = 24               # input samples of context either side of the resampler
+
+
+def k_weighting_sos(sample_rate):
+    """Second-order sections of the BS.1770 pre-filter + RLB high-pass for any rate"""
+    # High-shelf (head effects)
+    f0, gain_db, q = 1681.974450955533, 3.999843853973347, 0.7071752369554196
+    k = math.tan(math.pi * f0 / sample_rate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = [(vh + vb * k / q + k * k) / a0,
+             2 * (k * k - vh) / a0,
+             (vh - vb * k / q + k * k) / a0,
+             1.0,
+             2 * (k * k - 1) / a0,
+             (1 - k / q + k * k) / a0]
+    # High-pass (RLB)
+    f0, q = 38.13547087602444, 0.5003270373238773
+    k = math.tan(math.pi * f0 / sample_rate)
+    a0 = 1 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0,
+                1.0,
+                2 * (k * k - 1) / a0,
+                (1 - k / q + k * k) / a0]
+    return np.array([shelf, highpass])
+
+
+def channel_weights(channels):
+    """BS.1770 channel gains; surround channels of a 5.1 layout count +1.5 dB"""
+    weights = np.ones(channels)
+    if channels == 6:
+        weights[3] = 0.0      # LFE is excluded
+        weights[4:] = 1.41
+    return weights
+
+
+def _loudness(power):
+    return -0.691 + 10 * np.log10(power) if power > 0 else -float('inf')
+
+
+def integrated_loudness(block_powers):
+    """Gated integrated loudness in LUFS from 400 ms block powers"""
+    powers = np.asarray(block_powers, dtype=np.float64)
+    powers = powers[powers > 0]
+    if not len(powers):
+        return -float('inf')
+    loudness = -0.691 + 10 * np.log10(powers)
+    powers = powers[loudness > ABSOLUTE_GATE_LUFS]
+    if not len(powers):
+        return -float('inf')
+    relative_gate = _loudness(powers.mean()) + RELATIVE_GATE_LU
+    gated = powers[-0.691 + 10 * np.log10(powers) > relative_gate]
+    return _loudness(gated.mean()) if len(gated) else -float('inf')
+
+
+class R128Meter:
+    """Streaming integrated-loudness and true-peak meter for one track"""
+    def __init__(self, sample_rate, channels):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.weights = channel_weights(channels)
+        self.sos = k_weighting_sos(sample_rate)
+        self.zi = np.zeros((len(self.sos), 2, channels))
+        self.step = int(round(0.1 * sample_rate))   # 100 ms sub-block
+        self.carry = np.zeros((0, channels))
+        self.sub_powers = []
+        self.tp_tail = np.zeros((2 * _TP_HALO, channels))
+        self.true_peak = 0.0
+
+    def update(self, block):
+        weighted, self.zi = sosfilt(self.sos, block, axis=0, zi=self.zi)
+        squares = np.concatenate((self.carry, weighted * weighted))
+        whole = len(squares) // self.step * self.step
+        if whole:
+            means = squares[:whole].reshape(-1, self.step, self.channels).mean(axis=1)
+            self.sub_powers.extend((means @ self.weights).tolist())
+        self.carry = squares[whole:]
+        self._update_true_peak(block)
+
+    def _update_true_peak(self, block):
+        # Prepend the previous block's tail so every sample is resampled with
+        # full filter context exactly once across block boundaries
+        x = np.concatenate((self.tp_tail, block))
+        if len(x) <= 2 * _TP_HALO:
+            self.tp_tail = x[-2 * _TP_HALO:]
+            return
+        up = resample_poly(x, TRUE_PEAK_OVERSAMPLE, 1, axis=0)
+        valid = up[_TP_HALO * TRUE_PEAK_OVERSAMPLE:(len(x) - _TP_HALO) * TRUE_PEAK_OVERSAMPLE]
+        if len(valid):
+            self.true_peak = max(self.true_peak, float(np.abs(valid).max()))
+        self.tp_tail = x[-2 * _TP_HALO:]
+
+    def block_powers(self):
+        """400 ms blocks with 75% overlap, built from the 100 ms sub-blocks"""
+        sub = np.asarray(self.sub_powers)
+        if len(sub) < 4:
+            return np.zeros(0)
+        return (sub[:-3] + sub[1:-2] + sub[2:-1] + sub[3:]) / 4
+
+    def finish(self):
+        self._update_true_peak(np.zeros((2 * _TP_HALO, self.channels)))
+        return self.block_powers()
+
+
+def _db(value):
+    return 20 * math.log10(value) if value > 0 else -float('inf')
+
+
+def analyze_track(path, sampled=False, block_frames=BLOCK_FRAMES, pcm=None, on_block=None):
+    """One decode pass: R128 loudness, true peak, RMS and ReplayGain track gain.
+
+    sampled=True measures only the audio_stream excerpts (approximate).
+    pcm=(array, sample_rate) measures already decoded audio instead.
+    on_block(block) sees every measured block, e.g. to keep the PCM.
+    """
+    if pcm is not None:
+        array, rate = pcm
+        info = {'sample_rate': rate, 'channels': array.shape[1]}
+    else:
+        info = probe(path)
+    meter = R128Meter(info['sample_rate'], info['channels'])
+    levels = LevelMeter(info['channels'])
+    if pcm is not None:
+        blocks = array_blocks(pcm[0], block_frames)
+    elif sampled:
+        blocks = sampled_blocks(path, block_frames=block_frames)
+    else:
+        blocks = pcm_blocks(path, info['sample_rate'], info['channels'], block_frames)
+    for block in blocks:
+        meter.update(block)
+        levels.update(block)
+        if on_block is not None:
+            on_block(block)
+    powers = meter.finish()
+    lufs = integrated_loudness(powers)
+    # Keep only blocks that can pass the absolute gate; that's all the album needs
+    album_blocks = powers[powers > 10 ** ((ABSOLUTE_GATE_LUFS + 0.691) / 10)].astype(np.float32)
+    return {
+        'lufs': lufs,
+        'true_peak': meter.true_peak,
+        'true_peak_db': _db(meter.true_peak),
+        'track_gain': REFERENCE_LUFS - lufs if math.isfinite(lufs) else 0.0,
+        'rms_db': levels.rms_db(),
+        'peak_db': levels.peak_db(),
+        'duration': levels.frames / info['sample_rate'],
+        'block_powers': album_blocks,
+        'sampled': sampled,
+    }
+
+
+def album_loudness(results):
+    """Album LUFS, gain and peak from analyze_track results (gated jointly, not averaged)"""
+    results = [r for r in results if r is not None]
+    if not results:
+        return {'lufs': -float('inf'), 'album_gain': 0.0, 'true_peak': 0.0}
+    lufs = integrated_loudness(np.concatenate([r['block_powers'] for r in results]))
+    return {
+        'lufs': lufs,
+        'album_gain': REFERENCE_LUFS - lufs if math.isfinite(lufs) else 0.0,
+        'true_peak': max(r['true_peak'] for r in results),
+    }
+
+
+def safe_gain(gain_db, true_peak, ceiling_db=-1.0):
+    """Limit a gain so the true peak stays under ceiling_db dBTP"""
+    if true_peak <= 0:
+        return gain_db
+    return min(gain_db, ceiling_db - _db(true_peak))
@@ -1,38 +1,14 @@
 import librosa
-import numpy as np
-from music21 import stream, note, tempo, meter, midi
+from music21 import stream, midi
+from note_extraction import analyze, extract_notes, to_stream
 
 def audio_to_notes(y, sr):
-    onset_env = librosa.onset.onset_strength(y=y, sr=sr)
-    tempo_val, _beats = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr)
-    notes = []
-
-    pitches, _magnitudes = librosa.piptrack(y=y, sr=sr)
-
-    for onset in librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr):
-        start = onset
-        end = start + 1
-        pitch = pitches[:, start:end].flatten()
-        pitch = pitch[pitch > 0]
-
-        if len(pitch) > 0:
-            pitch_midi = np.median(librosa.hz_to_midi(pitch))
-            notes.append(pitch_midi)
-    
-    return notes, tempo_val
+    features = analyze(y, sr)
+    return extract_notes(features), features.tempo
 
 def notes_to_midi(notes, tempo_val):
     s = stream.Score()
-    part = stream.Part()
-    part.append(tempo.MetronomeMark(number=tempo_val))
-    part.append(meter.TimeSignature('4/4'))
-    
-    for pitch in notes:
-        if pitch > 0:
-            part.append(note.Note(pitch))
-        else:
-            part.append(note.Rest(quarterLength=0.5))
-    
+    part = to_stream(notes, time_signature='4/4', part=True)
     s.append(part)
     
     # Write to MIDI file
@@ -41,12 +17,13 @@ def notes_to_midi(notes, tempo_val):
     mf.write()
     mf.close()
 
-# Load the audio file
-filename = 'endless_rain.mp3'
-y, sr = librosa.load(filename)
+if __name__ == "__main__":
+    # Load the audio file
+    filename = 'endless_rain.mp3'
+    y, sr = librosa.load(filename)
 
-# Extract notes
-notes, tempo_val = audio_to_notes(y, sr)
+    # Extract notes
+    notes, tempo_val = audio_to_notes(y, sr)
 
-# Convert notes to MIDI
-notes_to_midi(notes, tempo_val)
+    # Convert notes to MIDI
+    notes_to_midi(notes, tempo_val)
@@ -0,0 +1,220 @@
+"""
+Lossless MP3 gain adjustment, the way MP3Gain does it.
+
+Every Layer III granule carries an 8-bit global_gain field in the frame's
+side information; one step is 1.5 dB. Editing that byte pair in place
+through mmap changes the decoded volume with no decode/re-encode, keeps
+every tag, and runs at disk speed. The applied change is stored in the
+APEv2 tag (MP3GAIN_UNDO / MP3GAIN_MINMAX, same format as MP3Gain) so it
+can be undone.
+"""
+import mmap
+import os
+
+GAIN_STEP_DB = 1.5
+
+# [version][index] in kbit/s and Hz; version bits: 3 = MPEG1, 2 = MPEG2, 0 = MPEG2.5
+_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_BITRATES[0] = _BITRATES[2]
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+def db_to_steps(gain_db):
+    return int(round(gain_db / GAIN_STEP_DB))
+
+
+def parse_header(data, offset):
+    """Decode a Layer III frame header at offset, or None if it isn't one"""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x3
+    layer = (b1 >> 1) & 0x3
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None  # reserved, not Layer III, free-format or bad
+    mpeg1 = version == 3
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    bitrate = _BITRATES[version][bitrate_index] * 1000
+    padding = (b2 >> 1) & 0x1
+    size = (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+    channels = 1 if (b3 >> 6) == 3 else 2
+    return {
+        'mpeg1': mpeg1,
+        'size': size,
+        'channels': channels,
+        'crc': not (b1 & 0x1),
+        'sample_rate': sample_rate,
+    }
+
+
+def _gain_bit_offsets(header):
+    """Bit offsets of every global_gain field relative to the side info start"""
+    channels = header['channels']
+    if header['mpeg1']:
+        start = 9 + (5 if channels == 1 else 3) + 4 * channels
+        granules, granule_bits = 2, 59
+    else:
+        start = 8 + (1 if channels == 1 else 2)
+        granules, granule_bits = 1, 63
+    return [start + (gr * channels + ch) * granule_bits
+            for gr in range(granules) for ch in range(channels)]
+
+
+def _get_bits(data, bitpos, n):
+    byte = bitpos >> 3
+    word = int.from_bytes(data[byte:byte + 3], 'big')
+    return (word >> (24 - (bitpos & 7) - n)) & ((1 << n) - 1)
+
+
+def _set_byte_field(data, bitpos, value):
+    """Write an 8-bit field that starts at an arbitrary bit position"""
+    byte = bitpos >> 3
+    shift = 16 - (bitpos & 7) - 8
+    word = int.from_bytes(data[byte:byte + 2], 'big')
+    word = (word & ~(0xFF << shift)) | (value << shift)
+    data[byte:byte + 2] = word.to_bytes(2, 'big')
+
+
+def _audio_bounds(data):
+    """Byte range between a leading ID3v2 tag and trailing APE/ID3v1 tags"""
+    start, end = 0, len(data)
+    if data[:3] == b"ID3" and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size + (10 if data[5] & 0x10 else 0)
+    if end >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    if end >= 32 and data[end - 32:end - 24] == b"APETAGEX":
+        tag_size = int.from_bytes(data[end - 20:end - 16], 'little')
+        flags = int.from_bytes(data[end - 12:end - 8], 'little')
+        end -= tag_size + (32 if flags & 0x80000000 else 0)
+    return start, max(start, end)
+
+
+def iter_frames(data):
+    """Yield (offset, header) for each Layer III frame, resyncing after junk"""
+    offset, end = _audio_bounds(data)
+    locked = False
+    while offset + 4 <= end:
+        header = parse_header(data, offset)
+        if header is not None and not locked:
+            # Require a second header right behind the first to avoid false syncs
+            follow = offset + header['size']
+            locked = follow >= end or parse_header(data, follow) is not None
+            if not locked:
+                header = None
+        if header is None:
+            locked = False
+            offset = data.find(b"\xff", offset + 1, end)
+            if offset < 0:
+                return
+            continue
+        if offset + header['size'] > end:
+            return
+        yield offset, header
+        offset += header['size']
+
+
+def gain_fields(data):
+    """Bit positions and values of every audible global_gain field"""
+    positions = []
+    values = []
+    for offset, header in iter_frames(data):
+        side_info = (offset + 4 + (2 if header['crc'] else 0)) * 8
+        for rel in _gain_bit_offsets(header):
+            # part2_3_length == 0 means no coded data (e.g. a Xing/Info frame)
+            if _get_bits(data, side_info + rel, 12) == 0:
+                continue
+            pos = side_info + rel + 21
+            positions.append(pos)
+            values.append(_get_bits(data, pos, 8))
+    return positions, values
+
+
+def read_undo(path):
+    """Steps previously applied by this module (or MP3Gain), 0 if none"""
+    from mutagen.apev2 import APEv2, APENoHeaderError
+
+    try:
+        tag = APEv2(path)
+    except APENoHeaderError:
+        return 0
+    if "MP3GAIN_UNDO" not in tag:
+        return 0
+    # MP3Gain format: "+002,+002,N" (left, right, wrapped)
+    return -int(str(tag["MP3GAIN_UNDO"]).split(",")[0])
+
+
+def _write_undo(path, applied_steps, min_gain, max_gain):
+    from mutagen.apev2 import APEv2, APENoHeaderError
+
+    try:
+        tag = APEv2(path)
+    except APENoHeaderError:
+        tag = APEv2()
+    if applied_steps:
+        undo = -applied_steps
+        tag["MP3GAIN_UNDO"] = f"{undo:+04d},{undo:+04d},N"
+        tag["MP3GAIN_MINMAX"] = f"{min_gain:03d},{max_gain:03d}"
+    else:
+        for key in ("MP3GAIN_UNDO", "MP3GAIN_MINMAX"):
+            if key in tag:
+                del tag[key]
+    tag.save(path)
+
+
+def apply_gain(path, steps, write_undo=True):
+    """Shift every global_gain in `path` by `steps` (1.5 dB each), in place.
+
+    The step count is limited so no field leaves 0..255 (which would wrap
+    instead of clip). Returns {'frames', 'steps', 'requested', 'min', 'max'}.
+    """
+    steps = int(steps)
+    with open(path, "r+b") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{os.path.basename(path)} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as data:
+            positions, values = gain_fields(data)
+            if not positions:
+                raise ValueError(f"{os.path.basename(path)}: no MPEG Layer III frames found")
+            lo, hi = min(values), max(values)
+            applied = max(-lo, min(255 - hi, steps))
+            if applied:
+                for pos, value in zip(positions, values):
+                    _set_byte_field(data, pos, value + applied)
+                data.flush()
+
+    if write_undo and applied:
+        _write_undo(path, read_undo(path) + applied, lo + applied, hi + applied)
+    return {
+        'frames': len(positions),
+        'steps': applied,
+        'requested': steps,
+        'min': lo + applied,
+        'max': hi + applied,
+    }
+
+
+def apply_gain_db(path, gain_db, write_undo=True):
+    """Apply the nearest multiple of 1.5 dB to gain_db; returns apply_gain's dict plus 'gain_db'"""
+    result = apply_gain(path, db_to_steps(gain_db), write_undo)
+    result['gain_db'] = result['steps'] * GAIN_STEP_DB
+    return result
+
+
+def undo_gain(path):
+    """Revert all gain changes recorded in the APEv2 tag; returns steps removed"""
+    previous = read_undo(path)
+    if previous:
+        apply_gain(path, -previous, write_undo=True)
+    return previous
@@ -1,5 +1,6 @@
 import os
 import threading
+import time
 import math
 from pathlib import Path
 
@@ -33,6 +34,9 @@ except ImportError:
     AudioSegment = None
     print("Pydub not found. Please install pydub.")
 
+from loudness_engine import BatchJob, default_workers, measure_file
+from analysis_cache import AnalysisCache
+
 # Theme Colors (Hacker Theme)
 BG_DARK = [0.04, 0.05, 0.15, 1]      # #0a0e27
 BG_MEDIUM = [0.08, 0.11, 0.24, 1]    # #151b3d
@@ -91,6 +95,8 @@ class MP3GainAndroid(App):
     def build(self):
         self.files = [] # List of dicts: {'path': str, 'rms': float, 'status': str}
         self.processing = False
+        self.job = None
+        self.cache = AnalysisCache(Path(self.user_data_dir) / "analysis.db")
         
         # Main Layout
         main_layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
@@ -143,6 +149,15 @@ class MP3GainAndroid(App):
         btn_normalize.bind(on_release=self.start_normalization)
         controls.add_widget(btn_normalize)
         
+        btn_cancel = Button(
+            text="Cancel",
+            background_color=WARNING_RED,
+            color=BG_DARK,
+            bold=True
+        )
+        btn_cancel.bind(on_release=self.cancel_job)
+        controls.add_widget(btn_cancel)
+        
         main_layout.add_widget(controls)
         
         # Target Volume Slider
@@ -267,22 +282,49 @@ class MP3GainAndroid(App):
              self.processing = False
              return
 
-        total = len(self.files)
-        for i, f in enumerate(self.files):
-            self.update_file_status(i, "Analyzing...")
-            try:
-                audio = AudioSegment.from_mp3(f['path'])
-                rms_db = self._calculate_rms_db(audio)
-                self.update_file_status(i, "Analyzed", rms=rms_db)
-            except Exception as e:
-                print(f"Error analyzing {f['path']}: {e}")
-                self.update_file_status(i, "Error")
-            
-            self.update_progress((i + 1) / total * 100)
+        paths = [f['path'] for f in self.files]
+        cached = self.cache.lookup_many(paths, "levels")
+        if cached:
+            self.apply_analysis_updates(
+                [(i, cached[p], None) for i, p in enumerate(paths) if p in cached], 0)
+            self.log(f"{len(cached)} file(s) unchanged, using cached results")
+        pending = [i for i, p in enumerate(paths) if p not in cached]
         
-        self.log("Analysis complete.")
+        # Threads, not processes: multiprocessing is unreliable on Android.
+        # ffmpeg does the decoding in its own process either way.
+        self.job = BatchJob([paths[i] for i in pending], fn=measure_file,
+                            workers=default_workers(), use_processes=False).start()
+        while True:
+            finished = self.job.finished
+            updates = [(pending[j], result, error) for j, result, error in self.job.drain()]
+            if updates:
+                self.cache.store_many([(paths[i], r) for i, r, e in updates if not e], "levels")
+                self.apply_analysis_updates(updates, self.job.done / max(1, self.job.total) * 100)
+            if finished:
+                break
+            time.sleep(0.25)  # one coalesced UI update per tick
+        
+        self.log("Analysis cancelled." if self.job.cancelled else "Analysis complete.")
+        self.job = None
         self.processing = False
 
+    @mainthread
+    def apply_analysis_updates(self, updates, progress):
+        for index, result, error in updates:
+            if error:
+                print(f"Error analyzing {self.files[index]['path']}: {error}")
+                self.files[index]['status'] = "Error"
+            else:
+                self.files[index]['status'] = "Analyzed"
+                self.files[index]['rms'] = result['rms_db']
+        self.update_file_list_ui()
+        self.progress.value = progress
+
+    def cancel_job(self, instance):
+        if self.job and not self.job.finished:
+            self.job.cancel()
+            self.log("Cancelling...")
+
     def start_normalization(self, instance):
         if self.processing:
             return
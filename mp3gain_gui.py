@@ -13,6 +13,7 @@ import threading
 from pathlib import Path
 from typing import List, Tuple
 import math
+from functools import partial
 
 # Setup local ffmpeg path
 SCRIPT_DIR = Path(__file__).parent
@@ -29,6 +30,15 @@ except ImportError:
     print("Error: pydub not installed. Run: pip install pydub")
     exit(1)
 
+from loudness_engine import BatchJob, default_workers
+from loudness_r128 import REFERENCE_LUFS, album_loudness, safe_gain
+from mp3_gain_edit import apply_gain_db, undo_gain, GAIN_STEP_DB
+from analysis_cache import AnalysisCache
+from pcm_cache import PCMCache, analyze_for_normalize, encode_file_with_gain, encode_with_gain
+from fingerprint_index import get_index, level_matched
+from tag_service import (GAIN_KEY_PREFIXES, copy_tags, read_many, replaygain_values,
+                         strip_loudness_tags, write_many)
+
 
 class HackerTheme:
     """Color and style constants for the hacker theme"""
@@ -57,10 +67,21 @@ class MP3GainGUI:
         self.root.configure(bg=HackerTheme.BG_DARK)
         self.root.resizable(True, True)
         
-        # File list: (filepath, rms_db, target_volume, status)
+        # File list: [filepath, loudness result, gain_db, status]
         self.files = []
-        self.target_volume = tk.DoubleVar(value=100.0)
+        self.target_lufs = tk.DoubleVar(value=REFERENCE_LUFS)
+        self.album_mode = tk.BooleanVar(value=False)
+        self.workers = tk.IntVar(value=default_workers())
+        self.fast_scan = tk.BooleanVar(value=False)
+        self.write_tags = tk.BooleanVar(value=False)
+        self.skip_duplicates = tk.BooleanVar(value=False)
+        self.keep_pcm = tk.BooleanVar(value=False)
+        self.duplicates = {}
+        self.cache = AnalysisCache()
+        # PCM kept by analysis when "Keep PCM" is on, reused by normalize (disk-capped)
+        self.pcm = PCMCache()
         self.processing = False
+        self.job = None
         
         self._create_widgets()
         self._apply_hacker_styles()
@@ -156,13 +177,120 @@ class MP3GainGUI:
         )
         self.btn_normalize.pack(side=tk.LEFT, padx=5)
         
+        self.btn_undo = tk.Button(
+            control_frame,
+            text="[ UNDO GAIN ]",
+            command=self.undo_files,
+            font=HackerTheme.FONT_BUTTON,
+            bg=HackerTheme.BG_LIGHT,
+            fg=HackerTheme.CYBER_CYAN,
+            activebackground=HackerTheme.CYBER_CYAN,
+            activeforeground=HackerTheme.BG_DARK,
+            relief=tk.FLAT,
+            padx=15,
+            pady=8,
+            cursor="hand2"
+        )
+        self.btn_undo.pack(side=tk.LEFT, padx=5)
+        
+        self.btn_cancel = tk.Button(
+            control_frame,
+            text="[ CANCEL ]",
+            command=self.cancel_job,
+            font=HackerTheme.FONT_BUTTON,
+            bg=HackerTheme.BG_LIGHT,
+            fg=HackerTheme.WARNING_RED,
+            activebackground=HackerTheme.WARNING_RED,
+            activeforeground=HackerTheme.BG_DARK,
+            relief=tk.FLAT,
+            padx=15,
+            pady=8,
+            cursor="hand2"
+        )
+        self.btn_cancel.pack(side=tk.LEFT, padx=5)
+        
+        workers_label = tk.Label(
+            control_frame,
+            text="Workers:",
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_DARK,
+            fg=HackerTheme.CYBER_CYAN
+        )
+        workers_label.pack(side=tk.LEFT, padx=(15, 5))
+        
+        self.workers_spin = tk.Spinbox(
+            control_frame,
+            from_=1,
+            to=max(1, os.cpu_count() or 1) * 2,
+            width=4,
+            textvariable=self.workers,
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_LIGHT,
+            fg=HackerTheme.MATRIX_GREEN,
+            buttonbackground=HackerTheme.BG_MEDIUM,
+            relief=tk.FLAT
+        )
+        self.workers_spin.pack(side=tk.LEFT)
+        
+        fast_check = tk.Checkbutton(
+            control_frame,
+            text="Fast scan",
+            variable=self.fast_scan,
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_DARK,
+            fg=HackerTheme.CYBER_CYAN,
+            selectcolor=HackerTheme.BG_LIGHT,
+            activebackground=HackerTheme.BG_DARK,
+            activeforeground=HackerTheme.MATRIX_GREEN
+        )
+        fast_check.pack(side=tk.LEFT, padx=(15, 0))
+        
+        tags_check = tk.Checkbutton(
+            control_frame,
+            text="Write RG tags",
+            variable=self.write_tags,
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_DARK,
+            fg=HackerTheme.CYBER_CYAN,
+            selectcolor=HackerTheme.BG_LIGHT,
+            activebackground=HackerTheme.BG_DARK,
+            activeforeground=HackerTheme.MATRIX_GREEN
+        )
+        tags_check.pack(side=tk.LEFT, padx=(5, 0))
+        
+        keep_check = tk.Checkbutton(
+            control_frame,
+            text="Keep PCM",
+            variable=self.keep_pcm,
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_DARK,
+            fg=HackerTheme.CYBER_CYAN,
+            selectcolor=HackerTheme.BG_LIGHT,
+            activebackground=HackerTheme.BG_DARK,
+            activeforeground=HackerTheme.MATRIX_GREEN
+        )
+        keep_check.pack(side=tk.LEFT, padx=(5, 0))
+        
+        dupes_check = tk.Checkbutton(
+            control_frame,
+            text="Skip duplicates",
+            variable=self.skip_duplicates,
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_DARK,
+            fg=HackerTheme.CYBER_CYAN,
+            selectcolor=HackerTheme.BG_LIGHT,
+            activebackground=HackerTheme.BG_DARK,
+            activeforeground=HackerTheme.MATRIX_GREEN
+        )
+        dupes_check.pack(side=tk.LEFT, padx=(5, 0))
+        
         # Target volume slider frame
         slider_frame = tk.Frame(self.root, bg=HackerTheme.BG_MEDIUM)
         slider_frame.pack(fill=tk.X, padx=10, pady=10)
         
         slider_label = tk.Label(
             slider_frame,
-            text="Target Volume:",
+            text="Target Loudness:",
             font=HackerTheme.FONT_MAIN,
             bg=HackerTheme.BG_MEDIUM,
             fg=HackerTheme.CYBER_CYAN
@@ -172,24 +300,25 @@ class MP3GainGUI:
         # Create formatted label for percentage display
         self.target_label = tk.Label(
             slider_frame,
-            text=f"{self.target_volume.get():.0f}%",
+            text=f"{self.target_lufs.get():.1f} LUFS",
             font=HackerTheme.FONT_MAIN,
             bg=HackerTheme.BG_MEDIUM,
             fg=HackerTheme.MATRIX_GREEN,
-            width=8
+            width=10
         )
         self.target_label.pack(side=tk.LEFT, padx=5)
         
-        # Update label when slider changes
-        self.target_volume.trace('w', lambda *args: self.target_label.config(text=f"{self.target_volume.get():.0f}%"))
+        # Update label and per-file gains when the target changes
+        self.target_lufs.trace('w', lambda *args: self._on_target_changed())
+        self.album_mode.trace('w', lambda *args: self._on_target_changed())
         
         self.slider = tk.Scale(
             slider_frame,
-            from_=0.0,
-            to=200.0,
-            resolution=1.0,
+            from_=-30.0,
+            to=-6.0,
+            resolution=0.5,
             orient=tk.HORIZONTAL,
-            variable=self.target_volume,
+            variable=self.target_lufs,
             font=HackerTheme.FONT_MAIN,
             bg=HackerTheme.BG_LIGHT,
             fg=HackerTheme.MATRIX_GREEN,
@@ -201,6 +330,19 @@ class MP3GainGUI:
         )
         self.slider.pack(side=tk.LEFT, padx=10, fill=tk.X, expand=True)
         
+        album_check = tk.Checkbutton(
+            slider_frame,
+            text="Album gain",
+            variable=self.album_mode,
+            font=HackerTheme.FONT_MAIN,
+            bg=HackerTheme.BG_MEDIUM,
+            fg=HackerTheme.CYBER_CYAN,
+            selectcolor=HackerTheme.BG_LIGHT,
+            activebackground=HackerTheme.BG_MEDIUM,
+            activeforeground=HackerTheme.MATRIX_GREEN
+        )
+        album_check.pack(side=tk.LEFT, padx=10)
+        
         # File list frame
         list_frame = tk.Frame(self.root, bg=HackerTheme.BG_DARK)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -221,19 +363,19 @@ class MP3GainGUI:
         
         self.tree = ttk.Treeview(
             tree_frame,
-            columns=("filename", "rms", "target", "status"),
+            columns=("filename", "loudness", "gain", "status"),
             show="headings",
             height=10
         )
         
         self.tree.heading("filename", text="Filename")
-        self.tree.heading("rms", text="Current RMS (dB)")
-        self.tree.heading("target", text="Target Volume (%)")
+        self.tree.heading("loudness", text="Loudness (LUFS / dBTP)")
+        self.tree.heading("gain", text="Gain (dB)")
         self.tree.heading("status", text="Status")
         
         self.tree.column("filename", width=350)
-        self.tree.column("rms", width=150, anchor=tk.CENTER)
-        self.tree.column("target", width=150, anchor=tk.CENTER)
+        self.tree.column("loudness", width=180, anchor=tk.CENTER)
+        self.tree.column("gain", width=120, anchor=tk.CENTER)
         self.tree.column("status", width=200, anchor=tk.CENTER)
         
         scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
@@ -400,7 +542,7 @@ class MP3GainGUI:
             for filepath in files:
                 # Check if file already in list
                 if not any(f[0] == filepath for f in self.files):
-                    self.files.append([filepath, None, self.target_volume.get(), "Pending"])
+                    self.files.append([filepath, None, None, "Pending"])
                     added_count += 1
             
             self.log(f"> Added {added_count} file(s) to queue")
@@ -412,13 +554,46 @@ class MP3GainGUI:
         for item in self.tree.get_children():
             self.tree.delete(item)
         
-        # Add all files
-        for filepath, rms, target, status in self.files:
-            filename = os.path.basename(filepath)
-            rms_str = f"{rms:.1f}" if rms is not None else "Not analyzed"
-            target_str = f"{target:.0f}%"
-            
-            self.tree.insert("", tk.END, values=(filename, rms_str, target_str, status))
+        # Add all files (row iid = index into self.files)
+        for idx, file_data in enumerate(self.files):
+            self.tree.insert("", tk.END, iid=str(idx), values=self._row_values(file_data))
+    
+    def _row_values(self, file_data):
+        filepath, result, gain, status = file_data
+        filename = os.path.basename(filepath)
+        if result is None:
+            loudness_str = "Not analyzed"
+        else:
+            loudness_str = f"{result['lufs']:.1f} / {result['true_peak_db']:.1f}"
+        gain_str = f"{gain:+.1f}" if gain is not None else "--"
+        return (filename, loudness_str, gain_str, status)
+    
+    def _refresh_rows(self, indices):
+        """Update only the given rows instead of rebuilding the list"""
+        for idx in indices:
+            if self.tree.exists(str(idx)):
+                self.tree.item(str(idx), values=self._row_values(self.files[idx]))
+    
+    def _on_target_changed(self):
+        self.target_label.config(text=f"{self.target_lufs.get():.1f} LUFS")
+        self._recompute_gains()
+    
+    def _recompute_gains(self):
+        """Derive each file's gain from its measured loudness and the target"""
+        analyzed = [i for i, f in enumerate(self.files) if f[1] is not None]
+        if not analyzed:
+            return
+        offset = self.target_lufs.get() - REFERENCE_LUFS
+        album = album_loudness([self.files[i][1] for i in analyzed]) if self.album_mode.get() else None
+        for i in analyzed:
+            result = self.files[i][1]
+            if album is not None:
+                gain, peak = album['album_gain'], album['true_peak']
+            else:
+                gain, peak = result['track_gain'], result['true_peak']
+            # Never push the true peak past -1 dBTP
+            self.files[i][2] = safe_gain(gain + offset, peak)
+        self._refresh_rows(analyzed)
     
     def remove_selected(self):
         """Remove selected files from the list"""
@@ -458,53 +633,175 @@ class MP3GainGUI:
             self.log("> Analysis already in progress")
             return
         
-        # Run analysis in background thread
-        thread = threading.Thread(target=self._analyze_worker, daemon=True)
-        thread.start()
-    
-    def _analyze_worker(self):
-        """Background worker for analyzing files"""
-        self.processing = True
-        self.log("> Starting analysis...")
+        try:
+            workers = max(1, int(self.workers.get()))
+        except (tk.TclError, ValueError):
+            workers = None
         
-        total = len(self.files)
+        self.processing = True
+        sampled = self.fast_scan.get()
+        self.cache_kind = "r128-sampled" if sampled else "r128"
         
-        for idx, file_data in enumerate(self.files):
-            filepath = file_data[0]
-            filename = os.path.basename(filepath)
+        if self.skip_duplicates.get():
+            # Fingerprinting decodes every new file, so keep it off the Tk thread
+            self.log("> Fingerprinting to find the same song stored more than once...")
+            paths = [f[0] for f in self.files]
             
-            # Update status
-            file_data[3] = "Analyzing..."
-            self.root.after(0, self.update_file_list)
+            def find_duplicates():
+                try:
+                    found = get_index().duplicates(paths, workers=workers)
+                    # Same song is not same level: a copy normalized earlier must be measured
+                    dupes = level_matched(found, workers=workers)
+                    if len(dupes) < len(found):
+                        self.log(f"> {len(found) - len(dupes)} duplicate(s) differ in level; "
+                                 "analyzing those separately")
+                except Exception as e:
+                    self.log(f"> Duplicate check failed: {e}")
+                    dupes = {}
+                self.root.after(0, lambda: self._start_analysis(workers, sampled, dupes))
             
-            self.log(f"> Analyzing: {filename}")
-            
-            try:
-                # Load audio file
-                audio = AudioSegment.from_mp3(filepath)
-                
-                # Calculate RMS in dB
-                rms_db = self._calculate_rms_db(audio)
-                
-                # Update file data
-                file_data[1] = rms_db
-                file_data[2] = self.target_volume.get()
-                file_data[3] = "Analyzed ✓"
-                
-                self.log(f"  Current level: {rms_db:.1f} dB")
-                
-            except Exception as e:
-                self.log(f"  Error: {str(e)}")
+            threading.Thread(target=find_duplicates, daemon=True).start()
+        else:
+            self._start_analysis(workers, sampled, {})
+    
+    def _start_analysis(self, workers, sampled, dupes):
+        # {duplicate row path: canonical row path}; the index works on absolute paths
+        by_abs = {os.path.abspath(f[0]): f[0] for f in self.files}
+        self.duplicates = {by_abs[d]: by_abs[c] for d, c in dupes.items()
+                           if d in by_abs and c in by_abs}
+        if self.duplicates:
+            self.log(f"> {len(self.duplicates)} duplicate(s) will reuse another copy's analysis")
+        
+        # Unchanged files come straight from the cache
+        cached = self.cache.lookup_many([f[0] for f in self.files], self.cache_kind)
+        self.job_indices = []
+        for idx, file_data in enumerate(self.files):
+            if file_data[0] in cached:
+                file_data[1] = cached[file_data[0]]
+                file_data[3] = "Cached ✓"
+            elif file_data[0] in self.duplicates:
+                file_data[3] = "Duplicate"
+            else:
+                file_data[3] = "Queued"
+                self.job_indices.append(idx)
+        self.update_file_list()
+        if cached:
+            self.log(f"> {len(cached)} file(s) unchanged since last analysis (cached)")
+        
+        mode = "sampled" if sampled else "full"
+        self.log(f"> Starting {mode} analysis of {len(self.job_indices)} file(s) "
+                 f"({workers or 'auto'} workers)...")
+        
+        # Only keep decoded PCM when a normalize run is planned; otherwise stream only
+        spill_dir = self.pcm.spill_dir if self.keep_pcm.get() else None
+        fn = partial(analyze_for_normalize, spill_dir=spill_dir, sampled=sampled)
+        paths = [self.files[i][0] for i in self.job_indices]
+        self.job = BatchJob(paths, fn=fn, workers=workers).start()
+        self.root.after(100, self._poll_analysis)
+    
+    def _poll_analysis(self):
+        """One coalesced UI update per tick while an analysis job runs"""
+        job = self.job
+        finished = job.finished  # read before draining so no late result is missed
+        changed = []
+        lines = []
+        fresh = []
+        for job_idx, result, error in job.drain():
+            idx = self.job_indices[job_idx]
+            file_data = self.files[idx]
+            filename = os.path.basename(file_data[0])
+            if error:
                 file_data[3] = "Error ✗"
-            
-            # Update progress
-            progress = ((idx + 1) / total) * 100
-            self.root.after(0, self._update_progress, progress)
-            self.root.after(0, self.update_file_list)
+                lines.append(f"> {filename}: Error: {error}")
+            else:
+                if 'pcm_file' in result:
+                    self.pcm.adopt(file_data[0], result.pop('pcm_file'), result.pop('pcm_rate'),
+                                   result.pop('pcm_frames'))
+                file_data[1] = result
+                file_data[3] = "Analyzed ✓"
+                fresh.append((file_data[0], result))
+                lines.append(f"> {filename}: {result['lufs']:.1f} LUFS, "
+                             f"peak {result['true_peak_db']:.1f} dBTP")
+            changed.append(idx)
+        
+        if fresh:
+            self.cache.store_many(fresh, self.cache_kind)
+        if changed:
+            self._refresh_rows(changed)
+            self.log("\n".join(lines))
+            self._update_progress(job.done / job.total * 100 if job.total else 100)
+        
+        if not finished:
+            self.root.after(100, self._poll_analysis)
+            return
         
-        self.log("> Analysis complete!")
+        if job.cancelled:
+            for idx, file_data in enumerate(self.files):
+                if file_data[3] == "Queued":
+                    file_data[3] = "Cancelled"
+            self.update_file_list()
+            self.log(f"> Analysis cancelled ({job.done}/{job.total} done)")
+        else:
+            self.log("> Analysis complete!")
+        self._fill_duplicates()
+        self._recompute_gains()
+        album = None
+        if self.album_mode.get():
+            album = album_loudness([f[1] for f in self.files if f[1] is not None])
+            self.log(f"> Album: {album['lufs']:.1f} LUFS")
+        self.job = None
+        self._update_progress(0)
+        if self.write_tags.get() and not self.fast_scan.get():
+            analyzed = [(f[0], f[1]) for f in self.files if f[1] is not None]
+            threading.Thread(target=self._tag_worker, args=(analyzed, album), daemon=True).start()
+        else:
+            self.processing = False
+    
+    def _fill_duplicates(self):
+        """Give each duplicate row the measurement of the copy that was analyzed"""
+        results = {f[0]: f[1] for f in self.files}
+        filled = []
+        for idx, file_data in enumerate(self.files):
+            original = self.duplicates.get(file_data[0])
+            if original is None or file_data[1] is not None:
+                continue
+            if results.get(original) is not None:
+                file_data[1] = dict(results[original])
+                file_data[3] = f"Dup of {os.path.basename(original)}"
+                filled.append(idx)
+        if filled:
+            self._refresh_rows(filled)
+    
+    def _tag_worker(self, analyzed, album):
+        """Write ReplayGain tags where they differ, then re-key the cache to the new mtimes"""
+        results = dict(analyzed)
+        wanted = {path: replaygain_values(result, album) for path, result in analyzed}
+        # Files whose tags already match (e.g. cache hits tagged last run) are left alone,
+        # so their mtimes and cache entries stay valid
+        stale = [path for path, tags, error in read_many(wanted)
+                 if error or any(tags.get(key) != [value] for key, value in wanted[path].items())]
+        if not stale:
+            self.log("> ReplayGain tags already up to date")
+            self.processing = False
+            return
+        self.log(f"> Writing ReplayGain tags to {len(stale)} file(s)...")
+        written = []
+        for path, ok, error in write_many((path, wanted[path]) for path in stale):
+            if error:
+                self.log(f"> {os.path.basename(path)}: tag error: {error}")
+            elif ok:
+                written.append((path, results[path]))
+        self.cache.store_many(written, self.cache_kind)
+        self.log(f"> Tagged {len(written)} file(s)")
         self.processing = False
-        self.root.after(0, self._update_progress, 0)
+    
+    def cancel_job(self):
+        """Cancel the running analysis job"""
+        if self.job and not self.job.finished:
+            self.job.cancel()
+            self.log("> Cancelling...")
+        else:
+            self.log("> Nothing to cancel")
     
     def normalize_files(self):
         """Normalize all analyzed files"""
@@ -525,22 +822,51 @@ class MP3GainGUI:
             return
         
         # Run normalization in background thread
-        thread = threading.Thread(target=self._normalize_worker, daemon=True)
+        # Tk variables are read here on the main thread, never in the worker
+        thread = threading.Thread(target=self._normalize_worker, args=(self.target_lufs.get(),),
+                                  daemon=True)
         thread.start()
     
-    def _normalize_worker(self):
+    def undo_files(self):
+        """Revert in-place MP3 gain changes recorded in the files' APEv2 tags"""
+        if self.processing:
+            self.log("> Busy, try again when the current job finishes")
+            return
+        mp3s = [f for f in self.files if f[0].lower().endswith(".mp3")]
+        if not mp3s:
+            self.log("> No MP3 files to undo")
+            return
+        
+        def worker():
+            self.processing = True
+            for file_data in mp3s:
+                filename = os.path.basename(file_data[0])
+                try:
+                    steps = undo_gain(file_data[0])
+                    if steps:
+                        file_data[1] = None
+                        file_data[2] = None
+                        file_data[3] = "Undone"
+                        self.log(f"> {filename}: reverted {steps * GAIN_STEP_DB:+.1f} dB")
+                except Exception as e:
+                    self.log(f"> {filename}: Error: {e}")
+            self.processing = False
+            self.root.after(0, self.update_file_list)
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _normalize_worker(self, target_lufs):
         """Background worker for normalizing files"""
         self.processing = True
         self.log("> Starting normalization...")
         
-        target_volume = self.target_volume.get()
         files_to_process = [f for f in self.files if f[1] is not None]
         total = len(files_to_process)
         
         for idx, file_data in enumerate(files_to_process):
             filepath = file_data[0]
-            current_rms = file_data[1]
-            target_vol_percent = file_data[2]
+            result = file_data[1]
+            gain_db = file_data[2]
             filename = os.path.basename(filepath)
             
             # Update status
@@ -550,39 +876,48 @@ class MP3GainGUI:
             self.log(f"> Normalizing: {filename}")
             
             try:
-                # Convert volume percentage to dB adjustment
-                # 100% = 0dB (no change), 200% = +6dB, 50% = -6dB
-                volume_ratio = target_vol_percent / 100.0
-                target_db_adjustment = 20 * math.log10(volume_ratio) if volume_ratio > 0 else -60
+                # Gain was derived from the measured loudness in _recompute_gains
+                target_db_adjustment = gain_db
                 
                 # Log the adjustment
-                self.log(f"  Target volume: {target_vol_percent:.0f}% ({target_db_adjustment:+.1f} dB)")
-                self.log(f"  Current RMS: {current_rms:.1f} dB")
-                
-                # Load audio
-                audio = AudioSegment.from_mp3(filepath)
-                
-                # Apply gain
-                normalized_audio = audio + target_db_adjustment
-                
-                # Generate output filename
-                path_obj = Path(filepath)
-                output_path = path_obj.parent / f"{path_obj.stem}_normalized{path_obj.suffix}"
-                
-                # Export
-                normalized_audio.export(
-                    output_path,
-                    format="mp3",
-                    bitrate="192k",
-                    tags={
-                        'artist': normalized_audio.tags.get('artist', [''])[0] if hasattr(normalized_audio, 'tags') else '',
-                        'album': normalized_audio.tags.get('album', [''])[0] if hasattr(normalized_audio, 'tags') else '',
-                        'title': normalized_audio.tags.get('title', [''])[0] if hasattr(normalized_audio, 'tags') else ''
-                    }
-                )
+                self.log(f"  Measured: {result['lufs']:.1f} LUFS, peak {result['true_peak_db']:.1f} dBTP")
+                self.log(f"  Gain: {target_db_adjustment:+.1f} dB (target {target_lufs:.1f} LUFS)")
                 
-                file_data[3] = "Complete ✓"
-                self.log(f"  Saved: {output_path.name}")
+                if filepath.lower().endswith(".mp3"):
+                    # Lossless: edit global_gain in place, undo info goes to APEv2
+                    edit = apply_gain_db(filepath, target_db_adjustment)
+                    clipped = " (limited to stay in range)" if edit['steps'] != edit['requested'] else ""
+                    self.log(f"  Applied {edit['gain_db']:+.1f} dB to {edit['frames']} granules{clipped}")
+                    if edit['steps']:
+                        # ReplayGain tags describe the old level; players would apply it twice
+                        try:
+                            if strip_loudness_tags(filepath):
+                                self.log("  Removed stale ReplayGain tags")
+                        except Exception as e:
+                            self.log(f"  Could not remove ReplayGain tags: {e}")
+                    # The measurement no longer describes the file; re-analyze before another pass
+                    self.cache.invalidate(filepath)
+                    file_data[1] = None
+                    file_data[2] = None
+                    file_data[3] = "Complete ✓"
+                else:
+                    # Other formats are re-encoded, from the PCM analysis kept if any
+                    hit = self.pcm.get(filepath)
+                    reused = hit is not None
+                    path_obj = Path(filepath)
+                    output_path = path_obj.parent / f"{path_obj.stem}_normalized.mp3"
+                    if reused:
+                        encode_with_gain(hit[0], hit[1], output_path, target_db_adjustment)
+                    else:
+                        encode_file_with_gain(filepath, output_path, target_db_adjustment)
+                    del hit
+                    try:
+                        copy_tags(filepath, str(output_path), exclude=GAIN_KEY_PREFIXES)
+                    except Exception as e:
+                        self.log(f"  Tags not copied: {e}")
+                    self.pcm.discard(filepath)
+                    file_data[3] = "Complete ✓"
+                    self.log(f"  Saved: {output_path.name}" + ("" if reused else " (decoded)"))
                 
             except Exception as e:
                 self.log(f"  Error: {str(e)}")
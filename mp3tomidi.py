@@ -1,6 +1,6 @@
 import os
 import pretty_midi
-from basic_pitch.inference import predict_and_save, ICASSP_2022_MODEL_PATH
+from transcription_service import get_service
 
 def convert_mp3_to_midi(input_audio_path, output_directory):
     """
@@ -14,29 +14,12 @@ def convert_mp3_to_midi(input_audio_path, output_directory):
     full_midi_path = os.path.join(output_directory, midi_filename)
 
     try:
-        # Explicitly use TFLite model if available
-        model_path = ICASSP_2022_MODEL_PATH
-        if not str(model_path).endswith('.tflite'):
-            model_path = str(model_path) + ".tflite"
-
-        print(f"🤖 Model Path: {model_path}")
-        
-        # predict_and_save จะทำการวิเคราะห์เสียงและสร้างไฟล์ MIDI ให้ทันที
-        # save_midi=True: บันทึกเป็นไฟล์ .mid
-        # sonify_midi=False: ไม่ต้องสร้างไฟล์เสียง playback ซ้ำ
-        # save_model_outputs=False: ไม่ต้องเก็บ raw model output
-        # save_notes=False: ไม่ต้องเก็บ note events เป็น csv (เว้นแต่จะเอาไปวิเคราะห์ต่อ)
-        
-        predict_and_save(
-            [input_audio_path],
-            output_directory,
-            save_midi=True,
-            sonify_midi=False,
-            save_model_outputs=False,
-            save_notes=False,
-            model_or_model_path=model_path
-        )
-        print(f"✅ สร้างไฟล์ MIDI สำเร็จ: {full_midi_path}")
+        # โมเดลถูกโหลดครั้งเดียวใน TranscriptionService แล้วใช้ซ้ำทุกไฟล์
+        # (predict_and_save กับ model path จะโหลดโมเดลใหม่ทุกครั้ง)
+        service = get_service()
+        result = service.transcribe(input_audio_path, output_directory)
+        full_midi_path = result['midi']
+        print(f"✅ สร้างไฟล์ MIDI สำเร็จ: {full_midi_path} ({result['note_count']} notes)")
 
     except Exception as e:
         print(f"⚠️ Error using Basic Pitch: {e}")
@@ -2,9 +2,11 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
 import threading
-import music21
-from basic_pitch.inference import predict_and_save
-from basic_pitch import ICASSP_2022_MODEL_PATH
+from prewarm import prewarm
+from transcription_service import get_service
+
+# Imported on a background thread once the window is up (see prewarm.py)
+HEAVY_MODULES = ("pretty_midi", "musicxml_writer", "basic_pitch.inference")
 
 class AI_MusicTranscriber:
     def __init__(self, root):
@@ -19,6 +21,8 @@ class AI_MusicTranscriber:
         self.status_var.set("System Ready: Waiting for Audio Input...")
         
         self._init_ui()
+        # Window first; pretty_midi, musicxml_writer, Basic Pitch/TensorFlow and the model load behind it
+        prewarm(HEAVY_MODULES, on_done=lambda timings: get_service().warm_up())
 
     def _init_ui(self):
         # Styles
@@ -94,6 +98,8 @@ class AI_MusicTranscriber:
 
     def run_inference_pipeline(self):
         try:
+            from musicxml_writer import parts_from_midi, write_musicxml
+            
             output_dir = os.path.dirname(self.file_path)
             base_name = os.path.splitext(os.path.basename(self.file_path))[0]
             
@@ -102,19 +108,9 @@ class AI_MusicTranscriber:
             self.log("Initializing Neural Network (Basic Pitch)...")
             self.log("Extracting Mel-Spectrogram & Predicting MIDI events...")
             
-            # predict_and_save handles the heavy lifting
-            predict_and_save(
-                [self.file_path],
-                output_dir,
-                save_midi=True,
-                sonify_midi=False,
-                save_model_outputs=False,
-                save_notes=False,
-                model_or_model_path=ICASSP_2022_MODEL_PATH
-            )
-            
-            # Basic pitch naming convention usually appends '_basic_pitch.mid'
-            expected_midi = os.path.join(output_dir, f"{base_name}_basic_pitch.mid")
+            # The shared service keeps the model warm between runs
+            result = get_service().transcribe(self.file_path, output_dir)
+            expected_midi = result['midi']
             final_xml = os.path.join(output_dir, f"{base_name}_sheet.xml")
 
             if not os.path.exists(expected_midi):
@@ -124,23 +120,20 @@ class AI_MusicTranscriber:
 
             # --- Step 2: Quantization & Cleaning ---
             self.status_var.set("Phase 2/3: Quantizing & Formatting...")
-            self.log("Loading MIDI into Music21 Stream...")
-            
-            s = music21.converter.parse(expected_midi)
+            self.log("Loading MIDI notes...")
             
-            self.log("Quantizing Rhythm (Snap to grid)...")
-            # Quantize to nearest 16th note to make sheet music readable
-            # This cleans up the "human" timing from the audio
-            s.quantize([4], processOffsets=True, processDurations=True, inPlace=True)
+            parts, tempo, signature = parts_from_midi(expected_midi)
+            if not parts:
+                raise ValueError("The AI found no notes in this recording.")
             
-            # Add Metadata
-            s.insert(0, music21.metadata.Metadata())
-            s.metadata.title = f"Transcribed: {base_name}"
-            s.metadata.composer = "Hack's AI Engine"
+            # Onsets and offsets snap to the nearest 16th note when the
+            # score is laid out, which cleans up the "human" timing
+            self.log(f"Quantizing {sum(len(p.pitch) for p in parts)} notes (Snap to grid)...")
 
             # --- Step 3: Export ---
             self.status_var.set("Phase 3/3: Exporting MusicXML...")
-            s.write('musicxml', fp=final_xml)
+            write_musicxml(parts, final_xml, tempo, signature,
+                           title=f"Transcribed: {base_name}", composer="Hack's AI Engine")
             
             self.log(f"SUCCESS: Sheet Music saved as {os.path.basename(final_xml)}")
             self.status_var.set("Ready")
@@ -3,14 +3,13 @@ from tkinter import ttk, filedialog, messagebox
 import os
 import threading
 import time
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import librosa
-import soundfile as sf
-from mp3tomidi import convert_mp3_to_midi
-import pretty_midi
-import music21
+from prewarm import prewarm
+
+# Only tkinter is imported up front so the window shows immediately. The
+# plotting stack loads first (the figure appears when it is ready), the
+# rest in the background or on first use.
+PLOT_MODULES = ("matplotlib.pyplot", "matplotlib.backends.backend_tkagg", "waveform_view")
+ENGINE_MODULES = ("soundfile", "librosa", "pretty_midi", "musicxml_writer", "segment_processing", "mp3tomidi")
 
 class MusicStudioGUI:
     def __init__(self, root):
@@ -21,9 +20,12 @@ class MusicStudioGUI:
         
         self.file_path = None
         self.midi_path = None
+        self.fig = None
+        self.wave_view = None
         
         self.setup_styles()
         self.setup_ui()
+        prewarm(PLOT_MODULES, on_done=self._plot_stack_ready)
         
     def setup_styles(self):
         self.style = ttk.Style()
@@ -94,9 +96,24 @@ class MusicStudioGUI:
         self.progress = ttk.Progressbar(status_frame, style="Horizontal.TProgressbar", orient="horizontal", mode="determinate")
         self.progress.pack(fill="x", pady=(5, 0))
         
-        # Visualization Area
-        viz_frame = ttk.Frame(main_frame, style="Card.TFrame", padding=5)
-        viz_frame.pack(fill="both", expand=True, pady=10)
+        # Visualization Area (the figure is added by setup_plot once matplotlib is loaded)
+        self.viz_frame = ttk.Frame(main_frame, style="Card.TFrame", padding=5)
+        self.viz_frame.pack(fill="both", expand=True, pady=10)
+        self.viz_placeholder = ttk.Label(self.viz_frame, text="Loading visualisation...")
+        self.viz_placeholder.pack(expand=True)
+        
+    def _plot_stack_ready(self, timings):
+        # Runs on the prewarm thread; build widgets on the Tk thread
+        self.root.after(0, self.setup_plot)
+        prewarm(ENGINE_MODULES)
+        
+    def setup_plot(self):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from waveform_view import WaveformView
+        
+        self.viz_placeholder.destroy()
+        viz_frame = self.viz_frame
         
         # Matplotlib Figure
         plt.style.use('dark_background')
@@ -115,7 +132,11 @@ class MusicStudioGUI:
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=viz_frame)
         self.canvas.draw()
+        # Zoom/pan; the waveform view re-decimates on every x-limit change
+        self.toolbar = NavigationToolbar2Tk(self.canvas, viz_frame)
+        self.toolbar.update()
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.wave_view = WaveformView(self.ax_wave)
         
     def browse_file(self):
         filename = filedialog.askopenfilename(filetypes=[("Audio Files", "*.mp3 *.wav")])
@@ -133,15 +154,23 @@ class MusicStudioGUI:
             
     def plot_waveform(self):
         try:
-            y, sr = librosa.load(self.file_path, sr=None, duration=30) # Load first 30s for preview
-            self.ax_wave.clear()
-            self.ax_wave.plot(np.linspace(0, len(y)/sr, len(y)), y, color='#E94560', alpha=0.8)
-            self.ax_wave.set_title("Audio Waveform (Preview)", color='white')
-            self.ax_wave.set_facecolor('#16213E')
-            self.canvas.draw_idle()
+            from waveform_view import WaveformPyramid
+            
+            # Whole file, streamed into a cached min/max pyramid
+            pyramid = WaveformPyramid.from_file(self.file_path)
+            self.root.after(0, lambda: self.show_waveform(pyramid))
         except Exception as e:
             print(f"Error plotting waveform: {e}")
 
+    def show_waveform(self, pyramid):
+        if self.wave_view is None:
+            # File picked before the figure finished loading
+            self.root.after(100, lambda: self.show_waveform(pyramid))
+            return
+        self.ax_wave.set_title("Audio Waveform", color='white')
+        self.wave_view.set_pyramid(pyramid)
+        self.toolbar.update()  # make "home" the full-file view
+
     def start_conversion(self):
         if not self.file_path: return
         self.convert_btn.config(state="disabled")
@@ -152,6 +181,8 @@ class MusicStudioGUI:
         
     def process_midi(self):
         try:
+            from mp3tomidi import convert_mp3_to_midi
+            
             output_dir = os.path.dirname(self.file_path)
             midi_file = convert_mp3_to_midi(self.file_path, output_dir)
             self.midi_path = midi_file
@@ -177,19 +208,24 @@ class MusicStudioGUI:
 
     def process_sheet(self):
         try:
-            # 1. Parse MIDI
+            from musicxml_writer import parts_from_midi, write_musicxml
+            
+            # 1. Load MIDI into note arrays
             self.root.after(0, lambda: self.progress.config(value=30))
             self.root.after(0, lambda: self.status_lbl.config(text="Parsing MIDI..."))
             
-            score = music21.converter.parse(self.midi_path)
+            parts, tempo, signature = parts_from_midi(self.midi_path)
+            if not parts:
+                raise ValueError("The MIDI file has no pitched notes")
             
-            # 2. Write MusicXML
+            # 2. Quantize and stream MusicXML out
             self.root.after(0, lambda: self.progress.config(value=60))
             self.root.after(0, lambda: self.status_lbl.config(text="Generating MusicXML..."))
             
             base_name = os.path.splitext(self.midi_path)[0]
             xml_path = f"{base_name}.musicxml"
-            score.write('musicxml', fp=xml_path)
+            write_musicxml(parts, xml_path, tempo, signature,
+                           title=os.path.basename(base_name))
             
             self.root.after(0, lambda: self.progress.config(value=100))
             self.root.after(0, lambda: self.status_lbl.config(text=f"Sheet Music Saved: {os.path.basename(xml_path)}"))
@@ -201,24 +237,17 @@ class MusicStudioGUI:
             self.root.after(0, lambda: self.progress.config(value=0))
 
     def plot_pianoroll(self):
-        if not self.midi_path: return
+        if not self.midi_path or self.fig is None: return
         try:
+            import pretty_midi
+            from waveform_view import draw_piano_roll
+            
             midi_data = pretty_midi.PrettyMIDI(self.midi_path)
             
             self.ax_piano.clear()
             
-            # Collect notes
-            notes = []
-            for instrument in midi_data.instruments:
-                if not instrument.is_drum:
-                    for note in instrument.notes:
-                        notes.append((note.start, note.pitch, note.end - note.start))
-            
-            if notes:
-                starts, pitches, durations = zip(*notes)
-                self.ax_piano.barh(pitches, durations, left=starts, height=0.8, color='#0F3460', edgecolor='#E94560')
-                self.ax_piano.set_ylim(min(pitches)-2, max(pitches)+2)
-                self.ax_piano.set_xlim(0, max(starts) + max(durations))
+            # All notes as one PolyCollection
+            draw_piano_roll(self.ax_piano, midi_data)
             
             self.ax_piano.set_title("Piano Roll (Sheet Music)", color='white')
             self.ax_piano.set_facecolor('#16213E')
@@ -236,20 +265,31 @@ class MusicStudioGUI:
         
     def process_separation(self):
         try:
+            import soundfile as sf
+            from artifact_cache import hpss
+            from segment_processing import hpss_file, is_long
+            
             self.root.after(0, lambda: self.progress.config(value=10))
-            y, sr = librosa.load(self.file_path)
             
-            # Harmonic-Percussive Source Separation
-            self.root.after(0, lambda: self.progress.config(value=40))
+            base_name = os.path.splitext(self.file_path)[0]
             self.root.after(0, lambda: self.status_lbl.config(text="Processing HPSS..."))
-            y_harmonic, y_percussive = librosa.effects.hpss(y)
             
-            self.root.after(0, lambda: self.progress.config(value=80))
-            self.root.after(0, lambda: self.status_lbl.config(text="Saving Audio Files..."))
-            
-            base_name = os.path.splitext(self.file_path)[0]
-            sf.write(f"{base_name}_harmonic.wav", y_harmonic, sr)
-            sf.write(f"{base_name}_percussive.wav", y_percussive, sr)
+            if is_long(self.file_path):
+                # Long tracks: overlapping segments in a process pool, stems streamed to disk
+                def on_progress(fraction):
+                    self.root.after(0, lambda: self.progress.config(value=10 + 90 * fraction))
+                hpss_file(self.file_path, f"{base_name}_harmonic.wav", f"{base_name}_percussive.wav",
+                          progress=on_progress)
+            else:
+                # Harmonic-Percussive Source Separation (stems cached by content hash)
+                self.root.after(0, lambda: self.progress.config(value=40))
+                y_harmonic, y_percussive, sr = hpss(self.file_path)
+                
+                self.root.after(0, lambda: self.progress.config(value=80))
+                self.root.after(0, lambda: self.status_lbl.config(text="Saving Audio Files..."))
+                
+                sf.write(f"{base_name}_harmonic.wav", y_harmonic, sr)
+                sf.write(f"{base_name}_percussive.wav", y_percussive, sr)
             
             self.root.after(0, lambda: self.progress.config(value=100))
             self.root.after(0, lambda: self.status_lbl.config(text="Separation Complete! Saved _harmonic.wav and _percussive.wav"))
@@ -0,0 +1,410 @@
+"""
+Direct MIDI -> MusicXML conversion without a music21 round-trip.
+
+music21.converter.parse() builds a Python object per note, rest and
+measure and then re-walks them to quantize and export; on dense Basic
+Pitch output that takes minutes and gigabytes. Here the notes stay in
+NumPy arrays from pretty_midi to the last step:
+
+  quantize   onset/offset in quarter notes (MIDI ticks / resolution, so
+             tempo changes are honoured) rounded to 16ths in one vector op;
+             same-pitch overlaps are trimmed and exact duplicates dropped
+  staves     notes from middle C up go to the treble staff, the rest to
+             the bass staff (a single staff when only one is used)
+  voices     notes sharing onset and end form chords; chords are packed
+             greedily into at most MAX_VOICES non-overlapping voices per
+             staff, cutting the oldest ringing chord when all are busy
+  measures   notes crossing a barline are split with np.repeat into tied
+             segments, then sorted by (measure, staff, voice, onset)
+
+The writer streams the result through xml.sax's XMLGenerator one measure
+at a time, filling gaps with rests and splitting odd durations into tied
+notatable values. music21 remains available as the high-fidelity path
+(key/pitch spelling analysis, beaming):
+
+    midi_to_musicxml("song.mid", "song.musicxml", title="Song")
+    midi_to_musicxml("song.mid", "song.musicxml", high_fidelity=True)
+"""
+from dataclasses import dataclass
+from xml.sax.saxutils import XMLGenerator
+
+import numpy as np
+
+DIVISIONS = 4                 # per quarter note: a 16th-note grid
+MAX_VOICES = 4                # per staff
+SPLIT_PITCH = 60              # middle C and up -> treble staff
+DEFAULT_TEMPO = 120.0
+
+# (length in 16ths, type, dotted), longest first
+NOTE_VALUES = (
+    (16, 'whole', False), (12, 'half', True), (8, 'half', False), (6, 'quarter', True),
+    (4, 'quarter', False), (3, 'eighth', True), (2, 'eighth', False), (1, '16th', False),
+)
+# Sharp spelling by pitch class: (step, alter)
+SPELLING = (('C', 0), ('C', 1), ('D', 0), ('D', 1), ('E', 0), ('F', 0),
+            ('F', 1), ('G', 0), ('G', 1), ('A', 0), ('A', 1), ('B', 0))
+DOCTYPE = ('<!DOCTYPE score-partwise PUBLIC "-//Recordare//DTD MusicXML 3.1 Partwise//EN" '
+           '"http://www.musicxml.org/dtds/partwise.dtd">\n')
+
+
+@dataclass
+class PartNotes:
+    name: str
+    start: np.ndarray            # beats (quarter notes)
+    end: np.ndarray
+    pitch: np.ndarray            # MIDI numbers
+
+
+# ----- pretty_midi -> beat arrays -----
+
+def _quarter_positions(midi, times):
+    """Seconds -> quarter notes via MIDI ticks (get_beats() follows the time
+    signature's beat, e.g. half notes in 2/2, so it cannot be used here)"""
+    ticks = np.array([midi.time_to_tick(t) for t in times.tolist()], dtype=np.float64)
+    return ticks / midi.resolution
+
+
+def parts_from_midi(midi):
+    """(parts, tempo, (numerator, denominator)) from a PrettyMIDI object or path"""
+    import pretty_midi
+
+    if not isinstance(midi, pretty_midi.PrettyMIDI):
+        midi = pretty_midi.PrettyMIDI(str(midi))
+    parts = []
+    for inst in midi.instruments:
+        if inst.is_drum or not inst.notes:
+            continue
+        arr = np.array([(n.start, n.end, n.pitch) for n in inst.notes], dtype=np.float64)
+        name = inst.name.strip() or pretty_midi.program_to_instrument_name(inst.program)
+        parts.append(PartNotes(name, _quarter_positions(midi, arr[:, 0]),
+                               _quarter_positions(midi, arr[:, 1]), arr[:, 2].astype(np.int64)))
+    _times, tempi = midi.get_tempo_changes()
+    tempo = float(tempi[0]) if len(tempi) else DEFAULT_TEMPO
+    signature = (4, 4)
+    if midi.time_signature_changes:
+        ts = midi.time_signature_changes[0]
+        if ts.denominator <= 16:
+            signature = (ts.numerator, ts.denominator)
+    return parts, tempo, signature
+
+
+# ----- vectorised layout -----
+
+def quantize(start, end, pitch):
+    """(onset, end, pitch) as int 16ths; overlaps of one pitch trimmed, duplicates dropped"""
+    onset = np.rint(np.asarray(start) * DIVISIONS).astype(np.int64)
+    stop = np.maximum(np.rint(np.asarray(end) * DIVISIONS).astype(np.int64), onset + 1)
+    pitch = np.asarray(pitch, dtype=np.int64)
+    # Per pitch in onset order, longest first; keep the first of each (pitch, onset)
+    order = np.lexsort((-stop, onset, pitch))
+    onset, stop, pitch = onset[order], stop[order], pitch[order]
+    keep = np.r_[True, (np.diff(pitch) != 0) | (np.diff(onset) != 0)]
+    onset, stop, pitch = onset[keep], stop[keep], pitch[keep]
+    # A repeated pitch ends the previous note of that pitch
+    same = np.r_[pitch[1:] == pitch[:-1], False]
+    stop[same] = np.minimum(stop[same], onset[1:][same[:-1]])
+    return onset, stop, pitch
+
+
+def assign_staves(pitch):
+    """Staff number per note and the clefs in use, 1 = top"""
+    treble = pitch >= SPLIT_PITCH
+    if treble.all() or not treble.any():
+        clef = 'G' if treble.all() else 'F'
+        return np.ones(len(pitch), dtype=np.int64), (clef,)
+    return np.where(treble, 1, 2), ('G', 'F')
+
+
+def assign_voices(onset, end, staff, max_voices=MAX_VOICES):
+    """Voice (0-based, per staff) for every note; may shorten `end` in place.
+
+    Chords (same staff, onset and end) are grouped vectorised; the greedy
+    lane packing is a short loop over chords, not notes.
+    """
+    order = np.lexsort((end, onset, staff))
+    o, e, s = onset[order], end[order], staff[order]
+    new_chord = np.r_[True, (np.diff(o) != 0) | (np.diff(e) != 0) | (np.diff(s) != 0)]
+    chord_of = np.cumsum(new_chord) - 1
+    first = np.flatnonzero(new_chord)
+    chord_on, chord_end, chord_staff = o[first], e[first].copy(), s[first]
+    chord_voice = np.zeros(len(first), dtype=np.int64)
+    lanes = {}   # staff -> [[busy_until, [chords sounding in the lane]], ...]
+    for c in range(len(first)):
+        on = chord_on[c]
+        staff_lanes = lanes.setdefault(chord_staff[c], [])
+        lane = next((v for v, (until, _) in enumerate(staff_lanes) if until <= on), None)
+        if lane is None and len(staff_lanes) < max_voices:
+            staff_lanes.append(None)
+            lane = len(staff_lanes) - 1
+        elif lane is None:
+            lane = min(range(len(staff_lanes)), key=lambda v: staff_lanes[v][0])
+            ringing = staff_lanes[lane][1]
+            if chord_on[ringing[0]] == on:
+                # Same onset: join it, sharing its end
+                chord_end[c] = chord_end[ringing[0]]
+                ringing.append(c)
+                chord_voice[c] = lane
+                continue
+            chord_end[ringing] = on                   # cut the ringing chord here
+        staff_lanes[lane] = [chord_end[c], [c]]
+        chord_voice[c] = lane
+    voice = np.empty(len(onset), dtype=np.int64)
+    voice[order] = chord_voice[chord_of]
+    end[order] = chord_end[chord_of]
+    return voice
+
+
+def split_measures(onset, end, measure_len):
+    """Split notes at barlines: (note index, measure, seg onset, seg end, tie_stop, tie_start)"""
+    first = onset // measure_len
+    reps = (end - 1) // measure_len - first + 1
+    idx = np.repeat(np.arange(len(onset)), reps)
+    k = np.arange(len(idx)) - np.repeat(np.cumsum(reps) - reps, reps)
+    measure = first[idx] + k
+    seg_on = np.maximum(onset[idx], measure * measure_len)
+    seg_end = np.minimum(end[idx], (measure + 1) * measure_len)
+    return idx, measure, seg_on, seg_end, k > 0, k < reps[idx] - 1
+
+
+def note_values(length):
+    """Split a length in 16ths into notatable (length, type, dotted) pieces"""
+    pieces = []
+    for value, kind, dotted in NOTE_VALUES:
+        while length >= value:
+            pieces.append((value, kind, dotted))
+            length -= value
+    return pieces
+
+
+def layout(part, measure_len):
+    """Vectorised quantize/staff/voice/measure pass over one part"""
+    onset, end, pitch = quantize(part.start, part.end, part.pitch)
+    staff, clefs = assign_staves(pitch)
+    voice = assign_voices(onset, end, staff)
+    idx, measure, seg_on, seg_end, tie_stop, tie_start = split_measures(onset, end, measure_len)
+    pitch, staff, voice = pitch[idx], staff[idx], voice[idx]
+    order = np.lexsort((pitch, seg_on, voice, staff, measure))
+    segments = {
+        'measure': measure[order], 'staff': staff[order], 'voice': voice[order],
+        'onset': seg_on[order], 'end': seg_end[order], 'pitch': pitch[order],
+        'tie_stop': tie_stop[order], 'tie_start': tie_start[order],
+    }
+    n_measures = int(measure.max()) + 1 if len(measure) else 1
+    return segments, clefs, n_measures
+
+
+# ----- streaming writer -----
+
+class _XML:
+    """Thin element helpers over XMLGenerator"""
+    def __init__(self, f):
+        self.f = f
+        self.gen = XMLGenerator(f, 'utf-8', short_empty_elements=True)
+
+    def start(self, name, **attrs):
+        self.gen.startElement(name, attrs)
+
+    def end(self, name):
+        self.gen.endElement(name)
+
+    def leaf(self, name, text=None, **attrs):
+        self.gen.startElement(name, attrs)
+        if text is not None:
+            self.gen.characters(str(text))
+        self.gen.endElement(name)
+
+    def newline(self):
+        self.gen.ignorableWhitespace("\n")
+
+
+def _write_rest(x, length, staff, voice, measure_len):
+    if length == measure_len:
+        x.start('note')
+        x.leaf('rest', measure='yes')
+        x.leaf('duration', length)
+        x.leaf('voice', voice)
+        x.leaf('staff', staff)
+        x.end('note')
+        return
+    for value, kind, dotted in note_values(length):
+        x.start('note')
+        x.leaf('rest')
+        x.leaf('duration', value)
+        x.leaf('voice', voice)
+        x.leaf('type', kind)
+        if dotted:
+            x.leaf('dot')
+        x.leaf('staff', staff)
+        x.end('note')
+
+
+def _write_chord(x, pitches, length, staff, voice, tie_stop, tie_start):
+    pieces = note_values(length)
+    for p, (value, kind, dotted) in enumerate(pieces):
+        stop = tie_stop or p > 0
+        start = tie_start or p < len(pieces) - 1
+        for i, midi in enumerate(pitches):
+            step, alter = SPELLING[midi % 12]
+            x.start('note')
+            if i:
+                x.leaf('chord')
+            x.start('pitch')
+            x.leaf('step', step)
+            if alter:
+                x.leaf('alter', alter)
+            x.leaf('octave', midi // 12 - 1)
+            x.end('pitch')
+            x.leaf('duration', value)
+            if stop:
+                x.leaf('tie', type='stop')
+            if start:
+                x.leaf('tie', type='start')
+            x.leaf('voice', voice)
+            x.leaf('type', kind)
+            if dotted:
+                x.leaf('dot')
+            x.leaf('staff', staff)
+            if stop or start:
+                x.start('notations')
+                if stop:
+                    x.leaf('tied', type='stop')
+                if start:
+                    x.leaf('tied', type='start')
+                x.end('notations')
+            x.end('note')
+
+
+def _write_voice(x, seg, lo, hi, bar_start, measure_len, staff, voice):
+    """One voice of one measure: rests in the gaps, chords by shared onset"""
+    cursor = bar_start
+    i = lo
+    while i < hi:
+        on = seg['onset'][i]
+        j = i + 1
+        while j < hi and seg['onset'][j] == on:
+            j += 1
+        if on > cursor:
+            _write_rest(x, int(on - cursor), staff, voice, measure_len)
+        if seg['end'][i] > cursor:
+            _write_chord(x, seg['pitch'][i:j].tolist(), int(seg['end'][i] - max(on, cursor)),
+                         staff, voice, bool(seg['tie_stop'][i]), bool(seg['tie_start'][i]))
+            cursor = seg['end'][i]
+        i = j
+    if cursor < bar_start + measure_len:
+        _write_rest(x, int(bar_start + measure_len - cursor), staff, voice, measure_len)
+
+
+def _write_part(x, part_id, part, tempo, signature):
+    measure_len = signature[0] * 4 * DIVISIONS // signature[1]
+    seg, clefs, n_measures = layout(part, measure_len)
+    bounds = np.searchsorted(seg['measure'], np.arange(n_measures + 1))
+    x.start('part', id=part_id)
+    for m in range(n_measures):
+        x.start('measure', number=str(m + 1))
+        if m == 0:
+            x.start('attributes')
+            x.leaf('divisions', DIVISIONS)
+            x.start('key')
+            x.leaf('fifths', 0)
+            x.end('key')
+            x.start('time')
+            x.leaf('beats', signature[0])
+            x.leaf('beat-type', signature[1])
+            x.end('time')
+            if len(clefs) > 1:
+                x.leaf('staves', len(clefs))
+            for number, sign in enumerate(clefs, 1):
+                x.start('clef', number=str(number))
+                x.leaf('sign', sign)
+                x.leaf('line', 2 if sign == 'G' else 4)
+                x.end('clef')
+            x.end('attributes')
+            x.start('direction', placement='above')
+            x.start('direction-type')
+            x.start('metronome')
+            x.leaf('beat-unit', 'quarter')
+            x.leaf('per-minute', int(round(tempo)))
+            x.end('metronome')
+            x.end('direction-type')
+            x.leaf('sound', tempo=f"{tempo:.2f}")
+            x.end('direction')
+        lo, hi = bounds[m], bounds[m + 1]
+        streams = []   # (staff, voice, lo, hi) runs within this measure
+        for staff in range(1, len(clefs) + 1):
+            staff_lo = lo + np.searchsorted(seg['staff'][lo:hi], staff)
+            staff_hi = lo + np.searchsorted(seg['staff'][lo:hi], staff, side='right')
+            voices = seg['voice'][staff_lo:staff_hi]
+            if not len(voices):
+                streams.append((staff, 0, staff_lo, staff_lo))
+                continue
+            for v in np.unique(voices):
+                v_lo = staff_lo + np.searchsorted(voices, v)
+                v_hi = staff_lo + np.searchsorted(voices, v, side='right')
+                streams.append((staff, int(v), v_lo, v_hi))
+        for k, (staff, v, s_lo, s_hi) in enumerate(streams):
+            if k:
+                x.start('backup')
+                x.leaf('duration', measure_len)
+                x.end('backup')
+            # Voices 1-4 on the top staff, 5-8 on the bottom one
+            _write_voice(x, seg, s_lo, s_hi, m * measure_len, measure_len,
+                         staff, (staff - 1) * MAX_VOICES + v + 1)
+        x.end('measure')
+        x.newline()
+    x.end('part')
+    x.newline()
+
+
+def write_musicxml(parts, xml_path, tempo=DEFAULT_TEMPO, signature=(4, 4),
+                   title=None, composer=None):
+    """Stream PartNotes to a partwise MusicXML 3.1 file; returns the path"""
+    with open(xml_path, 'w', encoding='utf-8') as f:
+        x = _XML(f)
+        x.gen.startDocument()
+        f.write(DOCTYPE)
+        x.start('score-partwise', version='3.1')
+        if title:
+            x.start('work')
+            x.leaf('work-title', title)
+            x.end('work')
+        if composer:
+            x.start('identification')
+            x.leaf('creator', composer, type='composer')
+            x.end('identification')
+        x.start('part-list')
+        for i, part in enumerate(parts, 1):
+            x.start('score-part', id=f"P{i}")
+            x.leaf('part-name', part.name)
+            x.end('score-part')
+        x.end('part-list')
+        x.newline()
+        for i, part in enumerate(parts, 1):
+            _write_part(x, f"P{i}", part, tempo, signature)
+        x.end('score-partwise')
+        x.gen.endDocument()
+    return xml_path
+
+
+def _music21_musicxml(midi_path, xml_path, title=None, composer=None):
+    """The old full round-trip: slower, but with music21's spelling and beaming"""
+    import music21
+
+    score = music21.converter.parse(midi_path)
+    score.quantize([4], processOffsets=True, processDurations=True, inPlace=True)
+    score.insert(0, music21.metadata.Metadata())
+    if title:
+        score.metadata.title = title
+    if composer:
+        score.metadata.composer = composer
+    score.write('musicxml', fp=xml_path)
+    return xml_path
+
+
+def midi_to_musicxml(midi_path, xml_path, title=None, composer=None, high_fidelity=False):
+    """Convert a MIDI file to MusicXML; high_fidelity routes through music21"""
+    if high_fidelity:
+        return _music21_musicxml(midi_path, xml_path, title, composer)
+    parts, tempo, signature = parts_from_midi(midi_path)
+    if not parts:
+        raise ValueError(f"No pitched notes in {midi_path}")
+    return write_musicxml(parts, xml_path, tempo, signature, title, composer)
@@ -0,0 +1,211 @@
+"""
+Onset-based note extraction shared by mp3tosheet.py and misicscore.py.
+
+analyze() computes the onset envelope, beat track and piptrack pitch
+track of a signal once. extract_notes() then samples the dominant pitch
+at every onset in one vectorised step and gives each note a real
+duration: it lasts until the next onset or until its pitch track drops
+out. Instrument passes reuse the same AudioFeatures and differ only in
+their pitch range.
+
+segment_frames() is the frame-track counterpart used by sightsing.py: it
+turns a per-frame f0 track into note events by median smoothing and
+run-length merging, instead of one note per frame.
+"""
+from dataclasses import dataclass
+
+import librosa
+import numpy as np
+
+HOP_LENGTH = 512
+
+# (fmin, fmax) note names per instrument preset
+INSTRUMENT_RANGES = {
+    'guitar': ('E2', 'E6'),
+    'piano': ('A0', 'C8'),
+    'bass': ('E1', 'G4'),
+    'voice': ('C2', 'C6'),
+    'drum': ('C1', 'C8'),
+}
+
+
+@dataclass
+class AudioFeatures:
+    sr: int
+    hop_length: int
+    tempo: float
+    beat_frames: np.ndarray
+    onset_frames: np.ndarray
+    frame_pitch: np.ndarray      # dominant piptrack frequency per frame, 0 = none
+    frame_magnitude: np.ndarray
+
+    @property
+    def n_frames(self):
+        return len(self.frame_pitch)
+
+
+@dataclass
+class NoteEvents:
+    start: np.ndarray            # seconds
+    end: np.ndarray              # seconds
+    midi: np.ndarray             # fractional MIDI pitch
+    tempo: float
+
+    def __len__(self):
+        return len(self.start)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def quarter_lengths(self, grid=0.25):
+        """Durations in quarter notes at the detected tempo, snapped to grid"""
+        beats = self.duration * self.tempo / 60.0
+        return np.maximum(grid, np.round(beats / grid) * grid)
+
+    def rest_lengths(self, grid=0.25):
+        """Silence before each note in quarter notes, snapped to grid (0 = none)"""
+        gaps = np.diff(np.append(0.0, self.start)) - np.append(0.0, self.duration[:-1])
+        beats = np.maximum(gaps, 0.0) * self.tempo / 60.0
+        return np.round(beats / grid) * grid
+
+
+def analyze(y, sr, hop_length=HOP_LENGTH):
+    """Compute every shared intermediate once (one STFT for piptrack)"""
+    onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
+    tempo, beats = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=hop_length)
+    onsets = librosa.onset.onset_detect(onset_envelope=onset_env, sr=sr, hop_length=hop_length)
+    pitches, magnitudes = librosa.piptrack(y=y, sr=sr, hop_length=hop_length)
+
+    # Strongest bin per frame, gathered without a Python loop
+    best = magnitudes.argmax(axis=0)
+    frames = np.arange(pitches.shape[1])
+    return AudioFeatures(
+        sr=sr,
+        hop_length=hop_length,
+        tempo=float(np.atleast_1d(tempo)[0]),
+        beat_frames=np.asarray(beats),
+        onset_frames=np.asarray(onsets),
+        frame_pitch=pitches[best, frames],
+        frame_magnitude=magnitudes[best, frames],
+    )
+
+
+def extract_notes(features, instrument=None, fmin=None, fmax=None, window=3,
+                  min_duration=0.05):
+    """Notes at every onset, pitch = median of the first `window` frames.
+
+    A note ends at the next onset or where its pitch track falls silent,
+    whichever comes first. Pitches outside [fmin, fmax] are dropped.
+    """
+    if instrument is not None:
+        low, high = INSTRUMENT_RANGES[instrument]
+        fmin = fmin or librosa.note_to_hz(low)
+        fmax = fmax or librosa.note_to_hz(high)
+    fmin = fmin or 0.0
+    fmax = fmax or np.inf
+
+    onsets = features.onset_frames
+    n_frames = features.n_frames
+    if not len(onsets) or not n_frames:
+        empty = np.zeros(0)
+        return NoteEvents(empty, empty, empty, features.tempo)
+
+    pitch = features.frame_pitch
+    in_range = (pitch >= fmin) & (pitch <= fmax) & (pitch > 0)
+
+    # (n_onsets, window) gather of the frames right after each onset
+    idx = np.minimum(onsets[:, None] + np.arange(window)[None, :], n_frames - 1)
+    samples = np.where(in_range[idx], pitch[idx], np.nan)
+    valid = ~np.all(np.isnan(samples), axis=1)
+    note_hz = np.full(len(onsets), np.nan)
+    note_hz[valid] = np.nanmedian(samples[valid], axis=1)
+
+    # End = next onset, cut short at the first unvoiced frame after the onset
+    next_onset = np.append(onsets[1:], n_frames)
+    unvoiced_prefix = np.cumsum(~in_range)
+    silent_before = unvoiced_prefix[np.minimum(onsets, n_frames - 1)]
+    # searchsorted finds the first frame where the unvoiced count increases
+    first_silent = np.searchsorted(unvoiced_prefix, silent_before + 1)
+    end_frames = np.minimum(next_onset, np.maximum(first_silent, onsets + 1))
+
+    to_time = features.hop_length / features.sr
+    start = onsets * to_time
+    end = end_frames * to_time
+    keep = valid & ((end - start) >= min_duration)
+    return NoteEvents(
+        start=start[keep],
+        end=end[keep],
+        midi=librosa.hz_to_midi(note_hz[keep]),
+        tempo=features.tempo,
+    )
+
+
+def segment_frames(f0, sr, hop_length=HOP_LENGTH, tempo=100.0, fmin=None, fmax=None,
+                   smooth=5, min_frames=3):
+    """Merge a per-frame f0 track into notes.
+
+    Frames are rounded to MIDI, median-filtered over `smooth` frames to
+    remove single-frame jitter, then runs of equal pitch become one note.
+    Runs shorter than `min_frames`, and frames that are unvoiced (0/NaN)
+    or outside [fmin, fmax], produce no note.
+    """
+    from scipy.signal import medfilt
+
+    f0 = np.asarray(f0, dtype=float)
+    if not len(f0):
+        empty = np.zeros(0)
+        return NoteEvents(empty, empty, empty, tempo)
+
+    voiced = np.isfinite(f0) & (f0 > 0)
+    if fmin is not None:
+        voiced &= f0 >= fmin
+    if fmax is not None:
+        voiced &= f0 <= fmax
+    midi = np.full(len(f0), -1.0)
+    midi[voiced] = np.round(librosa.hz_to_midi(f0[voiced]))
+    if smooth > 1 and len(midi) >= smooth:
+        midi = medfilt(midi, kernel_size=smooth | 1)
+
+    # Run boundaries wherever the smoothed pitch changes
+    change = np.flatnonzero(np.diff(midi)) + 1
+    starts = np.append(0, change)
+    ends = np.append(change, len(midi))
+    pitch = midi[starts]
+    keep = (pitch >= 0) & ((ends - starts) >= min_frames)
+
+    to_time = hop_length / sr
+    return NoteEvents(
+        start=starts[keep] * to_time,
+        end=ends[keep] * to_time,
+        midi=pitch[keep],
+        tempo=tempo,
+    )
+
+
+def to_stream(notes, time_signature='4/4', part=False):
+    """Build a music21 Stream (or Part) of notes and the rests between them in one pass"""
+    from music21 import meter, note, stream, tempo
+
+    s = stream.Part() if part else stream.Stream()
+    s.append(tempo.MetronomeMark(number=notes.tempo))
+    if time_signature:
+        s.append(meter.TimeSignature(time_signature))
+    elements = []
+    # Rests keep each onset where it is in the audio instead of closing every gap
+    for midi_pitch, ql, rest in zip(np.round(notes.midi).astype(int), notes.quarter_lengths(),
+                                    notes.rest_lengths()):
+        if rest > 0:
+            elements.append(note.Rest(quarterLength=float(rest)))
+        n = note.Note(int(midi_pitch))
+        n.quarterLength = float(ql)
+        elements.append(n)
+    s.append(elements)
+    return s
+
+
+def transcribe_file(path, instruments=('piano',), sr=22050):
+    """Load once, analyze once, extract every instrument pass from the same features"""
+    y, rate = librosa.load(path, sr=sr)
+    features = analyze(y, rate)
+    return features, {name: extract_notes(features, instrument=name) for name in instruments}
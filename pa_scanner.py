@@ -1,29 +1,18 @@
 import MetaTrader5 as mt5
 import pandas as pd
 import time
-from datetime import datetime
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import threading
 import queue
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
 from typing import Optional, List, Tuple
 
+from pa_scanner_core import Candle, PatternResult, RULES_BY_NAME, calculate_strength
+
 pd.set_option('display.max_columns', None)
 pd.set_option('display.width', 1000)
 
-@dataclass
-class PatternResult:
-    """Result of pattern detection"""
-    timestamp: datetime
-    pattern_name: str
-    pattern_type: str  # 'BUY' or 'SELL'
-    price: float
-    confidence: int  # 0-100
-    strength: str  # 'weak', 'moderate', 'strong'
-    description: str
-    
 class PatternDetector(ABC):
     """Base class for pattern detectors"""
     def __init__(self, name: str, pattern_type: str, candles_required: int):
@@ -37,9 +26,7 @@ class PatternDetector(ABC):
         pass
     
     def calculate_strength(self, confidence: int) -> str:
-        if confidence >= 80: return 'strong'
-        elif confidence >= 60: return 'moderate'
-        return 'weak'
+        return calculate_strength(confidence)
 
 class PAPatternScanner:
     def __init__(self, symbol="XAUUSD.m", timeframe=mt5.TIMEFRAME_H1):
@@ -200,509 +187,123 @@ class PAPatternScanner:
         return found_patterns
 
 # ============================================
-# SINGLE CANDLE PATTERN DETECTORS
+# PATTERN DETECTORS
+# Rules live in pa_scanner_core so the Kivy apps share them without pandas;
+# these classes adapt them to DataFrame windows.
 # ============================================
 
-class HammerDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Hammer", "BUY", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['lower_wick'] > (2 * c['body_size']) and c['upper_wick'] < c['body_size']:
-            confidence = min(100, int(70 + (c['lower_wick'] / c['body_size']) * 10))
-            return PatternResult(
-                c['time'], self.name, self.pattern_type, c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Long lower wick indicates buying pressure"
-            )
-        return None
-
-class ShootingStarDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Shooting Star", "SELL", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['upper_wick'] > (2 * c['body_size']) and c['lower_wick'] < c['body_size']:
-            confidence = min(100, int(70 + (c['upper_wick'] / c['body_size']) * 10))
-            return PatternResult(
-                c['time'], self.name, self.pattern_type, c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Long upper wick indicates selling pressure"
-            )
-        return None
-
-class DojiDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Doji", "NEUTRAL", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_doji'] and c['body_size'] < c['total_range'] * 0.05:
-            confidence = 75
-            return PatternResult(
-                c['time'], self.name, "NEUTRAL", c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Indecision candle"
-            )
-        return None
-
-class DragonflyDojiDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Dragonfly Doji", "BUY", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_doji'] and c['lower_wick'] > c['total_range'] * 0.6 and c['upper_wick'] < c['total_range'] * 0.1:
-            confidence = 80
-            return PatternResult(
-                c['time'], self.name, self.pattern_type, c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Doji with long lower wick - bullish reversal"
-            )
-        return None
-
-class GravestoneDojiDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Gravestone Doji", "SELL", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_doji'] and c['upper_wick'] > c['total_range'] * 0.6 and c['lower_wick'] < c['total_range'] * 0.1:
-            confidence = 80
-            return PatternResult(
-                c['time'], self.name, self.pattern_type, c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Doji with long upper wick - bearish reversal"
-            )
-        return None
-
-class BullishMarubozuDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Bullish Marubozu", "BUY", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_bullish'] and c['body_size'] > c['total_range'] * 0.9:
-            confidence = 85
-            return PatternResult(
-                c['time'], self.name, self.pattern_type, c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Strong bullish candle with no wicks"
-            )
-        return None
-
-class BearishMarubozuDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Bearish Marubozu", "SELL", 1)
-    
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_bearish'] and c['body_size'] > c['total_range'] * 0.9:
-            confidence = 85
-            return PatternResult(
-                c['time'], self.name, self.pattern_type, c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Strong bearish candle with no wicks"
-            )
-        return None
-
-class SpinningTopDetector(PatternDetector):
+class CoreRuleDetector(PatternDetector):
+    rule_name = None
+
     def __init__(self):
-        super().__init__("Spinning Top", "NEUTRAL", 1)
-    
+        rule = RULES_BY_NAME[self.rule_name]
+        super().__init__(rule.name, rule.pattern_type, rule.candles_required)
+        self.rule = rule
+
     def detect(self, candles):
-        c = candles.iloc[-1]
-        if (c['body_size'] < c['total_range'] * 0.3 and 
-            c['upper_wick'] > c['body_size'] and c['lower_wick'] > c['body_size']):
-            confidence = 70
-            return PatternResult(
-                c['time'], self.name, "NEUTRAL", c['close'],
-                confidence, self.calculate_strength(confidence),
-                "Small body with long wicks - indecision"
-            )
-        return None
+        window = [Candle(r.time, float(r.open), float(r.high), float(r.low), float(r.close))
+                  for r in candles.itertuples(index=False)]
+        return self.rule.detect(window)
+
+# ============================================
+# SINGLE CANDLE PATTERN DETECTORS
+# ============================================
+
+class HammerDetector(CoreRuleDetector):
+    rule_name = "Hammer"
+
+class ShootingStarDetector(CoreRuleDetector):
+    rule_name = "Shooting Star"
+
+class DojiDetector(CoreRuleDetector):
+    rule_name = "Doji"
+
+class DragonflyDojiDetector(CoreRuleDetector):
+    rule_name = "Dragonfly Doji"
+
+class GravestoneDojiDetector(CoreRuleDetector):
+    rule_name = "Gravestone Doji"
+
+class BullishMarubozuDetector(CoreRuleDetector):
+    rule_name = "Bullish Marubozu"
+
+class BearishMarubozuDetector(CoreRuleDetector):
+    rule_name = "Bearish Marubozu"
+
+class SpinningTopDetector(CoreRuleDetector):
+    rule_name = "Spinning Top"
 
 # ============================================
 # TWO CANDLE PATTERN DETECTORS
 # ============================================
 
-class BullishEngulfingDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Bullish Engulfing", "BUY", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bearish'] and curr['is_bullish']:
-            if curr['close'] > prev['open'] and curr['open'] < prev['close']:
-                engulf_ratio = curr['body_size'] / prev['body_size']
-                confidence = min(95, int(75 + engulf_ratio * 20))
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Bullish candle engulfs previous bearish"
-                )
-        return None
-
-class BearishEngulfingDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Bearish Engulfing", "SELL", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bullish'] and curr['is_bearish']:
-            if curr['close'] < prev['open'] and curr['open'] > prev['close']:
-                engulf_ratio = curr['body_size'] / prev['body_size']
-                confidence = min(95, int(75 + engulf_ratio * 20))
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Bearish candle engulfs previous bullish"
-                )
-        return None
-
-class PiercingLineDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Piercing Line", "BUY", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        prev_midpoint = (prev['open'] + prev['close']) / 2
-        if prev['is_bearish'] and curr['is_bullish']:
-            if curr['open'] < prev['close'] and curr['close'] > prev_midpoint and curr['close'] < prev['open']:
-                confidence = 80
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Bullish reversal - closes above midpoint"
-                )
-        return None
-
-class DarkCloudCoverDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Dark Cloud Cover", "SELL", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        prev_midpoint = (prev['open'] + prev['close']) / 2
-        if prev['is_bullish'] and curr['is_bearish']:
-            if curr['open'] > prev['close'] and curr['close'] < prev_midpoint and curr['close'] > prev['open']:
-                confidence = 80
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Bearish reversal - closes below midpoint"
-                )
-        return None
-
-class BullishHaramiDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Bullish Harami", "BUY", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bearish'] and curr['is_bullish']:
-            if (curr['open'] > prev['close'] and curr['close'] < prev['open'] and
-                curr['body_size'] < prev['body_size'] * 0.7):
-                confidence = 75
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Small bullish inside previous bearish"
-                )
-        return None
-
-class BearishHaramiDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Bearish Harami", "SELL", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bullish'] and curr['is_bearish']:
-            if (curr['close'] > prev['open'] and curr['open'] < prev['close'] and
-                curr['body_size'] < prev['body_size'] * 0.7):
-                confidence = 75
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Small bearish inside previous bullish"
-                )
-        return None
-
-class TweezerBottomDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Tweezer Bottom", "BUY", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bearish'] and curr['is_bullish']:
-            if abs(prev['low'] - curr['low']) < prev['total_range'] * 0.05:
-                confidence = 78
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Double bottom support - reversal signal"
-                )
-        return None
-
-class TweezerTopDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Tweezer Top", "SELL", 2)
-    
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bullish'] and curr['is_bearish']:
-            if abs(prev['high'] - curr['high']) < prev['total_range'] * 0.05:
-                confidence = 78
-                return PatternResult(
-                    curr['time'], self.name, self.pattern_type, curr['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Double top resistance - reversal signal"
-                )
-        return None
+class BullishEngulfingDetector(CoreRuleDetector):
+    rule_name = "Bullish Engulfing"
+
+class BearishEngulfingDetector(CoreRuleDetector):
+    rule_name = "Bearish Engulfing"
+
+class PiercingLineDetector(CoreRuleDetector):
+    rule_name = "Piercing Line"
+
+class DarkCloudCoverDetector(CoreRuleDetector):
+    rule_name = "Dark Cloud Cover"
+
+class BullishHaramiDetector(CoreRuleDetector):
+    rule_name = "Bullish Harami"
+
+class BearishHaramiDetector(CoreRuleDetector):
+    rule_name = "Bearish Harami"
+
+class TweezerBottomDetector(CoreRuleDetector):
+    rule_name = "Tweezer Bottom"
+
+class TweezerTopDetector(CoreRuleDetector):
+    rule_name = "Tweezer Top"
 
 # ============================================
 # THREE CANDLE PATTERN DETECTORS
 # ============================================
 
-class MorningStarDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Morning Star", "BUY", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bearish'] and c3['is_bullish']:
-            if (c1['body_size'] > c2['body_size'] * 2 and 
-                c2['body_size'] < c1['body_size'] * 0.3 and
-                c3['close'] > (c1['open'] + c1['close'])/2):
-                confidence = 85
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "3-candle bullish reversal pattern"
-                )
-        return None
-
-class EveningStarDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Evening Star", "SELL", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bullish'] and c3['is_bearish']:
-            if (c1['body_size'] > c2['body_size'] * 2 and 
-                c2['body_size'] < c1['body_size'] * 0.3 and
-                c3['close'] < (c1['open'] + c1['close'])/2):
-                confidence = 85
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "3-candle bearish reversal pattern"
-                )
-        return None
-
-class ThreeWhiteSoldiersDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Three White Soldiers", "BUY", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bullish'] and c2['is_bullish'] and c3['is_bullish']:
-            if (c2['close'] > c1['close'] and c3['close'] > c2['close'] and
-                c1['body_size'] > c1['total_range'] * 0.6 and
-                c2['body_size'] > c2['total_range'] * 0.6 and
-                c3['body_size'] > c3['total_range'] * 0.6):
-                confidence = 90
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Three consecutive strong bullish candles"
-                )
-        return None
-
-class ThreeBlackCrowsDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Three Black Crows", "SELL", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bearish'] and c2['is_bearish'] and c3['is_bearish']:
-            if (c2['close'] < c1['close'] and c3['close'] < c2['close'] and
-                c1['body_size'] > c1['total_range'] * 0.6 and
-                c2['body_size'] > c2['total_range'] * 0.6 and
-                c3['body_size'] > c3['total_range'] * 0.6):
-                confidence = 90
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Three consecutive strong bearish candles"
-                )
-        return None
-
-class ThreeInsideUpDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Three Inside Up", "BUY", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        is_inside = (c2['high'] < c1['high']) and (c2['low'] > c1['low'])
-        if is_inside and c1['is_bearish'] and c2['is_bullish'] and c3['is_bullish']:
-            if c3['close'] > c1['high']:
-                confidence = 82
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Harami followed by bullish breakout"
-                )
-        return None
-
-class ThreeInsideDownDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Three Inside Down", "SELL", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        is_inside = (c2['high'] < c1['high']) and (c2['low'] > c1['low'])
-        if is_inside and c1['is_bullish'] and c2['is_bearish'] and c3['is_bearish']:
-            if c3['close'] < c1['low']:
-                confidence = 82
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Harami followed by bearish breakdown"
-                )
-        return None
-
-class ThreeOutsideUpDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Three Outside Up", "BUY", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        # Engulfing pattern followed by confirmation
-        if c1['is_bearish'] and c2['is_bullish'] and c3['is_bullish']:
-            if (c2['close'] > c1['open'] and c2['open'] < c1['close'] and 
-                c3['close'] > c2['close']):
-                confidence = 88
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Bullish engulfing with confirmation"
-                )
-        return None
-
-class ThreeOutsideDownDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Three Outside Down", "SELL", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        # Engulfing pattern followed by confirmation
-        if c1['is_bullish'] and c2['is_bearish'] and c3['is_bearish']:
-            if (c2['close'] < c1['open'] and c2['open'] > c1['close'] and 
-                c3['close'] < c2['close']):
-                confidence = 88
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Bearish engulfing with confirmation"
-                )
-        return None
-
-class AbandonedBabyBullishDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Abandoned Baby (Bullish)", "BUY", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bearish'] and c2['is_doji'] and c3['is_bullish']:
-            gap_down = c2['high'] < c1['low']
-            gap_up = c2['high'] < c3['low']
-            if gap_down and gap_up:
-                confidence = 92
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Rare reversal - isolated doji with gaps"
-                )
-        return None
-
-class AbandonedBabyBearishDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Abandoned Baby (Bearish)", "SELL", 3)
-    
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bullish'] and c2['is_doji'] and c3['is_bearish']:
-            gap_up = c2['low'] > c1['high']
-            gap_down = c2['low'] > c3['high']
-            if gap_up and gap_down:
-                confidence = 92
-                return PatternResult(
-                    c3['time'], self.name, self.pattern_type, c3['close'],
-                    confidence, self.calculate_strength(confidence),
-                    "Rare reversal - isolated doji with gaps"
-                )
-        return None
-
-class RisingThreeMethodsDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Rising Three Methods", "BUY", 5)
-    
-    def detect(self, candles):
-        c1, c2, c3, c4, c5 = [candles.iloc[i] for i in range(5)]
-        
-        # 1. Long bullish candle
-        if not (c1['is_bullish'] and c1['body_size'] > c1['total_range'] * 0.6):
-            return None
-            
-        # 2. Three small bearish/consolidating candles contained within first candle's range
-        small_candles = [c2, c3, c4]
-        for c in small_candles:
-            if c['body_size'] > c1['body_size'] * 0.4: # Should be small
-                return None
-            if c['high'] > c1['high'] or c['low'] < c1['low']: # Should be within range
-                return None
-                
-        # 3. Long bullish candle closing above first candle's close
-        if c5['is_bullish'] and c5['close'] > c1['close'] and c5['body_size'] > c1['body_size'] * 0.5:
-            confidence = 88
-            return PatternResult(
-                c5['time'], self.name, self.pattern_type, c5['close'],
-                confidence, self.calculate_strength(confidence),
-                "Bullish continuation pattern"
-            )
-        return None
-
-class FallingThreeMethodsDetector(PatternDetector):
-    def __init__(self):
-        super().__init__("Falling Three Methods", "SELL", 5)
-    
-    def detect(self, candles):
-        c1, c2, c3, c4, c5 = [candles.iloc[i] for i in range(5)]
-        
-        # 1. Long bearish candle
-        if not (c1['is_bearish'] and c1['body_size'] > c1['total_range'] * 0.6):
-            return None
-            
-        # 2. Three small bullish/consolidating candles contained within first candle's range
-        small_candles = [c2, c3, c4]
-        for c in small_candles:
-            if c['body_size'] > c1['body_size'] * 0.4: # Should be small
-                return None
-            if c['high'] > c1['high'] or c['low'] < c1['low']: # Should be within range
-                return None
-                
-        # 3. Long bearish candle closing below first candle's close
-        if c5['is_bearish'] and c5['close'] < c1['close'] and c5['body_size'] > c1['body_size'] * 0.5:
-            confidence = 88
-            return PatternResult(
-                c5['time'], self.name, self.pattern_type, c5['close'],
-                confidence, self.calculate_strength(confidence),
-                "Bearish continuation pattern"
-            )
-        return None
+class MorningStarDetector(CoreRuleDetector):
+    rule_name = "Morning Star"
+
+class EveningStarDetector(CoreRuleDetector):
+    rule_name = "Evening Star"
+
+class ThreeWhiteSoldiersDetector(CoreRuleDetector):
+    rule_name = "Three White Soldiers"
+
+class ThreeBlackCrowsDetector(CoreRuleDetector):
+    rule_name = "Three Black Crows"
+
+class ThreeInsideUpDetector(CoreRuleDetector):
+    rule_name = "Three Inside Up"
+
+class ThreeInsideDownDetector(CoreRuleDetector):
+    rule_name = "Three Inside Down"
+
+class ThreeOutsideUpDetector(CoreRuleDetector):
+    rule_name = "Three Outside Up"
+
+class ThreeOutsideDownDetector(CoreRuleDetector):
+    rule_name = "Three Outside Down"
+
+class AbandonedBabyBullishDetector(CoreRuleDetector):
+    rule_name = "Abandoned Baby (Bullish)"
+
+class AbandonedBabyBearishDetector(CoreRuleDetector):
+    rule_name = "Abandoned Baby (Bearish)"
+
+# ============================================
+# FIVE CANDLE PATTERN DETECTORS
+# ============================================
+
+class RisingThreeMethodsDetector(CoreRuleDetector):
+    rule_name = "Rising Three Methods"
+
+class FallingThreeMethodsDetector(CoreRuleDetector):
+    rule_name = "Falling Three Methods"
 
 # ============================================
 # GUI WITH ENHANCEMENTS
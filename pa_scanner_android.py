@@ -1,12 +1,8 @@
 import logging
-import threading
 import time
 import queue
 import random
-from datetime import datetime
-from dataclasses import dataclass
-from abc import ABC, abstractmethod
-from typing import Optional, List, Tuple
+import math
 
 # Kivy Imports
 from kivy.app import App
@@ -24,9 +20,9 @@ from kivy.utils import get_color_from_hex
 from kivy.metrics import dp
 from kivy.properties import StringProperty, ColorProperty, ListProperty
 
-# Data Imports
-import pandas as pd
-import numpy as np
+# Scanner core (standard library only - no pandas/numpy in the APK)
+from pa_scanner_core import CandleSeries, RULES, scan_series
+from scan_scheduler import ResultModel, ScanScheduler
 
 # -----------------------------------------------------------------------------
 # MOCK MT5 FOR ANDROID
@@ -49,220 +45,24 @@ except ImportError:
         def initialize(self): return True
         def shutdown(self): pass
         def copy_rates_from_pos(self, symbol, timeframe, start, count):
-            # Generate fake candle data for testing/demo
+            # Bars are aligned to the timeframe and seeded by their open time,
+            # so the same bar always has the same prices (like a real feed)
+            period = timeframe * 60
+            last_open = int(time.time()) // period * period - start * period
             data = []
-            base_price = 2000.0
             for i in range(count):
-                open_p = base_price + random.uniform(-5, 5)
-                close_p = open_p + random.uniform(-5, 5)
-                high_p = max(open_p, close_p) + random.uniform(0, 2)
-                low_p = min(open_p, close_p) - random.uniform(0, 2)
-                # time in seconds
-                t = int(time.time()) - (count - i) * 60 * 60 
+                t = last_open - (count - 1 - i) * period
+                rng = random.Random(t)
+                base_price = 2000.0 + 50 * math.sin(t / period / 20)
+                open_p = base_price + rng.uniform(-5, 5)
+                close_p = open_p + rng.uniform(-5, 5)
+                high_p = max(open_p, close_p) + rng.uniform(0, 2)
+                low_p = min(open_p, close_p) - rng.uniform(0, 2)
                 data.append((t, open_p, high_p, low_p, close_p, 100, 0, 0))
-                base_price = close_p
             return data
 
     mt5 = MockMT5()
 
-# -----------------------------------------------------------------------------
-# PATTERN LOGIC
-# -----------------------------------------------------------------------------
-
-@dataclass
-class PatternResult:
-    """Result of pattern detection"""
-    timestamp: datetime
-    pattern_name: str
-    pattern_type: str  # 'BUY' or 'SELL'
-    price: float
-    confidence: int  # 0-100
-    strength: str  # 'weak', 'moderate', 'strong'
-    description: str
-    
-class PatternDetector(ABC):
-    """Base class for pattern detectors"""
-    def __init__(self, name: str, pattern_type: str, candles_required: int):
-        self.name = name
-        self.pattern_type = pattern_type
-        self.candles_required = candles_required
-    
-    @abstractmethod
-    def detect(self, candles: pd.Series) -> Optional[PatternResult]:
-        """Detect pattern and return result with confidence"""
-        pass
-    
-    def calculate_strength(self, confidence: int) -> str:
-        if confidence >= 80: return 'strong'
-        elif confidence >= 60: return 'moderate'
-        return 'weak'
-
-# --- SINGLE CANDLE ---
-
-class HammerDetector(PatternDetector):
-    def __init__(self): super().__init__("Hammer", "BUY", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['lower_wick'] > (2 * c['body_size']) and c['upper_wick'] < c['body_size']:
-            confidence = min(100, int(70 + (c['lower_wick'] / c['body_size']) * 10))
-            return PatternResult(c['time'], self.name, self.pattern_type, c['close'], confidence, self.calculate_strength(confidence), "Long lower wick")
-        return None
-
-class ShootingStarDetector(PatternDetector):
-    def __init__(self): super().__init__("Shooting Star", "SELL", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['upper_wick'] > (2 * c['body_size']) and c['lower_wick'] < c['body_size']:
-            confidence = min(100, int(70 + (c['upper_wick'] / c['body_size']) * 10))
-            return PatternResult(c['time'], self.name, self.pattern_type, c['close'], confidence, self.calculate_strength(confidence), "Long upper wick")
-        return None
-
-class DojiDetector(PatternDetector):
-    def __init__(self): super().__init__("Doji", "NEUTRAL", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_doji'] and c['body_size'] < c['total_range'] * 0.05:
-            return PatternResult(c['time'], self.name, "NEUTRAL", c['close'], 75, "moderate", "Indecision")
-        return None
-
-class DragonflyDojiDetector(PatternDetector):
-    def __init__(self): super().__init__("Dragonfly Doji", "BUY", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_doji'] and c['lower_wick'] > c['total_range'] * 0.6 and c['upper_wick'] < c['total_range'] * 0.1:
-            return PatternResult(c['time'], self.name, self.pattern_type, c['close'], 80, "strong", "Bullish reversal")
-        return None
-
-class GravestoneDojiDetector(PatternDetector):
-    def __init__(self): super().__init__("Gravestone Doji", "SELL", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_doji'] and c['upper_wick'] > c['total_range'] * 0.6 and c['lower_wick'] < c['total_range'] * 0.1:
-            return PatternResult(c['time'], self.name, self.pattern_type, c['close'], 80, "strong", "Bearish reversal")
-        return None
-
-class BullishMarubozuDetector(PatternDetector):
-    def __init__(self): super().__init__("Bullish Marubozu", "BUY", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_bullish'] and c['body_size'] > c['total_range'] * 0.9:
-            return PatternResult(c['time'], self.name, self.pattern_type, c['close'], 85, "strong", "Strong bullish")
-        return None
-
-class BearishMarubozuDetector(PatternDetector):
-    def __init__(self): super().__init__("Bearish Marubozu", "SELL", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if c['is_bearish'] and c['body_size'] > c['total_range'] * 0.9:
-            return PatternResult(c['time'], self.name, self.pattern_type, c['close'], 85, "strong", "Strong bearish")
-        return None
-
-class SpinningTopDetector(PatternDetector):
-    def __init__(self): super().__init__("Spinning Top", "NEUTRAL", 1)
-    def detect(self, candles):
-        c = candles.iloc[-1]
-        if (c['body_size'] < c['total_range'] * 0.3 and c['upper_wick'] > c['body_size'] and c['lower_wick'] > c['body_size']):
-            return PatternResult(c['time'], self.name, "NEUTRAL", c['close'], 70, "moderate", "Indecision")
-        return None
-
-# --- TWO CANDLE ---
-
-class BullishEngulfingDetector(PatternDetector):
-    def __init__(self): super().__init__("Bullish Engulfing", "BUY", 2)
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bearish'] and curr['is_bullish']:
-            if curr['close'] > prev['open'] and curr['open'] < prev['close']:
-                confidence = 85
-                return PatternResult(curr['time'], self.name, self.pattern_type, curr['close'], confidence, self.calculate_strength(confidence), "Bullish engulfing")
-        return None
-
-class BearishEngulfingDetector(PatternDetector):
-    def __init__(self): super().__init__("Bearish Engulfing", "SELL", 2)
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bullish'] and curr['is_bearish']:
-            if curr['close'] < prev['open'] and curr['open'] > prev['close']:
-                confidence = 85
-                return PatternResult(curr['time'], self.name, self.pattern_type, curr['close'], confidence, self.calculate_strength(confidence), "Bearish engulfing")
-        return None
-
-class PiercingLineDetector(PatternDetector):
-    def __init__(self): super().__init__("Piercing Line", "BUY", 2)
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        prev_midpoint = (prev['open'] + prev['close']) / 2
-        if prev['is_bearish'] and curr['is_bullish']:
-            if curr['open'] < prev['close'] and curr['close'] > prev_midpoint and curr['close'] < prev['open']:
-                return PatternResult(curr['time'], self.name, self.pattern_type, curr['close'], 80, "strong", "Bullish reversal")
-        return None
-
-class DarkCloudCoverDetector(PatternDetector):
-    def __init__(self): super().__init__("Dark Cloud Cover", "SELL", 2)
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        prev_midpoint = (prev['open'] + prev['close']) / 2
-        if prev['is_bullish'] and curr['is_bearish']:
-            if curr['open'] > prev['close'] and curr['close'] < prev_midpoint and curr['close'] > prev['open']:
-                return PatternResult(curr['time'], self.name, self.pattern_type, curr['close'], 80, "strong", "Bearish reversal")
-        return None
-
-class BullishHaramiDetector(PatternDetector):
-    def __init__(self): super().__init__("Bullish Harami", "BUY", 2)
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bearish'] and curr['is_bullish']:
-            if (curr['open'] > prev['close'] and curr['close'] < prev['open'] and curr['body_size'] < prev['body_size'] * 0.7):
-                return PatternResult(curr['time'], self.name, self.pattern_type, curr['close'], 75, "moderate", "Inside bar")
-        return None
-
-class BearishHaramiDetector(PatternDetector):
-    def __init__(self): super().__init__("Bearish Harami", "SELL", 2)
-    def detect(self, candles):
-        prev, curr = candles.iloc[-2], candles.iloc[-1]
-        if prev['is_bullish'] and curr['is_bearish']:
-            if (curr['close'] > prev['open'] and curr['open'] < prev['close'] and curr['body_size'] < prev['body_size'] * 0.7):
-                return PatternResult(curr['time'], self.name, self.pattern_type, curr['close'], 75, "moderate", "Inside bar")
-        return None
-
-# --- THREE CANDLE ---
-
-class MorningStarDetector(PatternDetector):
-    def __init__(self): super().__init__("Morning Star", "BUY", 3)
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bearish'] and c3['is_bullish']:
-            if (c1['body_size'] > c2['body_size'] * 2 and c2['body_size'] < c1['body_size'] * 0.3 and c3['close'] > (c1['open'] + c1['close'])/2):
-                return PatternResult(c3['time'], self.name, self.pattern_type, c3['close'], 85, "strong", "Morning Star")
-        return None
-
-class EveningStarDetector(PatternDetector):
-    def __init__(self): super().__init__("Evening Star", "SELL", 3)
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bullish'] and c3['is_bearish']:
-            if (c1['body_size'] > c2['body_size'] * 2 and c2['body_size'] < c1['body_size'] * 0.3 and c3['close'] < (c1['open'] + c1['close'])/2):
-                return PatternResult(c3['time'], self.name, self.pattern_type, c3['close'], 85, "strong", "Evening Star")
-        return None
-
-class ThreeWhiteSoldiersDetector(PatternDetector):
-    def __init__(self): super().__init__("Three White Soldiers", "BUY", 3)
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bullish'] and c2['is_bullish'] and c3['is_bullish']:
-            if (c2['close'] > c1['close'] and c3['close'] > c2['close'] and c1['body_size'] > c1['total_range'] * 0.6):
-                return PatternResult(c3['time'], self.name, self.pattern_type, c3['close'], 90, "strong", "3 White Soldiers")
-        return None
-
-class ThreeBlackCrowsDetector(PatternDetector):
-    def __init__(self): super().__init__("Three Black Crows", "SELL", 3)
-    def detect(self, candles):
-        c1, c2, c3 = candles.iloc[-3], candles.iloc[-2], candles.iloc[-1]
-        if c1['is_bearish'] and c2['is_bearish'] and c3['is_bearish']:
-            if (c2['close'] < c1['close'] and c3['close'] < c2['close'] and c1['body_size'] > c1['total_range'] * 0.6):
-                return PatternResult(c3['time'], self.name, self.pattern_type, c3['close'], 90, "strong", "3 Black Crows")
-        return None
-
 # -----------------------------------------------------------------------------
 # SCANNER LOGIC
 # -----------------------------------------------------------------------------
@@ -276,15 +76,8 @@ class PAPatternScanner:
         self.cache_time = 0
         self.pattern_detectors = self._initialize_detectors()
         
-    def _initialize_detectors(self) -> List[PatternDetector]:
-        return [
-            HammerDetector(), ShootingStarDetector(), DojiDetector(), DragonflyDojiDetector(),
-            GravestoneDojiDetector(), BullishMarubozuDetector(), BearishMarubozuDetector(),
-            SpinningTopDetector(), BullishEngulfingDetector(), BearishEngulfingDetector(),
-            PiercingLineDetector(), DarkCloudCoverDetector(), BullishHaramiDetector(),
-            BearishHaramiDetector(), MorningStarDetector(), EveningStarDetector(),
-            ThreeWhiteSoldiersDetector(), ThreeBlackCrowsDetector()
-        ]
+    def _initialize_detectors(self):
+        return list(RULES)
     
     def connect(self):
         if not mt5.initialize(): return False
@@ -303,43 +96,30 @@ class PAPatternScanner:
         if not self.connected: return None
             
         rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, n)
-        if rates is None: return None
+        if rates is None:
+            return None
         
-        # Handle Mock Data (list of tuples) vs Real Data (numpy array)
-        if isinstance(rates, list):
-            df = pd.DataFrame(rates, columns=['time', 'open', 'high', 'low', 'close', 'tick_volume', 'spread', 'real_volume'])
-        else:
-            df = pd.DataFrame(rates)
-            
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        
-        # Enhanced candle properties
-        df['body_top'] = df[['open', 'close']].max(axis=1)
-        df['body_bottom'] = df[['open', 'close']].min(axis=1)
-        df['body_size'] = df['body_top'] - df['body_bottom']
-        df['total_range'] = df['high'] - df['low']
-        df['upper_wick'] = df['high'] - df['body_top']
-        df['lower_wick'] = df['body_bottom'] - df['low']
-        df['is_bullish'] = df['close'] > df['open']
-        df['is_bearish'] = df['close'] < df['open']
-        df['is_doji'] = df['body_size'] < (df['total_range'] * 0.1)
+        # Works for both the mock's tuples and MT5's structured array
+        series = CandleSeries.from_rates(rates)
         
-        self.cached_candles = df
+        self.cached_candles = series
         self.cache_time = current_time
-        return df
-
-    def scan_once(self):
-        df = self.fetch_candles()
-        if df is None or len(df) < 3: return []
-        found_patterns = []
-        start_idx = max(2, len(df) - 8)
-        for i in range(start_idx, len(df)):
-            for detector in self.pattern_detectors:
-                if i < detector.candles_required - 1: continue
-                candles = df.iloc[i - detector.candles_required + 1 : i + 1]
-                result = detector.detect(candles)
-                if result: found_patterns.append(result)
-        return found_patterns
+        return series
+
+    def last_bar_time(self):
+        """Open time of the current bar, fetched as a single rate"""
+        if not self.connected:
+            return None
+        rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, 1)
+        if rates is None or len(rates) == 0:
+            return None
+        return int(rates[-1][0])
+
+    def scan_once(self, force_refresh=False):
+        series = self.fetch_candles(force_refresh=force_refresh)
+        if series is None:
+            return []
+        return scan_series(series, self.pattern_detectors, lookback=8)
 
 # -----------------------------------------------------------------------------
 # KIVY GUI
@@ -564,14 +344,17 @@ BoxLayout:
         color: get_color_from_hex('#666666')
         bold: True
 
-    ScrollView:
-        GridLayout:
-            id: results_container
-            cols: 1
-            spacing: dp(5)
-            padding: dp(10)
+    RecycleView:
+        id: results_view
+        viewclass: 'ResultCard'
+        RecycleBoxLayout:
+            orientation: 'vertical'
+            default_size: None, dp(80)
+            default_size_hint: 1, None
             size_hint_y: None
             height: self.minimum_height
+            spacing: dp(5)
+            padding: dp(10)
 '''
 
 class ResultCard(BoxLayout):
@@ -587,9 +370,21 @@ class PAScannerApp(App):
         self.scanner = PAPatternScanner()
         self.is_scanning = False
         self.scan_queue = queue.Queue()
+        self.results = ResultModel(max_items=50)
+        self.scheduler = ScanScheduler(
+            probe=self.scanner.last_bar_time,
+            scan=lambda: self.scanner.scan_once(force_refresh=True),
+            on_results=self.scan_queue.put,
+            interval=2.0,
+            background_interval=30.0
+        )
         
         self.root_widget = Builder.load_string(KV)
         
+        # Desktop equivalent of Android's pause/resume
+        Window.bind(on_minimize=lambda *args: self.scheduler.set_background(True),
+                    on_restore=lambda *args: self.scheduler.set_background(False))
+        
         # Clock for checking queue
         Clock.schedule_interval(self.update_ui, 1.0)
         
@@ -617,37 +412,45 @@ class PAScannerApp(App):
             self.scanner.timeframe = tf_map.get(self.root_widget.ids.tf_spinner.text, mt5.TIMEFRAME_H1)
             self.scanner.connect()
             
-            threading.Thread(target=self.scan_loop, daemon=True).start()
+            self.scheduler.start()
         else:
             # Stop
             self.is_scanning = False
             btn.text = "START SCAN"
             status.text = "Stopped"
             status.color = get_color_from_hex('#666666')
+            self.scheduler.stop()
             self.scanner.disconnect()
 
-    def scan_loop(self):
-        while self.is_scanning:
-            try:
-                patterns = self.scanner.scan_once()
-                if patterns:
-                    self.scan_queue.put(patterns)
-            except Exception as e:
-                print(f"Scan error: {e}")
-            time.sleep(2) # Scan every 2 seconds
+    def on_pause(self):
+        # Keep scanning in the background, just much less often
+        self.scheduler.set_background(True)
+        return True
+
+    def on_resume(self):
+        self.scheduler.set_background(False)
 
     def update_ui(self, dt):
+        new_results = []
         try:
             while True:
-                patterns = self.scan_queue.get_nowait()
-                for p in patterns:
-                    self.add_result(p)
+                new_results.extend(self.scan_queue.get_nowait())
         except queue.Empty:
             pass
+        if new_results:
+            self.add_results(new_results)
 
     def add_result(self, result):
-        container = self.root_widget.ids.results_container
-        
+        self.add_results([result])
+
+    def add_results(self, results):
+        # RecycleView reuses a handful of cards; only its data list changes
+        if self.results.add(results):
+            self.root_widget.ids.results_view.data = [
+                self.card_data(r) for r in self.results.newest_first()
+            ]
+
+    def card_data(self, result):
         # Color coding
         if result.pattern_type == 'BUY':
             bg = get_color_from_hex('#1b5e20') # Dark Green
@@ -656,19 +459,13 @@ class PAScannerApp(App):
         else:
             bg = get_color_from_hex('#f57f17') # Dark Orange
             
-        card = ResultCard(
-            bg_color=bg,
-            time_text=result.timestamp.strftime('%H:%M:%S'),
-            pattern_text=result.pattern_name,
-            type_text=f"{result.pattern_type} - {result.description}",
-            strength_text=f"Confidence: {result.confidence}%"
-        )
-        
-        container.add_widget(card, index=0) # Add to top
-        
-        # Keep list manageable
-        if len(container.children) > 50:
-            container.remove_widget(container.children[-1])
+        return {
+            'bg_color': bg,
+            'time_text': result.timestamp.strftime('%H:%M:%S'),
+            'pattern_text': result.pattern_name,
+            'type_text': f"{result.pattern_type} - {result.description}",
+            'strength_text': f"Confidence: {result.confidence}%"
+        }
 
     def execute_trade(self, direction):
         tp = self.root_widget.ids.tp_input.text
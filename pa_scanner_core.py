@@ -0,0 +1,392 @@
+"""
+Pandas-free price action pattern core.
+
+Candles are stored as `array`-module columns and the detector rules are plain
+functions over `Candle` records, so the same rules back the desktop scanner
+(pa_scanner.py, pandas) and the Kivy apps (main.py / pa_scanner_android.py),
+which only need the standard library.
+"""
+from array import array
+from datetime import datetime, timedelta, timezone
+
+
+class Candle:
+    """One OHLC bar plus the derived properties the rules use"""
+    __slots__ = ('time', 'open', 'high', 'low', 'close',
+                 'body_top', 'body_bottom', 'body_size', 'total_range',
+                 'upper_wick', 'lower_wick', 'is_bullish', 'is_bearish', 'is_doji')
+
+    def __init__(self, time, open_, high, low, close):
+        self.time = time
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.body_top = max(open_, close)
+        self.body_bottom = min(open_, close)
+        self.body_size = self.body_top - self.body_bottom
+        self.total_range = high - low
+        self.upper_wick = high - self.body_top
+        self.lower_wick = self.body_bottom - low
+        self.is_bullish = close > open_
+        self.is_bearish = close < open_
+        self.is_doji = self.body_size < self.total_range * 0.1
+
+    @classmethod
+    def from_mapping(cls, row):
+        """Build from anything indexable by column name (e.g. a pandas row)"""
+        return cls(row['time'], float(row['open']), float(row['high']),
+                   float(row['low']), float(row['close']))
+
+
+class PatternResult:
+    """Result of pattern detection"""
+    __slots__ = ('timestamp', 'pattern_name', 'pattern_type', 'price',
+                 'confidence', 'strength', 'description')
+
+    def __init__(self, timestamp, pattern_name, pattern_type, price, confidence, strength, description):
+        self.timestamp = timestamp
+        self.pattern_name = pattern_name
+        self.pattern_type = pattern_type  # 'BUY', 'SELL' or 'NEUTRAL'
+        self.price = price
+        self.confidence = confidence  # 0-100
+        self.strength = strength  # 'weak', 'moderate', 'strong'
+        self.description = description
+
+    def __repr__(self):
+        return (f"PatternResult({self.timestamp!r}, {self.pattern_name!r}, {self.pattern_type!r}, "
+                f"{self.price!r}, {self.confidence!r}, {self.strength!r}, {self.description!r})")
+
+    def __eq__(self, other):
+        if not isinstance(other, PatternResult):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+
+def calculate_strength(confidence):
+    if confidence >= 80: return 'strong'
+    elif confidence >= 60: return 'moderate'
+    return 'weak'
+
+
+class CandleSeries:
+    """Column store of bars: `array('q')` epoch-second times, `array('d')` prices"""
+    def __init__(self, tz_offset_hours=0):
+        self.time = array('q')
+        self.open = array('d')
+        self.high = array('d')
+        self.low = array('d')
+        self.close = array('d')
+        self.tz_offset = timedelta(hours=tz_offset_hours)
+
+    @classmethod
+    def from_rates(cls, rates, tz_offset_hours=0):
+        """Build from MT5 rates (structured array) or the mock's list of tuples.
+
+        Both are rows of (time, open, high, low, close, ...).
+        """
+        series = cls(tz_offset_hours)
+        for r in rates:
+            series.time.append(int(r[0]))
+            series.open.append(float(r[1]))
+            series.high.append(float(r[2]))
+            series.low.append(float(r[3]))
+            series.close.append(float(r[4]))
+        return series
+
+    def __len__(self):
+        return len(self.time)
+
+    def timestamp(self, i):
+        utc = datetime.fromtimestamp(self.time[i], timezone.utc).replace(tzinfo=None)
+        return utc + self.tz_offset
+
+    def candle(self, i):
+        return Candle(self.timestamp(i), self.open[i], self.high[i], self.low[i], self.close[i])
+
+
+# ============================================
+# RULES
+# Each takes the candle window (oldest first, current last) and returns
+# (confidence, description) or None.
+# ============================================
+
+# --- Single candle ---
+
+def _hammer(w):
+    c = w[-1]
+    if c.lower_wick > (2 * c.body_size) and c.upper_wick < c.body_size:
+        return min(100, int(70 + (c.lower_wick / c.body_size) * 10)), "Long lower wick indicates buying pressure"
+
+def _shooting_star(w):
+    c = w[-1]
+    if c.upper_wick > (2 * c.body_size) and c.lower_wick < c.body_size:
+        return min(100, int(70 + (c.upper_wick / c.body_size) * 10)), "Long upper wick indicates selling pressure"
+
+def _doji(w):
+    c = w[-1]
+    if c.is_doji and c.body_size < c.total_range * 0.05:
+        return 75, "Indecision candle"
+
+def _dragonfly_doji(w):
+    c = w[-1]
+    if c.is_doji and c.lower_wick > c.total_range * 0.6 and c.upper_wick < c.total_range * 0.1:
+        return 80, "Doji with long lower wick - bullish reversal"
+
+def _gravestone_doji(w):
+    c = w[-1]
+    if c.is_doji and c.upper_wick > c.total_range * 0.6 and c.lower_wick < c.total_range * 0.1:
+        return 80, "Doji with long upper wick - bearish reversal"
+
+def _bullish_marubozu(w):
+    c = w[-1]
+    if c.is_bullish and c.body_size > c.total_range * 0.9:
+        return 85, "Strong bullish candle with no wicks"
+
+def _bearish_marubozu(w):
+    c = w[-1]
+    if c.is_bearish and c.body_size > c.total_range * 0.9:
+        return 85, "Strong bearish candle with no wicks"
+
+def _spinning_top(w):
+    c = w[-1]
+    if (c.body_size < c.total_range * 0.3 and
+        c.upper_wick > c.body_size and c.lower_wick > c.body_size):
+        return 70, "Small body with long wicks - indecision"
+
+# --- Two candle ---
+
+def _bullish_engulfing(w):
+    prev, curr = w[-2], w[-1]
+    if prev.is_bearish and curr.is_bullish:
+        if curr.close > prev.open and curr.open < prev.close:
+            engulf_ratio = curr.body_size / prev.body_size
+            return min(95, int(75 + engulf_ratio * 20)), "Bullish candle engulfs previous bearish"
+
+def _bearish_engulfing(w):
+    prev, curr = w[-2], w[-1]
+    if prev.is_bullish and curr.is_bearish:
+        if curr.close < prev.open and curr.open > prev.close:
+            engulf_ratio = curr.body_size / prev.body_size
+            return min(95, int(75 + engulf_ratio * 20)), "Bearish candle engulfs previous bullish"
+
+def _piercing_line(w):
+    prev, curr = w[-2], w[-1]
+    prev_midpoint = (prev.open + prev.close) / 2
+    if prev.is_bearish and curr.is_bullish:
+        if curr.open < prev.close and curr.close > prev_midpoint and curr.close < prev.open:
+            return 80, "Bullish reversal - closes above midpoint"
+
+def _dark_cloud_cover(w):
+    prev, curr = w[-2], w[-1]
+    prev_midpoint = (prev.open + prev.close) / 2
+    if prev.is_bullish and curr.is_bearish:
+        if curr.open > prev.close and curr.close < prev_midpoint and curr.close > prev.open:
+            return 80, "Bearish reversal - closes below midpoint"
+
+def _bullish_harami(w):
+    prev, curr = w[-2], w[-1]
+    if prev.is_bearish and curr.is_bullish:
+        if (curr.open > prev.close and curr.close < prev.open and
+            curr.body_size < prev.body_size * 0.7):
+            return 75, "Small bullish inside previous bearish"
+
+def _bearish_harami(w):
+    prev, curr = w[-2], w[-1]
+    if prev.is_bullish and curr.is_bearish:
+        if (curr.close > prev.open and curr.open < prev.close and
+            curr.body_size < prev.body_size * 0.7):
+            return 75, "Small bearish inside previous bullish"
+
+def _tweezer_bottom(w):
+    prev, curr = w[-2], w[-1]
+    if prev.is_bearish and curr.is_bullish:
+        if abs(prev.low - curr.low) < prev.total_range * 0.05:
+            return 78, "Double bottom support - reversal signal"
+
+def _tweezer_top(w):
+    prev, curr = w[-2], w[-1]
+    if prev.is_bullish and curr.is_bearish:
+        if abs(prev.high - curr.high) < prev.total_range * 0.05:
+            return 78, "Double top resistance - reversal signal"
+
+# --- Three candle ---
+
+def _morning_star(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    if c1.is_bearish and c3.is_bullish:
+        if (c1.body_size > c2.body_size * 2 and
+            c2.body_size < c1.body_size * 0.3 and
+            c3.close > (c1.open + c1.close) / 2):
+            return 85, "3-candle bullish reversal pattern"
+
+def _evening_star(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    if c1.is_bullish and c3.is_bearish:
+        if (c1.body_size > c2.body_size * 2 and
+            c2.body_size < c1.body_size * 0.3 and
+            c3.close < (c1.open + c1.close) / 2):
+            return 85, "3-candle bearish reversal pattern"
+
+def _three_white_soldiers(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    if c1.is_bullish and c2.is_bullish and c3.is_bullish:
+        if (c2.close > c1.close and c3.close > c2.close and
+            all(c.body_size > c.total_range * 0.6 for c in (c1, c2, c3))):
+            return 90, "Three consecutive strong bullish candles"
+
+def _three_black_crows(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    if c1.is_bearish and c2.is_bearish and c3.is_bearish:
+        if (c2.close < c1.close and c3.close < c2.close and
+            all(c.body_size > c.total_range * 0.6 for c in (c1, c2, c3))):
+            return 90, "Three consecutive strong bearish candles"
+
+def _three_inside_up(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    is_inside = (c2.high < c1.high) and (c2.low > c1.low)
+    if is_inside and c1.is_bearish and c2.is_bullish and c3.is_bullish:
+        if c3.close > c1.high:
+            return 82, "Harami followed by bullish breakout"
+
+def _three_inside_down(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    is_inside = (c2.high < c1.high) and (c2.low > c1.low)
+    if is_inside and c1.is_bullish and c2.is_bearish and c3.is_bearish:
+        if c3.close < c1.low:
+            return 82, "Harami followed by bearish breakdown"
+
+def _three_outside_up(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    # Engulfing pattern followed by confirmation
+    if c1.is_bearish and c2.is_bullish and c3.is_bullish:
+        if c2.close > c1.open and c2.open < c1.close and c3.close > c2.close:
+            return 88, "Bullish engulfing with confirmation"
+
+def _three_outside_down(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    # Engulfing pattern followed by confirmation
+    if c1.is_bullish and c2.is_bearish and c3.is_bearish:
+        if c2.close < c1.open and c2.open > c1.close and c3.close < c2.close:
+            return 88, "Bearish engulfing with confirmation"
+
+def _abandoned_baby_bullish(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    if c1.is_bearish and c2.is_doji and c3.is_bullish:
+        if c2.high < c1.low and c2.high < c3.low:
+            return 92, "Rare reversal - isolated doji with gaps"
+
+def _abandoned_baby_bearish(w):
+    c1, c2, c3 = w[-3], w[-2], w[-1]
+    if c1.is_bullish and c2.is_doji and c3.is_bearish:
+        if c2.low > c1.high and c2.low > c3.high:
+            return 92, "Rare reversal - isolated doji with gaps"
+
+# --- Five candle ---
+
+def _rising_three_methods(w):
+    c1, c5 = w[-5], w[-1]
+    # Long bullish candle, three small candles inside its range, bullish close above it
+    if not (c1.is_bullish and c1.body_size > c1.total_range * 0.6):
+        return None
+    for c in w[-4:-1]:
+        if c.body_size > c1.body_size * 0.4 or c.high > c1.high or c.low < c1.low:
+            return None
+    if c5.is_bullish and c5.close > c1.close and c5.body_size > c1.body_size * 0.5:
+        return 88, "Bullish continuation pattern"
+
+def _falling_three_methods(w):
+    c1, c5 = w[-5], w[-1]
+    # Long bearish candle, three small candles inside its range, bearish close below it
+    if not (c1.is_bearish and c1.body_size > c1.total_range * 0.6):
+        return None
+    for c in w[-4:-1]:
+        if c.body_size > c1.body_size * 0.4 or c.high > c1.high or c.low < c1.low:
+            return None
+    if c5.is_bearish and c5.close < c1.close and c5.body_size > c1.body_size * 0.5:
+        return 88, "Bearish continuation pattern"
+
+
+class PatternRule:
+    """A named rule plus the number of candles it looks at"""
+    __slots__ = ('name', 'pattern_type', 'candles_required', 'fn')
+
+    def __init__(self, name, pattern_type, candles_required, fn):
+        self.name = name
+        self.pattern_type = pattern_type
+        self.candles_required = candles_required
+        self.fn = fn
+
+    def detect(self, window):
+        """Run on a window of Candles ending at the bar being tested"""
+        hit = self.fn(window)
+        if hit is None:
+            return None
+        confidence, description = hit
+        c = window[-1]
+        return PatternResult(c.time, self.name, self.pattern_type, c.close,
+                             confidence, calculate_strength(confidence), description)
+
+
+RULES = [
+    # Single candle patterns
+    PatternRule("Hammer", "BUY", 1, _hammer),
+    PatternRule("Shooting Star", "SELL", 1, _shooting_star),
+    PatternRule("Doji", "NEUTRAL", 1, _doji),
+    PatternRule("Dragonfly Doji", "BUY", 1, _dragonfly_doji),
+    PatternRule("Gravestone Doji", "SELL", 1, _gravestone_doji),
+    PatternRule("Bullish Marubozu", "BUY", 1, _bullish_marubozu),
+    PatternRule("Bearish Marubozu", "SELL", 1, _bearish_marubozu),
+    PatternRule("Spinning Top", "NEUTRAL", 1, _spinning_top),
+
+    # Two candle patterns
+    PatternRule("Bullish Engulfing", "BUY", 2, _bullish_engulfing),
+    PatternRule("Bearish Engulfing", "SELL", 2, _bearish_engulfing),
+    PatternRule("Piercing Line", "BUY", 2, _piercing_line),
+    PatternRule("Dark Cloud Cover", "SELL", 2, _dark_cloud_cover),
+    PatternRule("Bullish Harami", "BUY", 2, _bullish_harami),
+    PatternRule("Bearish Harami", "SELL", 2, _bearish_harami),
+    PatternRule("Tweezer Bottom", "BUY", 2, _tweezer_bottom),
+    PatternRule("Tweezer Top", "SELL", 2, _tweezer_top),
+
+    # Three candle patterns
+    PatternRule("Morning Star", "BUY", 3, _morning_star),
+    PatternRule("Evening Star", "SELL", 3, _evening_star),
+    PatternRule("Three White Soldiers", "BUY", 3, _three_white_soldiers),
+    PatternRule("Three Black Crows", "SELL", 3, _three_black_crows),
+    PatternRule("Three Inside Up", "BUY", 3, _three_inside_up),
+    PatternRule("Three Inside Down", "SELL", 3, _three_inside_down),
+    PatternRule("Three Outside Up", "BUY", 3, _three_outside_up),
+    PatternRule("Three Outside Down", "SELL", 3, _three_outside_down),
+    PatternRule("Abandoned Baby (Bullish)", "BUY", 3, _abandoned_baby_bullish),
+    PatternRule("Abandoned Baby (Bearish)", "SELL", 3, _abandoned_baby_bearish),
+
+    # Five candle patterns
+    PatternRule("Rising Three Methods", "BUY", 5, _rising_three_methods),
+    PatternRule("Falling Three Methods", "SELL", 5, _falling_three_methods),
+]
+
+RULES_BY_NAME = {rule.name: rule for rule in RULES}
+
+
+def scan_series(series, rules=RULES, lookback=8):
+    """Scan the last `lookback` bars of a CandleSeries, oldest first"""
+    n = len(series)
+    if n < 3:
+        return []
+    max_required = max(rule.candles_required for rule in rules)
+    start_idx = max(2, n - lookback)
+    # Build Candle records once for every bar any rule can reach
+    first = max(0, start_idx - max_required + 1)
+    candles = [series.candle(i) for i in range(first, n)]
+
+    found = []
+    for i in range(start_idx, n):
+        for rule in rules:
+            if i < rule.candles_required - 1:
+                continue
+            end = i - first + 1
+            result = rule.detect(candles[end - rule.candles_required:end])
+            if result:
+                found.append(result)
+    return found
@@ -0,0 +1,228 @@
+"""
+Decoded-PCM reuse between the stages of one mp3gain job.
+
+Normalizing a non-MP3 file used to decode it twice, once for analysis and
+again through pydub for the re-encode. When the caller asks to keep the
+PCM (spill_dir given), the analysis worker still decodes in streaming
+blocks, but also writes each block into a memory-mapped .npy in the job's
+spill directory (np.lib.format.open_memmap), so worker memory stays at one
+block. The normalize stage maps that file instead of decoding again.
+Without spill_dir the analysis is the plain streaming pass and nothing
+touches the disk.
+
+PCMCache owns the spill directory. Arrays put() directly stay in memory
+up to a byte budget; beyond it the least recently used ones are spilled.
+Spilled files count against a separate disk budget, and the least
+recently used are deleted past it (normalize then decodes that file
+again). Entries are keyed by path and checked against size/mtime, so a
+file that changed in between is decoded again. MP3s never go through
+here: their gain is edited in place (mp3_gain_edit) without decoding.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from audio_stream import BLOCK_FRAMES, array_blocks, ffmpeg_binary, ffmpeg_slot, probe
+
+DEFAULT_BUDGET = int(os.environ.get("PCM_CACHE_MB", 512)) * 1024 ** 2
+DEFAULT_DISK_BUDGET = int(os.environ.get("PCM_SPILL_MB", 4096)) * 1024 ** 2
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def spill(pcm, spill_dir, name):
+    """Write an array to spill_dir/name.npy; returns the file path"""
+    fd, target = tempfile.mkstemp(prefix=name, suffix=".npy", dir=spill_dir)
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, pcm)
+    return target
+
+
+def analyze_for_normalize(path, spill_dir=None, sampled=False):
+    """BatchJob worker: streaming R128 analysis, optionally keeping the PCM for normalize.
+
+    With a spill_dir, non-MP3 full scans also stream their blocks into a
+    memory-mapped .npy and the result carries 'pcm_file'/'pcm_frames'/'pcm_rate'.
+    """
+    from loudness_r128 import analyze_track
+
+    if spill_dir is None or sampled or path.lower().endswith(".mp3"):
+        return analyze_track(path, sampled=sampled)
+    info = probe(path)
+    # Sized from the probed duration; a file that decodes longer is not kept
+    capacity = int((info['duration'] or 0) * info['sample_rate']) + BLOCK_FRAMES
+    fd, target = tempfile.mkstemp(prefix=os.path.basename(path) + "-", suffix=".npy", dir=spill_dir)
+    os.close(fd)
+    out = np.lib.format.open_memmap(target, mode="w+", dtype=np.float32,
+                                    shape=(capacity, info['channels']))
+    state = {'filled': 0}
+
+    def keep(block):
+        filled = state['filled']
+        if filled is None:
+            return
+        if filled + len(block) > capacity:
+            state['filled'] = None
+            return
+        out[filled:filled + len(block)] = block
+        state['filled'] = filled + len(block)
+
+    try:
+        result = analyze_track(path, on_block=keep)
+        out.flush()
+    except BaseException:
+        # Never adopted, so nothing else would clean it up before close()
+        del out
+        os.remove(target)
+        raise
+    del out
+    if state['filled'] is None:
+        os.remove(target)
+        return result
+    result['pcm_file'] = target
+    result['pcm_frames'] = state['filled']
+    result['pcm_rate'] = info['sample_rate']
+    return result
+
+
+class PCMCache:
+    """Thread-safe store of decoded files: in memory up to budget_bytes, then on disk"""
+    def __init__(self, budget_bytes=DEFAULT_BUDGET, disk_budget_bytes=DEFAULT_DISK_BUDGET):
+        self.budget_bytes = budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self.spill_dir = tempfile.mkdtemp(prefix="pcm-")
+        # path -> [stamp, array or None, npy path or None, rate, frames]
+        self._entries = OrderedDict()
+        self._memory = 0
+        self._disk = 0
+        self._lock = threading.Lock()
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    def adopt(self, path, npy_file, rate, frames=None):
+        """Register a file a worker already spilled (see analyze_for_normalize)"""
+        with self._lock:
+            self._drop(path)
+            self._entries[path] = [_stamp(path), None, npy_file, rate, frames]
+            self._disk += os.path.getsize(npy_file)
+            self._enforce_disk_budget()
+
+    def put(self, path, pcm, rate):
+        with self._lock:
+            self._drop(path)
+            self._entries[path] = [_stamp(path), pcm, None, rate, len(pcm)]
+            self._memory += pcm.nbytes
+            self._enforce_budget()
+
+    def get(self, path):
+        """(pcm, rate) without decoding, or None. Spilled entries come back memory-mapped"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            if not os.path.exists(path) or entry[0] != _stamp(path):
+                self._drop(path)
+                return None
+            self._entries.move_to_end(path)
+            _stamp_, pcm, npy_file, rate, frames = entry
+        if pcm is None:
+            pcm = np.load(npy_file, mmap_mode="r")[:frames]
+        return pcm, rate
+
+    def discard(self, path):
+        with self._lock:
+            self._drop(path)
+
+    def close(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory = 0
+            self._disk = 0
+        self._cleanup()
+
+    def _drop(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return
+        if entry[1] is not None:
+            self._memory -= entry[1].nbytes
+        if entry[2] is not None:
+            self._remove_spill(entry[2])
+
+    def _remove_spill(self, npy_file):
+        if not os.path.exists(npy_file):
+            return
+        size = os.path.getsize(npy_file)
+        try:
+            os.remove(npy_file)
+            self._disk -= size
+        except OSError:
+            pass  # still memory-mapped somewhere (Windows); removed with the directory
+
+    def _enforce_budget(self):
+        for path, entry in self._entries.items():
+            if self._memory <= self.budget_bytes:
+                break
+            if entry[1] is None:
+                continue
+            entry[2] = spill(entry[1], self.spill_dir, os.path.basename(path) + "-")
+            self._memory -= entry[1].nbytes
+            self._disk += os.path.getsize(entry[2])
+            entry[1] = None
+        self._enforce_disk_budget()
+
+    def _enforce_disk_budget(self):
+        # Oldest first; evicted entries are simply decoded again at normalize time
+        for path in list(self._entries):
+            if self._disk <= self.disk_budget_bytes:
+                break
+            if self._entries[path][2] is not None:
+                self._drop(path)
+
+
+def encode_blocks(blocks, rate, channels, output, gain_db, bitrate="192k"):
+    """Apply gain to (frames, channels) blocks and pipe float32 PCM into an ffmpeg encoder"""
+    factor = np.float32(10 ** (gain_db / 20))
+    with ffmpeg_slot():
+        proc = subprocess.Popen(
+            [ffmpeg_binary(), "-v", "error", "-nostdin", "-y",
+             "-f", "f32le", "-ar", str(rate), "-ac", str(channels), "-i", "pipe:0",
+             "-b:a", bitrate, str(output)],
+            stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        try:
+            for block in blocks:
+                proc.stdin.write(np.clip(block * factor, -1.0, 1.0).tobytes())
+        finally:
+            proc.stdin.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            code = proc.wait()
+    if code != 0:
+        raise RuntimeError(stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    return output
+
+
+def encode_with_gain(pcm, rate, output, gain_db, bitrate="192k", block_frames=65536):
+    """encode_blocks over an already decoded (possibly memory-mapped) array"""
+    return encode_blocks(array_blocks(pcm, block_frames), rate, pcm.shape[1], output,
+                         gain_db, bitrate)
+
+
+def encode_file_with_gain(path, output, gain_db, bitrate="192k"):
+    """Decode, apply gain and encode in one ffmpeg process, for files whose PCM was not kept"""
+    with ffmpeg_slot():
+        proc = subprocess.run(
+            [ffmpeg_binary(), "-v", "error", "-nostdin", "-y", "-i", str(path), "-map", "0:a",
+             "-af", f"volume={gain_db:.2f}dB", "-b:a", bitrate, str(output)],
+            capture_output=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode(errors="replace").strip() or "ffmpeg failed")
+    return output
@@ -0,0 +1,164 @@
+"""
+Pitch-preserving practice audio for sightsing.py.
+
+Slowing a track by rewriting its frame rate also drops the pitch, which is
+useless for sight-singing. WSOLA (waveform-similarity overlap-add) instead
+reads Hann-windowed frames at an input hop of speed * Hs and overlap-adds
+them at an output hop of Hs. Each frame is nudged within a small tolerance
+to the position that best continues the previous one (FFT
+cross-correlation), so the waveform stays coherent without a phase model.
+
+Decoding, stretching and MP3 encoding all stream through fixed-size blocks.
+Renders are cached per (content, speed), and render_speeds() produces
+several speeds in parallel so the UI can switch between them instantly.
+"""
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from artifact_cache import get_cache
+from audio_stream import ffmpeg_binary, pcm_blocks, probe
+
+PRACTICE_SPEEDS = (0.5, 0.7, 0.85)
+
+
+class WSOLA:
+    """Streaming time-stretch; feed (frames, channels) blocks to process()"""
+    def __init__(self, speed, sample_rate, channels, frame_ms=46.0, tolerance_ms=10.0):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self.channels = channels
+        self.frame = 1 << int(round(np.log2(sample_rate * frame_ms / 1000.0)))
+        self.hop_out = self.frame // 2
+        self.hop_in = self.hop_out * speed
+        self.tolerance = int(sample_rate * tolerance_ms / 1000.0)
+        # Periodic Hann: copies at half-frame spacing sum to exactly 1
+        self.window = np.hanning(self.frame + 1)[:self.frame, None].astype(np.float32)
+
+        self._input = np.zeros((0, channels), dtype=np.float32)
+        self._input_start = 0          # absolute index of _input[0]
+        self._input_total = 0
+        self._output = np.zeros((self.frame, channels), dtype=np.float32)
+        self._frames_out = 0
+        self._samples_out = 0
+        self._prev = None              # absolute position of the last frame used
+
+    def _nominal(self, k):
+        return int(round(k * self.hop_in))
+
+    def _best_offset(self, region, template):
+        """Lag in [0, len(region) - len(template)] of maximum cross-correlation"""
+        n, m = len(region), len(template)
+        size = 1 << (n + m - 1).bit_length()
+        corr = np.fft.irfft(np.fft.rfft(region, size) * np.conj(np.fft.rfft(template, size)), size)
+        return int(np.argmax(corr[:n - m + 1]))
+
+    def _next_position(self, available_end):
+        """Input position of the next frame, or None if more input is needed"""
+        nominal = self._nominal(self._frames_out)
+        if self._prev is None:
+            return 0 if available_end >= self.frame else None
+        natural = self._prev + self.hop_out
+        lo = max(nominal - self.tolerance, self._input_start)
+        hi = nominal + self.tolerance
+        if max(hi, natural) + self.frame > available_end:
+            return None
+        base = self._input_start
+        template = self._input[natural - base:natural - base + self.frame].mean(axis=1)
+        region = self._input[lo - base:hi - base + self.frame].mean(axis=1)
+        return lo + self._best_offset(region, template)
+
+    def _run(self, available_end):
+        out = []
+        while True:
+            pos = self._next_position(available_end)
+            if pos is None:
+                break
+            start = pos - self._input_start
+            self._output += self.window * self._input[start:start + self.frame]
+            out.append(self._output[:self.hop_out].copy())
+            self._output = np.roll(self._output, -self.hop_out, axis=0)
+            self._output[-self.hop_out:] = 0.0
+            self._prev = pos
+            self._frames_out += 1
+
+        # Drop input that no future frame can reach
+        keep_from = min(self._nominal(self._frames_out) - self.tolerance,
+                        (self._prev or 0) + self.hop_out)
+        drop = max(0, keep_from - self._input_start)
+        if drop:
+            self._input = self._input[drop:]
+            self._input_start += drop
+        return self._emit(out)
+
+    def _emit(self, chunks):
+        if not chunks:
+            return np.zeros((0, self.channels), dtype=np.float32)
+        block = np.concatenate(chunks)
+        self._samples_out += len(block)
+        return block
+
+    def process(self, block):
+        self._input = np.concatenate([self._input, block])
+        self._input_total += len(block)
+        return self._run(self._input_start + len(self._input))
+
+    def flush(self):
+        """Drain the tail; total output is trimmed to input_length / speed samples"""
+        target = int(round(self._input_total / self.speed))
+        already = self._samples_out
+        pad = 2 * (self.frame + self.tolerance) + int(self.hop_in)
+        chunks = []
+        while self._samples_out < target:
+            # Zero padding lets the last real samples pass through the window
+            self._input = np.concatenate([self._input, np.zeros((pad, self.channels), np.float32)])
+            chunks.append(self._run(self._input_start + len(self._input)))
+        return self._emit(chunks)[:max(0, target - already)]
+
+
+def _encoder(path, sample_rate, channels, bitrate='192k'):
+    return subprocess.Popen(
+        [ffmpeg_binary(), "-v", "error", "-nostdin", "-y",
+         "-f", "f32le", "-ar", str(sample_rate), "-ac", str(channels), "-i", "pipe:0",
+         "-b:a", bitrate, str(path)],
+        stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def stretch_file(path, out_path, speed, bitrate='192k'):
+    """Decode, time-stretch and encode `path` block by block"""
+    info = probe(path)
+    rate, channels = info['sample_rate'], info['channels']
+    stretcher = WSOLA(speed, rate, channels)
+    proc = _encoder(out_path, rate, channels, bitrate)
+    try:
+        for block in pcm_blocks(path, rate, channels):
+            proc.stdin.write(stretcher.process(block).tobytes())
+        proc.stdin.write(stretcher.flush().tobytes())
+    finally:
+        proc.stdin.close()
+        stderr = proc.stderr.read()
+        proc.stderr.close()
+        code = proc.wait()
+    if code != 0:
+        raise RuntimeError(f"ffmpeg failed encoding {os.path.basename(str(out_path))}: "
+                           f"{stderr.decode(errors='replace').strip()}")
+    return out_path
+
+
+def practice_audio(path, speed, bitrate='192k'):
+    """Cached pitch-preserving render of `path` at `speed`; returns the MP3 path"""
+    if speed == 1.0:
+        return path
+    produce = lambda dest: stretch_file(path, dest, speed, bitrate)
+    return str(get_cache().file(path, "practice", ".mp3", produce,
+                                speed=speed, bitrate=bitrate, method="wsola"))
+
+
+def render_speeds(path, speeds=PRACTICE_SPEEDS, workers=None):
+    """Render every speed in parallel processes; returns {speed: mp3 path}"""
+    with ProcessPoolExecutor(max_workers=workers or len(speeds)) as pool:
+        futures = {speed: pool.submit(practice_audio, path, speed) for speed in speeds}
+        return {speed: future.result() for speed, future in futures.items()}
@@ -0,0 +1,37 @@
+"""
+Background pre-import of heavy modules for the Tk tools.
+
+The windows are built from tkinter alone and shown right away; librosa,
+matplotlib, music21, TensorFlow and friends are imported on a daemon
+thread meanwhile. A handler that needs one of them simply imports it: if
+prewarm already finished that is a dictionary lookup, otherwise Python's
+per-module import lock makes it wait for the background import instead of
+starting a second one.
+"""
+import importlib
+import threading
+import time
+
+
+def prewarm(modules, on_done=None):
+    """Import `modules` in order on a daemon thread.
+
+    on_done(timings) is called on that thread with {name: seconds}, or
+    {name: None} for modules that failed to import (the error resurfaces,
+    with a proper message, when the feature that needs it is used).
+    """
+    def run():
+        timings = {}
+        for name in modules:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                timings[name] = time.perf_counter() - start
+            except Exception:
+                timings[name] = None
+        if on_done:
+            on_done(timings)
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
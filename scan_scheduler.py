@@ -0,0 +1,107 @@
+"""
+Scan scheduling and result model shared by the Kivy PA Scanner apps
+(main.py for Android, pa_scanner_android.py for desktop testing).
+
+Pure Python so it can be imported (and benchmarked) without Kivy.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResultModel:
+    """De-duplicated pattern results, capped at `max_items` (oldest dropped)"""
+    def __init__(self, max_items=50):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, results):
+        """Add results; returns True if anything new was stored"""
+        changed = False
+        for r in results:
+            key = (r.timestamp, r.pattern_name)
+            if key in self._items:
+                continue
+            self._items[key] = r
+            changed = True
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+        return changed
+
+    def newest_first(self):
+        return list(reversed(self._items.values()))
+
+    def clear(self):
+        self._items.clear()
+
+
+class ScanScheduler:
+    """Background scan loop that only runs the full scan when a new bar opens.
+
+    `probe()` must be cheap (e.g. fetch a single bar) and return the open
+    time of the current bar. `scan()` runs only when that time changes and
+    its non-empty results are handed to `on_results`. While in background
+    mode the probe interval is stretched to `background_interval`.
+    """
+    def __init__(self, probe, scan, on_results, interval=2.0, background_interval=30.0):
+        self.probe = probe
+        self.scan = scan
+        self.on_results = on_results
+        self.interval = interval
+        self.background_interval = background_interval
+        self.background = False
+        self.last_bar = None
+        self.scans = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self.stop()
+        # Fresh events per thread so a stopping thread can't swallow a restart
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.last_bar = None
+        self._thread = threading.Thread(target=self._run, args=(self._stop, self._wake), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def set_background(self, background):
+        self.background = background
+        if not background:
+            # Catch up immediately when the user comes back
+            self._wake.set()
+
+    def poll_once(self):
+        """Probe once and scan if a new bar has opened; returns True if scanned"""
+        bar = self.probe()
+        if bar is None or bar == self.last_bar:
+            return False
+        self.scans += 1
+        results = self.scan()
+        # Only a completed scan settles the bar; a failed one is retried next poll
+        self.last_bar = bar
+        if results:
+            self.on_results(results)
+        return True
+
+    def _run(self, stop, wake):
+        while not stop.is_set():
+            try:
+                self.poll_once()
+            except Exception:
+                logger.exception("Scan failed; retrying on the next poll")
+            wake.wait(self.background_interval if self.background else self.interval)
+            wake.clear()
@@ -0,0 +1,166 @@
+"""
+Segment-parallel processing of long recordings.
+
+A file is cut into overlapping segments that worker processes decode
+straight from ffmpeg (input-seeked, mono, fixed rate) and process
+independently, so peak memory follows the segment size rather than the
+track length:
+
+  hpss_file   - HPSS stems, stitched with a linear cross-fade over the
+                overlap and written to disk as they complete, in order
+  yin_file    - f0 track; each segment analyses a margin on both sides
+                and contributes only its core frames, so frames line up
+                with a whole-file librosa.yin run (up to ffmpeg's 1 ms
+                seek resolution)
+  onsets_file - onset times, reconciled the same way as yin_file
+
+Short files gain nothing from this; callers check is_long() first.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_stream import pcm_blocks, probe
+from loudness_engine import default_workers
+
+# Below this, a single in-memory pass is cheaper than spawning workers
+LONG_AUDIO_S = 300.0
+
+
+def read_segment(path, sr, start, length):
+    """Decode [start, start + length) samples of mono audio at sr"""
+    blocks = [b[:, 0].copy() for b in pcm_blocks(path, sr, 1, start=start / sr, length=length / sr)]
+    y = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+    # Seeks can come back a few samples short or long; pin the length
+    if len(y) < length:
+        y = np.pad(y, (0, length - len(y)))
+    return y[:length]
+
+
+def ordered_map(fn, items, workers=None):
+    """Like executor.map, but keeps at most 2 * workers results in flight"""
+    workers = workers or default_workers()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, *item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def is_long(path, threshold_s=LONG_AUDIO_S):
+    duration = probe(path)['duration']
+    return duration is not None and duration > threshold_s
+
+
+def total_samples(path, sr):
+    duration = probe(path)['duration']
+    if not duration:
+        raise ValueError(f"Unknown duration for {os.path.basename(path)}")
+    return int(duration * sr)
+
+
+# ----- HPSS with cross-faded overlap -----
+
+def _hpss_segment(path, sr, start, length):
+    import librosa
+
+    y = read_segment(path, sr, start, length)
+    return librosa.effects.hpss(y)
+
+
+def hpss_file(path, harmonic_out, percussive_out, sr=22050, segment_s=30.0, overlap_s=2.0,
+              workers=None, progress=None):
+    """Write harmonic/percussive stems of `path` with bounded memory"""
+    import soundfile as sf
+
+    total = total_samples(path, sr)
+    segment = int(segment_s * sr)
+    overlap = int(overlap_s * sr)
+    step = segment - overlap
+    starts = list(range(0, max(1, total - overlap), step))
+    jobs = [(path, sr, s, min(segment, total - s)) for s in starts]
+    fade = np.linspace(0.0, 1.0, overlap, dtype=np.float32)
+
+    with sf.SoundFile(harmonic_out, 'w', sr, 1) as h_out, \
+            sf.SoundFile(percussive_out, 'w', sr, 1) as p_out:
+        tails = None
+        for i, (harmonic, percussive) in enumerate(ordered_map(_hpss_segment, jobs, workers)):
+            stems = [harmonic, percussive]
+            if tails is not None:
+                n = min(overlap, len(harmonic))
+                for k in range(2):
+                    stems[k] = stems[k].copy()
+                    stems[k][:n] = tails[k][:n] * (1 - fade[:n]) + stems[k][:n] * fade[:n]
+            last = i == len(jobs) - 1
+            cut = len(stems[0]) if last else len(stems[0]) - overlap
+            h_out.write(stems[0][:cut])
+            p_out.write(stems[1][:cut])
+            tails = None if last else [stems[0][cut:], stems[1][cut:]]
+            if progress:
+                progress((i + 1) / len(jobs))
+    return harmonic_out, percussive_out
+
+
+# ----- frame tracks with core/margin reconciliation -----
+
+def _frame_segments(total, sr, hop_length, segment_s, margin):
+    """(region_start, region_length, core_first_frame, core_frames) per segment.
+
+    Segment cores tile the frame grid exactly; regions add `margin` samples
+    either side (both multiples of hop_length, so frames stay aligned).
+    """
+    n_frames = 1 + total // hop_length
+    core = max(1, int(segment_s * sr) // hop_length)
+    margin_frames = -(-margin // hop_length)
+    out = []
+    for first in range(0, n_frames, core):
+        frames = min(core, n_frames - first)
+        region_start = max(0, (first - margin_frames) * hop_length)
+        region_end = min(total, (first + frames + margin_frames) * hop_length)
+        out.append((region_start, region_end - region_start, first, frames))
+    return out
+
+
+def _yin_segment(path, sr, region_start, region_length, first, frames, fmin, fmax,
+                 frame_length, hop_length):
+    import librosa
+
+    y = read_segment(path, sr, region_start, region_length)
+    f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr, frame_length=frame_length,
+                     hop_length=hop_length)
+    offset = first - region_start // hop_length
+    return f0[offset:offset + frames]
+
+
+def yin_file(path, sr=22050, fmin=65.4, fmax=2093.0, frame_length=2048, hop_length=512,
+             segment_s=60.0, workers=None):
+    """Whole-file librosa.yin equivalent computed segment-parallel"""
+    total = total_samples(path, sr)
+    segments = _frame_segments(total, sr, hop_length, segment_s, margin=2 * frame_length)
+    jobs = [(path, sr, *seg, fmin, fmax, frame_length, hop_length) for seg in segments]
+    parts = list(ordered_map(_yin_segment, jobs, workers))
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def _onset_segment(path, sr, region_start, region_length, first, frames, hop_length):
+    import librosa
+
+    y = read_segment(path, sr, region_start, region_length)
+    local = librosa.onset.onset_detect(y=y, sr=sr, hop_length=hop_length)
+    frame = local + region_start // hop_length
+    return frame[(frame >= first) & (frame < first + frames)]
+
+
+def onsets_file(path, sr=22050, hop_length=512, segment_s=60.0, workers=None):
+    """Onset times in seconds, each onset reported by exactly one segment core"""
+    total = total_samples(path, sr)
+    # Peak picking looks ~1 s around each frame; give it that much context
+    segments = _frame_segments(total, sr, hop_length, segment_s, margin=sr)
+    jobs = [(path, sr, *seg, hop_length) for seg in segments]
+    frames = np.concatenate(list(ordered_map(_onset_segment, jobs, workers)) or [np.zeros(0, int)])
+    return frames * hop_length / sr
@@ -10,6 +10,7 @@ import traceback
 
 class MusicToSightSingingConverter:
     def __init__(self):
+        self.practice_paths = {}
         self.check_system_requirements()
         self.setup_environment()
         
@@ -138,7 +139,6 @@ class MusicToSightSingingConverter:
             # Import inside method to prevent early dependency errors
             import librosa
             from music21 import stream, note, tempo, clef
-            from pydub import AudioSegment
             
             # Create sheet music
             sheet_path = self.create_sheet_music(input_file, librosa)
@@ -146,7 +146,7 @@ class MusicToSightSingingConverter:
                 return None, None
                 
             # Create slowed audio
-            audio_path = self.create_practice_audio(input_file, AudioSegment)
+            audio_path = self.create_practice_audio(input_file)
             
             return sheet_path, audio_path
             
@@ -158,30 +158,23 @@ class MusicToSightSingingConverter:
     def create_sheet_music(self, audio_file, librosa):
         """Convert audio to sheet music with solfege"""
         try:
-            # Load audio with reduced verbosity
-            y, sr = librosa.load(audio_file, sr=None, mono=True)
+            from music21 import stream, note, tempo, clef
+            from artifact_cache import pitch_track
+            from note_extraction import segment_frames
             
-            # Extract pitches using YIN algorithm
-            pitches = librosa.yin(
-                y,
-                fmin=librosa.note_to_hz('C2'),
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr
-            )
+            # Load audio and extract pitches using YIN (both cached by content hash)
+            pitches, sr = pitch_track(audio_file, sr=None, fmin_note='C2', fmax_note='C7')
             
-            # Convert to notes and remove invalid ones
-            notes = []
-            for p in pitches:
-                if p > 0:
-                    try:
-                        notes.append(librosa.hz_to_note(p))
-                    except:
-                        continue
+            # Merge frames into held notes (librosa.yin's default hop is 512)
+            notes = segment_frames(pitches, sr, hop_length=512, tempo=100)
+            if not len(notes):
+                messagebox.showerror("Error", "No sung or played notes were detected.")
+                return None
             
             # Create music21 stream
             s = stream.Stream()
             s.append(clef.TrebleClef())
-            s.append(tempo.MetronomeMark(number=100))
+            s.append(tempo.MetronomeMark(number=notes.tempo))
             
             # Add notes with solfege
             solfege_map = {
@@ -189,14 +182,15 @@ class MusicToSightSingingConverter:
                 'F': 'Fa', 'G': 'Sol', 'A': 'La', 'B': 'Ti'
             }
             
-            for n in notes:
-                try:
-                    note_name = n[:-1] if n[-1].isdigit() else n
-                    n_obj = note.Note(n)
-                    n_obj.lyric = solfege_map.get(note_name.upper(), '')
-                    s.append(n_obj)
-                except:
-                    continue
+            elements = []
+            for midi_pitch, ql, rest in zip(notes.midi.astype(int), notes.quarter_lengths(),
+                                            notes.rest_lengths()):
+                if rest > 0:
+                    elements.append(note.Rest(quarterLength=float(rest)))
+                n_obj = note.Note(int(midi_pitch), quarterLength=float(ql))
+                n_obj.lyric = solfege_map.get(n_obj.pitch.step, '')
+                elements.append(n_obj)
+            s.append(elements)
             
             # Save as PNG
             output = tempfile.NamedTemporaryFile(suffix='.png', delete=False).name
@@ -207,17 +201,14 @@ class MusicToSightSingingConverter:
             messagebox.showerror("Error", f"Sheet music generation failed: {str(e)}")
             return None
 
-    def create_practice_audio(self, audio_file, AudioSegment):
-        """Create slowed down audio for practice"""
+    def create_practice_audio(self, audio_file, speed=0.7):
+        """Create slowed down audio for practice (pitch preserved)"""
         try:
-            audio = AudioSegment.from_file(audio_file)
-            slowed = audio._spawn(
-                audio.raw_data,
-                overrides={"frame_rate": int(audio.frame_rate * 0.7)}
-            )
-            output = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False).name
-            slowed.export(output, format='mp3', bitrate='192k')
-            return output
+            from practice_audio import PRACTICE_SPEEDS, render_speeds
+            
+            # Every practice speed is rendered at once and cached, so switching is instant
+            self.practice_paths = render_speeds(audio_file, sorted(set(PRACTICE_SPEEDS) | {speed}))
+            return self.practice_paths[speed]
         except Exception as e:
             messagebox.showerror("Error", f"Audio processing failed: {str(e)}")
             return None
@@ -286,7 +277,7 @@ def main():
                 # Show results dialog
                 result_window = tk.Toplevel(root)
                 result_window.title("Conversion Results")
-                result_window.geometry("400x200")
+                result_window.geometry("400x240")
                 
                 tk.Label(
                     result_window,
@@ -312,6 +303,17 @@ def main():
                     width=15
                 ).pack(pady=10)
                 
+                # One button per rendered practice speed
+                speed_frame = tk.Frame(result_window)
+                speed_frame.pack(pady=5)
+                for speed, path in sorted(converter.practice_paths.items()):
+                    tk.Button(
+                        speed_frame,
+                        text=f"{int(speed * 100)}%",
+                        command=lambda p=path: converter.open_file(p),
+                        width=6
+                    ).pack(side=tk.LEFT, padx=2)
+                
                 tk.Button(
                     result_window,
                     text="Close",
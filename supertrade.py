@@ -10,6 +10,10 @@ from datetime import datetime
 import json
 import os
 import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from pa_scanner import PAPatternScanner
 
 # Configuration
@@ -287,6 +291,125 @@ def execute_trade(symbol, signal, model_confidence, current_price, volume=None,
         print(f"Trade execution error: {e}")
         return False
 
+# ----------------------------
+# Shared State Channel
+# ----------------------------
+CHART_SERIES = ('time', 'open', 'high', 'low', 'close')
+
+def _freeze(arr):
+    arr = np.ascontiguousarray(arr, dtype=np.float64)
+    arr.setflags(write=False)
+    return arr
+
+@dataclass(frozen=True)
+class ChartSnapshot:
+    """Immutable bot state published to GUIs.
+
+    `series` holds read-only, contiguous float64 arrays (time is epoch seconds)
+    and `bar_version` the channel version at which each bar last changed, so
+    consumers can ask for only the bars that changed since their last read.
+    """
+    version: int = 0
+    series: MappingProxyType = field(default_factory=lambda: MappingProxyType(
+        {name: _freeze(np.empty(0)) for name in CHART_SERIES}))
+    bar_version: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    status: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    def __len__(self):
+        return len(self.bar_version)
+
+    def since(self, version):
+        """Return a snapshot holding only the bars changed after `version`.
+
+        Bar versions are non-decreasing, so the delta is always a tail slice
+        (views, no copy). Consumers splice it in by dropping their own bars
+        with time >= delta.series['time'][0] and appending.
+        """
+        start = int(np.searchsorted(self.bar_version, version, side='right'))
+        return ChartSnapshot(
+            self.version,
+            MappingProxyType({name: arr[start:] for name, arr in self.series.items()}),
+            self.bar_version[start:],
+            self.status,
+        )
+
+class StateChannel:
+    """Versioned single-writer channel between the bot thread and GUIs.
+
+    The bot publishes; readers grab the current snapshot reference without
+    locking. Snapshots are never mutated after publication.
+    """
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._snapshot = ChartSnapshot()
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def snapshot(self):
+        return self._snapshot
+
+    def since(self, version):
+        return self._snapshot.since(version)
+
+    def publish_bars(self, df):
+        """Merge a rates DataFrame (time index, OHLC columns) into the chart history"""
+        incoming = {
+            'time': df.index.values.astype('datetime64[s]').astype(np.int64).astype(np.float64)
+        }
+        for name in CHART_SERIES[1:]:
+            incoming[name] = df[name].to_numpy(dtype=np.float64)
+        n = len(incoming['time'])
+        if n == 0:
+            return self.version
+
+        with self._lock:
+            snap = self._snapshot
+            old = snap.series
+            # Old bars strictly before the incoming window are kept as-is
+            keep = int(np.searchsorted(old['time'], incoming['time'][0], side='left'))
+            overlap = min(len(snap) - keep, n)
+
+            # First incoming bar that differs from what consumers already have
+            changed = np.zeros(n, dtype=bool)
+            changed[overlap:] = True
+            for name in CHART_SERIES:
+                changed[:overlap] |= old[name][keep:keep + overlap] != incoming[name][:overlap]
+            first = int(changed.argmax()) if changed.any() else n
+            if first == n:
+                if keep + overlap == len(snap):
+                    return snap.version
+                # Incoming window ends early: re-send the last bar so consumers drop the stale tail
+                first = n - 1
+
+            version = snap.version + 1
+            bar_version = np.concatenate([
+                snap.bar_version[:keep + first],
+                np.full(n - first, version, dtype=np.int64),
+            ])
+            series = {name: np.concatenate([old[name][:keep], incoming[name]]) for name in CHART_SERIES}
+
+            trim = max(0, len(bar_version) - self.capacity)
+            self._snapshot = ChartSnapshot(
+                version,
+                MappingProxyType({name: _freeze(arr[trim:]) for name, arr in series.items()}),
+                bar_version[trim:],
+                snap.status,
+            )
+            return version
+
+    def publish_status(self, status):
+        """Publish a status record; list values are frozen into tuples"""
+        frozen = {k: tuple(v) if isinstance(v, list) else v for k, v in status.items()}
+        with self._lock:
+            snap = self._snapshot
+            self._snapshot = ChartSnapshot(
+                snap.version + 1, snap.series, snap.bar_version, MappingProxyType(frozen)
+            )
+            return snap.version + 1
+
 # ----------------------------
 # Superpoint Trading Bot Class
 # ----------------------------
@@ -300,9 +423,9 @@ class SuperpointTradingBot:
         self.feature_names = None
         self.last_position = 0  # 0: HOLD, 1: BUY, 2: SELL
         self.model_confidence = 0.0
-        self.latest_data = None
-        self.latest_data = None
-        self.latest_status = {}
+        self.channel = StateChannel()
+        # Pattern/trade markers for chart overlays: (epoch_s, price, side, label)
+        self.chart_markers = deque(maxlen=50)
         
         # Initialize Pattern Scanner
         self.scanner = PAPatternScanner(symbol=config['SYMBOL'], timeframe=config['TIMEFRAME'])
@@ -362,6 +485,58 @@ class SuperpointTradingBot:
             self.log(f"Error getting trading signal: {e}", level=logging.ERROR)
             return 0  # Default to HOLD on error
 
+    def add_chart_marker(self, when, price, side, label):
+        """Record a pattern or trade marker for the GUI chart overlay"""
+        if when is None:
+            return
+        epoch = pd.Timestamp(when).timestamp()
+        marker = (epoch, float(price), side, label)
+        if marker not in self.chart_markers:
+            self.chart_markers.append(marker)
+
+    @property
+    def latest_status(self):
+        """Plain-dict copy of the most recently published status"""
+        return dict(self.channel.snapshot().status)
+
+    @property
+    def latest_data(self):
+        """DataFrame view of the chart history, built on demand.
+
+        Kept for callers that still expect a DataFrame; new code should read
+        `self.channel` instead.
+        """
+        snap = self.channel.snapshot()
+        if len(snap) == 0:
+            return None
+        data = {name: snap.series[name] for name in CHART_SERIES[1:]}
+        index = pd.to_datetime(snap.series['time'], unit='s').rename('time')
+        return pd.DataFrame(data, index=index)
+
+    def chart_buffers(self, names=('time', 'close')):
+        """Return (version, {name: memoryview}) over the full chart history.
+
+        Each memoryview is a read-only, C-contiguous float64 buffer ('d'
+        format) borrowed from the published snapshot, so foreign callers
+        (the Rust bridge) can memcpy it without any per-element conversion.
+        """
+        return self.bars_since(0, names)
+
+    def bars_since(self, version, names=('time', 'close')):
+        """Return (version, {name: memoryview}) for bars changed after `version`.
+
+        Splice the result by dropping cached bars with time >= the first
+        returned time, then appending. An empty buffer means nothing changed.
+        """
+        delta = self.channel.since(version)
+        return delta.version, {name: memoryview(delta.series[name]) for name in names}
+
+    def _last_bar_time(self):
+        times = self.channel.snapshot().series['time']
+        if len(times) == 0:
+            return None
+        return pd.Timestamp(times[-1], unit='s')
+
     def manual_trade(self, signal, volume, sl_points=None, tp_points=None):
         try:
             if not initialize_mt5():
@@ -381,6 +556,8 @@ class SuperpointTradingBot:
             )
             
             if success:
+                side = 'BUY' if signal == 1 else 'SELL'
+                self.add_chart_marker(self._last_bar_time(), current_price, side, f"Manual {side}")
                 self.log(f"Manual {'BUY' if signal == 1 else 'SELL'} executed. Vol: {volume}, SL: {sl_points}, TP: {tp_points}")
             else:
                 self.log("Manual trade failed")
@@ -422,8 +599,8 @@ class SuperpointTradingBot:
                         time.sleep(5)
                         continue
                         
-                    # Store for GUI
-                    self.latest_data = df.copy() if df is not None else None
+                    # Publish bars for GUIs (before indicators mutate df)
+                    self.channel.publish_bars(df)
                         
                     # 2. Process data
                     df = compute_technical_indicators(df)
@@ -451,6 +628,9 @@ class SuperpointTradingBot:
                             current_price
                         ):
                             self.last_position = signal
+                            if signal in (1, 2):
+                                side = "BUY" if signal == 1 else "SELL"
+                                self.add_chart_marker(df.index[-1], current_price, side, f"Auto {side}")
                     
                     # 5. Log status
                     status = {
@@ -467,10 +647,13 @@ class SuperpointTradingBot:
                         pattern_strs = [f"{p.pattern_name} ({p.pattern_type})" for p in patterns]
                         status["patterns"] = ", ".join(pattern_strs)
                         self.log(f"Patterns detected: {status['patterns']}")
+                        for p in patterns:
+                            self.add_chart_marker(p.timestamp, p.price, p.pattern_type, p.pattern_name)
                     else:
                         status["patterns"] = "None"
-                        
-                    self.latest_status = status
+
+                    status["markers"] = list(self.chart_markers)
+                    self.channel.publish_status(status)
                     self.log(f"Status: {status}")
                     
                 except Exception as e:
@@ -7,6 +7,7 @@ from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.dates as mdates
+import numpy as np
 import pandas as pd
 import ast
 import MetaTrader5 as mt5
@@ -14,6 +15,137 @@ import MetaTrader5 as mt5
 # Import the bot
 from supertrade import SuperpointTradingBot, CONFIG
 
+
+class IncrementalChart:
+    """Price chart that updates persistent artists instead of redrawing.
+
+    The history is a single Line2D whose data arrays are swapped in place when a
+    new bar arrives (detected by last timestamp). Ticks on the forming bar only
+    touch an animated tail segment, which is blitted over a cached background.
+    Data comes from the bot's StateChannel, so unchanged versions cost nothing.
+    """
+    MARKER_STYLE = {
+        'BUY': dict(marker='^', color='green'),
+        'SELL': dict(marker='v', color='red'),
+        'NEUTRAL': dict(marker='o', color='gray'),
+    }
+
+    def __init__(self, fig, ax, canvas):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self.background = None
+        self.version = 0
+        self.last_bar_time = None
+        self.last_markers = None
+        # Bar times are epoch seconds; matplotlib date numbers are days since its epoch
+        self.epoch_offset = mdates.date2num(np.datetime64('1970-01-01T00:00:00'))
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+
+        self.line, = ax.plot([], [], label='Close Price', color='blue', linewidth=1)
+        self.tail, = ax.plot([], [], color='blue', linewidth=1, animated=True)
+        self.last_dot, = ax.plot([], [], 'o', color='blue', markersize=4, animated=True)
+        self.marker_artists = {
+            side: ax.plot([], [], linestyle='none', markersize=8, label=side.title(), **style)[0]
+            for side, style in self.MARKER_STYLE.items()
+        }
+
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Price")
+        ax.grid(True, alpha=0.3)
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+        ax.legend(loc='upper left')
+        self.fig.autofmt_xdate()
+
+        # Cached background is invalid after any resize
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.ax.draw_artist(self.tail)
+        self.ax.draw_artist(self.last_dot)
+
+    def set_title(self, title):
+        self.ax.set_title(title)
+
+    def reset(self):
+        """Forget cached state so the next update performs a full redraw"""
+        self.version = 0
+        self.last_bar_time = None
+        self.last_markers = None
+
+    def update(self, channel):
+        """Pull the bars changed since the last update from the bot's StateChannel"""
+        snap = channel.snapshot()
+        if snap.version == self.version:
+            return
+        delta = snap.since(self.version)
+        self.version = snap.version
+        markers = snap.status.get('markers')
+
+        times = snap.series['time']
+        if len(times) < 2:
+            return
+        close = snap.series['close']
+
+        if len(delta) > 1 or times[-1] != self.last_bar_time:
+            # New bar(s) or spliced history: swap the line's arrays
+            self.x = times / 86400.0 + self.epoch_offset
+            self.y = close
+            self.last_bar_time = times[-1]
+            self._update_markers(markers)
+            self._full_redraw()
+        elif len(delta) == 1:
+            # Only the forming bar moved
+            self.y = close
+            lo, hi = self.ax.get_ylim()
+            if markers != self.last_markers or not lo <= close[-1] <= hi:
+                self._update_markers(markers)
+                self._full_redraw()
+            else:
+                self._blit_tail()
+        elif markers != self.last_markers:
+            self._update_markers(markers)
+            self._full_redraw()
+
+    def _update_markers(self, markers):
+        self.last_markers = markers
+        grouped = {side: ([], []) for side in self.marker_artists}
+        for epoch, price, side, _label in markers or ():
+            xs, ys = grouped.get(side, grouped['NEUTRAL'])
+            xs.append(epoch)
+            ys.append(price)
+        for side, (xs, ys) in grouped.items():
+            self.marker_artists[side].set_data(np.asarray(xs, dtype=float) / 86400.0 + self.epoch_offset, ys)
+
+    def _full_redraw(self):
+        # History line stops at the previous bar; the forming bar lives in the tail
+        self.line.set_data(self.x[:-1], self.y[:-1])
+        self._set_tail()
+        self.ax.set_xlim(self.x[0], self.x[-1])
+        lo, hi = float(self.y.min()), float(self.y.max())
+        pad = (hi - lo) * 0.05 or abs(hi) * 0.001 or 1.0
+        self.ax.set_ylim(lo - pad, hi + pad)
+        self.canvas.draw()  # triggers _on_draw, which caches the background
+
+    def _set_tail(self):
+        self.tail.set_data(self.x[-2:], self.y[-2:])
+        self.last_dot.set_data(self.x[-1:], self.y[-1:])
+
+    def _blit_tail(self):
+        if self.background is None:
+            self._full_redraw()
+            return
+        self._set_tail()
+        self.canvas.restore_region(self.background)
+        self._draw_animated()
+        self.canvas.blit(self.ax.bbox)
+
+
 class TradingBotGUI:
     def __init__(self, root):
         self.root = root
@@ -24,7 +156,6 @@ class TradingBotGUI:
         self.bot_thread = None
         self.log_queue = queue.Queue()
         self.last_chart_update_time = None
-        self.last_data_shape = None
         
         # Timeframe mapping
         self.timeframe_map = {
@@ -148,6 +279,8 @@ class TradingBotGUI:
         
         self.fig, self.ax = plt.subplots(figsize=(8, 4), dpi=100)
         self.canvas = FigureCanvasTkAgg(self.fig, master=chart_frame)
+        self.chart = IncrementalChart(self.fig, self.ax, self.canvas)
+        self.chart.set_title(f"{CONFIG['SYMBOL']} Price History")
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
         
@@ -204,30 +337,9 @@ class TradingBotGUI:
         except:
             pass
 
-        if self.bot and self.bot.latest_data is not None:
+        if self.bot:
             try:
-                df = self.bot.latest_data
-                
-                # Optimization: Only redraw if data has changed
-                current_shape = df.shape
-                if self.last_data_shape != current_shape:
-                    self.last_data_shape = current_shape
-                    
-                    self.ax.clear()
-                    self.ax.plot(df.index, df['close'], label='Close Price', color='blue')
-                    
-                    # Format chart
-                    self.ax.set_title(f"{CONFIG['SYMBOL']} Price History")
-                    self.ax.set_xlabel("Time")
-                    self.ax.set_ylabel("Price")
-                    self.ax.legend()
-                    self.ax.grid(True, alpha=0.3)
-                    
-                    # Format x-axis dates
-                    self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-                    self.fig.autofmt_xdate()
-                    
-                    self.canvas.draw()
+                self.chart.update(self.bot.channel)
             except Exception as e:
                 print(f"Chart update error: {e}")
                 
@@ -250,6 +362,8 @@ class TradingBotGUI:
             CONFIG['TIMEFRAME'] = self.timeframe_map[tf_str]
             
         self.symbol_lbl.config(text=f"Symbol: {CONFIG['SYMBOL']}")
+        self.chart.set_title(f"{CONFIG['SYMBOL']} Price History")
+        self.chart.reset()
             
         self.bot = SuperpointTradingBot(CONFIG, log_callback=self.log)
         self.bot_thread = threading.Thread(target=self.bot.run, daemon=True)
@@ -1,6 +1,11 @@
+use pyo3::buffer::PyBuffer;
 use pyo3::prelude::*;
 use pyo3::types::PyDict;
 use serde::{Deserialize, Serialize};
+use std::cell::{Cell, RefCell};
+
+// Matches the Python StateChannel capacity
+const MAX_CHART_BARS: usize = 5000;
 
 #[derive(Clone, Debug, Serialize, Deserialize)]
 pub struct BotStatus {
@@ -19,6 +24,9 @@ pub struct ChartData {
 
 pub struct BotBridge {
     bot_instance: PyObject,
+    // Last channel version pulled and the bars received so far
+    chart_version: Cell<u64>,
+    chart_cache: RefCell<ChartData>,
 }
 
 impl BotBridge {
@@ -38,7 +46,14 @@ impl BotBridge {
             let bot_class = supertrade.getattr("SuperpointTradingBot")?;
             let bot_instance = bot_class.call1((config,))?.into();
 
-            Ok(BotBridge { bot_instance })
+            Ok(BotBridge {
+                bot_instance,
+                chart_version: Cell::new(0),
+                chart_cache: RefCell::new(ChartData {
+                    time: Vec::new(),
+                    close: Vec::new(),
+                }),
+            })
         })
     }
 
@@ -91,38 +106,43 @@ impl BotBridge {
     }
 
     pub fn get_latest_data(&self) -> PyResult<Option<ChartData>> {
-        Python::with_gil(|py| {
-            let latest_data = self.bot_instance.getattr(py, "latest_data")?;
-            if latest_data.is_none(py) {
-                return Ok(None);
+        // Only the delta since our last version crosses the boundary; the GIL
+        // is held just long enough to memcpy two contiguous float64 buffers.
+        let (version, time, close) = Python::with_gil(|py| -> PyResult<(u64, Vec<f64>, Vec<f64>)> {
+            let result = self
+                .bot_instance
+                .as_ref(py)
+                .call_method1("bars_since", (self.chart_version.get(),))?;
+            let version: u64 = result.get_item(0)?.extract()?;
+            let buffers = result.get_item(1)?;
+
+            let time = PyBuffer::<f64>::get(buffers.get_item("time")?)?.to_vec(py)?;
+            let close = PyBuffer::<f64>::get(buffers.get_item("close")?)?.to_vec(py)?;
+            Ok((version, time, close))
+        })?;
+
+        self.chart_version.set(version);
+        let mut cache = self.chart_cache.borrow_mut();
+
+        // Splice: changed bars replace everything from their first timestamp on
+        if let Some(&first) = time.first() {
+            let cut = cache.time.partition_point(|&t| t < first);
+            cache.time.truncate(cut);
+            cache.close.truncate(cut);
+            cache.time.extend_from_slice(&time);
+            cache.close.extend_from_slice(&close);
+
+            if cache.time.len() > MAX_CHART_BARS {
+                let excess = cache.time.len() - MAX_CHART_BARS;
+                cache.time.drain(..excess);
+                cache.close.drain(..excess);
             }
+        }
 
-            // Convert pandas DataFrame to vectors
-            // Assuming df has index 'time' and column 'close'
-
-            // Convert datetime index to timestamps (float)
-            // This might be tricky without pandas knowledge, but let's try casting to int/float
-            // Or we can use a helper in Python
-
-            // Let's use a small python snippet to extract lists
-            let locals = PyDict::new(py);
-            locals.set_item("df", latest_data)?;
-
-            let py_code = "
-timestamps = df.index.astype('int64') // 10**9 # Convert ns to seconds
-closes = df['close'].values.tolist()
-timestamps = timestamps.tolist()
-";
-            py.run(py_code, None, Some(locals))?;
-
-            let timestamps: Vec<f64> = locals.as_ref().get_item("timestamps")?.extract()?;
-            let closes: Vec<f64> = locals.as_ref().get_item("closes")?.extract()?;
-
-            Ok(Some(ChartData {
-                time: timestamps,
-                close: closes,
-            }))
-        })
+        if cache.time.is_empty() {
+            return Ok(None);
+        }
+        Ok(Some(cache.clone()))
     }
 
     pub fn get_status(&self) -> PyResult<Option<BotStatus>> {
@@ -0,0 +1,327 @@
+"""
+Bulk tag reading and writing (ID3, Vorbis comments, APEv2) via mutagen.
+
+Tags are exchanged as {KEY: [values]} with Vorbis-style upper-case keys
+(TITLE, ARTIST, REPLAYGAIN_TRACK_GAIN, ...) whatever the container, so a
+FLAC's tags can be copied onto the MP3 re-encoded from it without losing
+frames. Common keys map to the native ID3 frames / APE items; anything
+else becomes a TXXX frame or a same-named APE item.
+
+Only the tag region is parsed: ID3() instead of MP3() (no frame scan),
+FLAC metadata blocks, the first Ogg pages, the APE footer. Saves keep the
+existing padding whenever the new tag fits, so a tag-only edit rewrites a
+few KB in place instead of moving the whole audio payload. mutagen drops
+the GIL during file I/O, so read_many()/write_many() run across a thread
+pool and stream (path, result, error) as files complete:
+
+    for path, tags, error in read_many(paths):
+        ...
+    for path, written, error in write_many((p, {'GENRE': 'Jazz'}) for p in paths):
+        ...
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 2) * 4)   # I/O-bound, not CPU-bound
+
+ID3_EXTS = (".mp3",)
+VORBIS_EXTS = (".flac", ".ogg", ".oga", ".opus")
+APE_EXTS = (".ape", ".wv", ".mpc", ".mp+")
+
+ID3_FRAMES = {
+    'TITLE': 'TIT2', 'ARTIST': 'TPE1', 'ALBUM': 'TALB', 'ALBUMARTIST': 'TPE2',
+    'DATE': 'TDRC', 'GENRE': 'TCON', 'TRACKNUMBER': 'TRCK', 'DISCNUMBER': 'TPOS',
+    'COMPOSER': 'TCOM', 'BPM': 'TBPM', 'COPYRIGHT': 'TCOP', 'LYRICIST': 'TEXT',
+}
+APE_KEYS = {
+    'TITLE': 'Title', 'ARTIST': 'Artist', 'ALBUM': 'Album', 'ALBUMARTIST': 'Album Artist',
+    'DATE': 'Year', 'GENRE': 'Genre', 'TRACKNUMBER': 'Track', 'DISCNUMBER': 'Disc',
+    'COMPOSER': 'Composer', 'COMMENT': 'Comment', 'COPYRIGHT': 'Copyright',
+}
+# Carried as pictures, not text, when copying between containers
+_BINARY_KEYS = {'METADATA_BLOCK_PICTURE', 'COVERART'}
+# Loudness tags; stale once the audio they describe had gain applied
+LOUDNESS_KEY_PREFIXES = ('REPLAYGAIN_', 'R128_')
+# ...plus MP3Gain's undo record, which only means something on the original file
+GAIN_KEY_PREFIXES = LOUDNESS_KEY_PREFIXES + ('MP3GAIN_',)
+
+
+@dataclass
+class Picture:
+    data: bytes
+    mime: str = "image/jpeg"
+    type: int = 3                # front cover
+    desc: str = ""
+
+
+def replaygain_values(result, album=None):
+    """ReplayGain 2.0 keys for a loudness_r128 result (and album result)"""
+    values = {
+        'REPLAYGAIN_TRACK_GAIN': f"{result['track_gain']:+.2f} dB",
+        'REPLAYGAIN_TRACK_PEAK': f"{result['true_peak']:.6f}",
+        'REPLAYGAIN_REFERENCE_LOUDNESS': "-18.00 LUFS",
+    }
+    if album is not None:
+        values['REPLAYGAIN_ALBUM_GAIN'] = f"{album['album_gain']:+.2f} dB"
+        values['REPLAYGAIN_ALBUM_PEAK'] = f"{album['true_peak']:.6f}"
+    return values
+
+
+def _kind(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ID3_EXTS:
+        return "id3"
+    if ext in VORBIS_EXTS:
+        return "vorbis"
+    if ext in APE_EXTS:
+        return "ape"
+    return None
+
+
+def _keep_padding(info):
+    """mutagen padding policy: reuse what is there, grow only when the tag no longer fits"""
+    return info.padding if info.padding >= 0 else info.get_default_padding()
+
+
+def _as_list(value):
+    return [str(v) for v in value] if isinstance(value, (list, tuple)) else [str(value)]
+
+
+# ----- ID3 -----
+
+def _load_id3(path):
+    from mutagen.id3 import ID3, ID3NoHeaderError
+
+    try:
+        return ID3(path)
+    except ID3NoHeaderError:
+        return ID3()
+
+
+def _read_id3(path):
+    tags = _load_id3(path)
+    frame_keys = {frame: key for key, frame in ID3_FRAMES.items()}
+    out = {}
+    for frame in tags.values():
+        if frame.FrameID in frame_keys:
+            out[frame_keys[frame.FrameID]] = [str(t) for t in frame.text]
+        elif frame.FrameID == 'TXXX':
+            out[frame.desc.upper()] = [str(t) for t in frame.text]
+        elif frame.FrameID == 'COMM' and not frame.desc:
+            out.setdefault('COMMENT', [str(t) for t in frame.text])
+    return out
+
+
+def _write_id3(path, values, remove, pictures=None):
+    from mutagen.id3 import APIC, COMM, TXXX, Frames
+
+    tags = _load_id3(path)
+    # Files stay in the ID3 version they were in (v2.3 for most taggers)
+    version = 3 if tags.version[:2] == (2, 3) else 4
+    for key in list(values) + list(remove):
+        key = key.upper()
+        if key in ID3_FRAMES:
+            tags.delall(ID3_FRAMES[key])
+        elif key == 'COMMENT':
+            for frame in tags.getall('COMM'):
+                if not frame.desc:
+                    tags.delall(frame.HashKey)
+        else:
+            # Other taggers write descriptions in any case
+            for frame in tags.getall('TXXX'):
+                if frame.desc.upper() == key:
+                    tags.delall(frame.HashKey)
+    for key, value in values.items():
+        key, text = key.upper(), _as_list(value)
+        if key in ID3_FRAMES:
+            tags.add(Frames[ID3_FRAMES[key]](encoding=3, text=text))
+        elif key == 'COMMENT':
+            tags.add(COMM(encoding=3, lang='eng', desc='', text=text))
+        else:
+            tags.add(TXXX(encoding=3, desc=key, text=text))
+    if pictures:
+        tags.delall('APIC')
+        for pic in pictures:
+            tags.add(APIC(encoding=3, mime=pic.mime, type=pic.type, desc=pic.desc, data=pic.data))
+    tags.save(path, v2_version=version, padding=_keep_padding)
+
+
+# ----- Vorbis comments (FLAC, Ogg) -----
+
+def _load_vorbis(path):
+    import mutagen
+
+    audio = mutagen.File(path)
+    if audio is None:
+        raise ValueError(f"Unrecognised file: {os.path.basename(path)}")
+    if audio.tags is None:
+        audio.add_tags()
+    return audio
+
+
+def _read_vorbis(path):
+    out = {}
+    for key, value in _load_vorbis(path).tags.items():
+        out.setdefault(key.upper(), []).extend(value)
+    return out
+
+
+def _write_vorbis(path, values, remove, pictures=None):
+    from mutagen.flac import FLAC, Picture as FLACPicture
+
+    audio = _load_vorbis(path)
+    for key in remove:
+        if key in audio.tags:
+            del audio.tags[key]
+    for key, value in values.items():
+        audio.tags[key.upper()] = _as_list(value)
+    if pictures and isinstance(audio, FLAC):
+        audio.clear_pictures()
+        for pic in pictures:
+            block = FLACPicture()
+            block.data, block.mime, block.type, block.desc = pic.data, pic.mime, pic.type, pic.desc
+            audio.add_picture(block)
+    audio.save(padding=_keep_padding)
+
+
+# ----- APEv2 -----
+
+def _load_ape(path):
+    from mutagen.apev2 import APEv2, APENoHeaderError
+
+    try:
+        return APEv2(path)
+    except APENoHeaderError:
+        return APEv2()
+
+
+def _read_ape(path):
+    from mutagen.apev2 import TEXT
+
+    ape_keys = {item.upper(): key for key, item in APE_KEYS.items()}
+    out = {}
+    for key, value in _load_ape(path).items():
+        if value.kind == TEXT:
+            out[ape_keys.get(key.upper(), key.upper())] = list(value)
+    return out
+
+
+def _write_ape(path, values, remove, pictures=None):
+    tag = _load_ape(path)
+    for key in list(values) + list(remove):
+        item = APE_KEYS.get(key.upper(), key.upper())
+        if item in tag:
+            del tag[item]
+    for key, value in values.items():
+        tag[APE_KEYS.get(key.upper(), key.upper())] = _as_list(value)
+    # APE tags sit at the end of the file; only the tail is rewritten
+    tag.save(path)
+
+
+_READERS = {'id3': _read_id3, 'vorbis': _read_vorbis, 'ape': _read_ape}
+_WRITERS = {'id3': _write_id3, 'vorbis': _write_vorbis, 'ape': _write_ape}
+
+
+# ----- single file -----
+
+def read_tags(path):
+    """{KEY: [values]} of the file's text tags; {} for unsupported formats"""
+    kind = _kind(path)
+    return _READERS[kind](path) if kind else {}
+
+
+def write_tags(path, values, remove=()):
+    """Set `values` ({KEY: value or [values]}) and delete `remove` keys, in place.
+
+    Other tags are left alone. Returns False for formats without a
+    supported tag container.
+    """
+    kind = _kind(path)
+    if kind is None:
+        return False
+    _WRITERS[kind](path, values, remove)
+    return True
+
+
+def strip_loudness_tags(path):
+    """Drop ReplayGain/R128 tags after an in-place gain change; returns the keys removed.
+
+    For MP3s this edits the ID3 tag only, so MP3GAIN_UNDO in the APEv2 tag
+    (what undo_gain reads) is kept.
+    """
+    stale = [key for key in read_tags(path) if key.startswith(LOUDNESS_KEY_PREFIXES)]
+    if stale:
+        write_tags(path, {}, remove=stale)
+    return stale
+
+
+def read_pictures(path):
+    """Embedded cover art of ID3 and FLAC files"""
+    kind = _kind(path)
+    if kind == "id3":
+        return [Picture(f.data, f.mime, int(f.type), f.desc) for f in _load_id3(path).getall('APIC')]
+    if kind == "vorbis" and path.lower().endswith(".flac"):
+        from mutagen.flac import FLAC
+
+        return [Picture(p.data, p.mime, p.type, p.desc) for p in FLAC(path).pictures]
+    return []
+
+
+def copy_tags(src, dst, pictures=True, exclude=()):
+    """Carry text tags (and cover art) from src over to dst, e.g. after a re-encode.
+
+    Keys starting with any of the `exclude` prefixes are neither copied nor
+    left on dst; pass GAIN_KEY_PREFIXES when dst had gain applied.
+    """
+    kind = _kind(dst)
+    if kind is None:
+        return False
+    exclude = tuple(exclude)
+
+    def excluded(key):
+        return bool(exclude) and key.startswith(exclude)
+
+    values = {k: v for k, v in read_tags(src).items() if k not in _BINARY_KEYS and not excluded(k)}
+    remove = [k for k in read_tags(dst) if excluded(k)]
+    _WRITERS[kind](dst, values, remove, read_pictures(src) if pictures else None)
+    return True
+
+
+# ----- bulk -----
+
+def _bounded(fn, items, workers):
+    """Yield (item, result, error) as tasks finish, at most 4 * workers in flight"""
+    workers = workers or DEFAULT_WORKERS
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        items = iter(items)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < 4 * workers:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[pool.submit(fn, item)] = item
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, str(e)
+
+
+def read_many(paths, workers=None):
+    """Yield (path, tags, error) for every path, in completion order"""
+    yield from _bounded(read_tags, paths, workers)
+
+
+def write_many(items, workers=None):
+    """Write (path, values) pairs; yields (path, written, error) in completion order"""
+    for (path, _values), written, error in _bounded(lambda item: write_tags(*item), items, workers):
+        yield path, written, error
@@ -0,0 +1,275 @@
+"""
+Warm-model Basic Pitch transcription service.
+
+predict_and_save() given a model *path* loads the network again for every
+call. This service loads it once per worker thread and keeps it warm, so
+an album or a watched folder is transcribed as one job:
+
+    service = get_service()
+    service.transcribe("song.mp3", "out/")             # one file
+    service.transcribe_many(paths, "out/", on_result)  # batch over the pool
+    service.watch("inbox/", "out/")                     # until stop()
+
+    python transcription_service.py a.mp3 b.wav -o out --workers 2
+    python transcription_service.py --watch inbox -o out
+"""
+import argparse
+import csv
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from artifact_cache import get_cache
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".flac", ".ogg", ".m4a")
+
+
+def default_model_path():
+    from basic_pitch import ICASSP_2022_MODEL_PATH
+
+    # Prefer the TFLite export: much faster to load and run than the SavedModel
+    tflite = str(ICASSP_2022_MODEL_PATH)
+    if not tflite.endswith(".tflite"):
+        tflite += ".tflite"
+    return tflite if os.path.exists(tflite) else str(ICASSP_2022_MODEL_PATH)
+
+
+def midi_output_path(audio_path, output_dir):
+    base = os.path.splitext(os.path.basename(audio_path))[0]
+    return os.path.join(output_dir, f"{base}_basic_pitch.mid")
+
+
+def write_note_events(note_events, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["start_time_s", "end_time_s", "pitch_midi", "velocity", "pitch_bend"])
+        for start, end, pitch, amplitude, bends in note_events:
+            writer.writerow([f"{start:.4f}", f"{end:.4f}", int(pitch),
+                             int(round(127 * amplitude)), " ".join(str(b) for b in (bends or []))])
+
+
+class TranscriptionService:
+    """Loads the Basic Pitch model once per worker and transcribes queued files.
+
+    The TFLite interpreter is not thread-safe, so each pool thread gets its
+    own model instance (loaded on its first file, then reused).
+    """
+    def __init__(self, model_path=None, workers=1, save_notes=True):
+        self.model_path = model_path
+        self.workers = max(1, workers)
+        self.save_notes = save_notes
+        self._local = threading.local()
+        self._pool = None
+        self._stop = threading.Event()
+
+    def _model(self):
+        model = getattr(self._local, "model", None)
+        if model is None:
+            from basic_pitch.inference import Model
+
+            model = Model(self.model_path or default_model_path())
+            self._local.model = model
+        return model
+
+    def warm_up(self):
+        """Start loading the model on a pool thread ahead of the first file"""
+        return self.pool.submit(self._model)
+
+    def transcribe(self, audio_path, output_dir=None):
+        """Transcribe one file on the pool (blocking); returns output paths and note count.
+
+        Callers run on short-lived threads, so the work is always handed to
+        the long-lived pool threads that hold the warm models.
+        """
+        return self.submit(audio_path, output_dir).result()
+
+    def _transcribe(self, audio_path, output_dir=None):
+        output_dir = output_dir or os.path.dirname(os.path.abspath(audio_path))
+        os.makedirs(output_dir, exist_ok=True)
+        midi_path = midi_output_path(audio_path, output_dir)
+        notes_path = os.path.splitext(midi_path)[0] + ".csv"
+
+        # Same audio content + same model = same output, whatever the file name
+        cache = get_cache()
+        model_name = os.path.basename(str(self.model_path or default_model_path()))
+        midi_key = cache.key(audio_path, "basic_pitch_midi", model=model_name)
+        notes_key = cache.key(audio_path, "basic_pitch_notes", model=model_name)
+        cached_midi = cache.lookup(midi_key)
+        cached_notes = cache.lookup(notes_key)
+        if cached_midi is not None and cached_notes is not None:
+            shutil.copyfile(cached_midi, midi_path)
+            if self.save_notes:
+                shutil.copyfile(cached_notes, notes_path)
+            with open(cached_notes) as f:
+                note_count = sum(1 for _ in f) - 1
+            return {'audio': audio_path, 'midi': midi_path,
+                    'notes': notes_path if self.save_notes else None,
+                    'note_count': note_count, 'cached': True}
+
+        from basic_pitch.inference import predict
+
+        _, midi_data, note_events = predict(audio_path, self._model())
+        midi_data.write(midi_path)
+        write_note_events(note_events, notes_path)
+        cache.store(midi_key, midi_path, ".mid")
+        cache.store(notes_key, notes_path, ".csv")
+        if not self.save_notes:
+            os.remove(notes_path)
+        return {'audio': audio_path, 'midi': midi_path,
+                'notes': notes_path if self.save_notes else None,
+                'note_count': len(note_events), 'cached': False}
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix="transcribe")
+        return self._pool
+
+    def submit(self, audio_path, output_dir=None):
+        return self.pool.submit(self._transcribe, audio_path, output_dir)
+
+    def transcribe_many(self, audio_paths, output_dir=None, on_result=None,
+                        skip_duplicates=False):
+        """Transcribe a batch across the pool; on_result(path, result, error) per file.
+
+        skip_duplicates=True fingerprints the batch first (fingerprint_index)
+        and transcribes one copy of each song; other copies get its MIDI.
+        """
+        copies = {}
+        if skip_duplicates:
+            from fingerprint_index import get_index
+
+            dupes = get_index().duplicates(audio_paths, workers=self.workers)
+            for dup, original in dupes.items():
+                copies.setdefault(original, []).append(dup)
+            audio_paths = [p for p in audio_paths if os.path.abspath(p) not in dupes]
+
+        futures = {self.submit(path, output_dir): path for path in audio_paths}
+        results = []
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result, error = future.result(), None
+                results.append(result)
+            except Exception as e:
+                result, error = None, str(e)
+            if on_result:
+                on_result(path, result, error)
+            for dup in copies.get(os.path.abspath(path), []):
+                dup_result, dup_error = (self._copy_result(result, dup, output_dir), None) \
+                    if result else (None, error)
+                if dup_result:
+                    results.append(dup_result)
+                if on_result:
+                    on_result(dup, dup_result, dup_error)
+        return results
+
+    def _copy_result(self, result, audio_path, output_dir=None):
+        """Outputs of another copy of the same song, written under this file's name"""
+        output_dir = output_dir or os.path.dirname(os.path.abspath(audio_path))
+        midi_path = midi_output_path(audio_path, output_dir)
+        shutil.copyfile(result['midi'], midi_path)
+        notes_path = None
+        if result['notes']:
+            notes_path = os.path.splitext(midi_path)[0] + ".csv"
+            shutil.copyfile(result['notes'], notes_path)
+        return dict(result, audio=audio_path, midi=midi_path, notes=notes_path,
+                    duplicate_of=result['audio'])
+
+    def watch(self, directory, output_dir=None, interval=2.0, on_result=None):
+        """Transcribe audio files as they appear in `directory` until stop().
+
+        A file is picked up once its size has stopped changing between two
+        polls, and skipped if its MIDI output already exists.
+        """
+        output_dir = output_dir or directory
+        self._stop.clear()
+        sizes = {}
+        queued = set()
+        while not self._stop.is_set():
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                if not name.lower().endswith(AUDIO_EXTENSIONS) or path in queued:
+                    continue
+                if os.path.exists(midi_output_path(path, output_dir)):
+                    queued.add(path)
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    # Deleted or renamed since the listing; forget it
+                    sizes.pop(path, None)
+                    continue
+                if sizes.get(path) == size:
+                    queued.add(path)
+                    future = self.submit(path, output_dir)
+                    if on_result:
+                        future.add_done_callback(
+                            lambda f, p=path: on_result(p, *(
+                                (f.result(), None) if f.exception() is None
+                                else (None, str(f.exception())))))
+                else:
+                    sizes[path] = size
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        self.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """Process-wide shared service so every tool reuses the same warm model"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TranscriptionService()
+        return _service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch Basic Pitch transcription")
+    parser.add_argument("files", nargs="*", help="audio files to transcribe")
+    parser.add_argument("-o", "--output", help="output directory (default: next to each file)")
+    parser.add_argument("--workers", type=int, default=1, help="model instances to run in parallel")
+    parser.add_argument("--watch", metavar="DIR", help="keep transcribing new files dropped in DIR")
+    parser.add_argument("--no-notes", action="store_true", help="skip the note-event CSV")
+    parser.add_argument("--skip-duplicates", action="store_true",
+                        help="transcribe one copy of songs found more than once (by fingerprint)")
+    args = parser.parse_args()
+
+    service = TranscriptionService(workers=args.workers, save_notes=not args.no_notes)
+
+    def report(path, result, error):
+        if error:
+            print(f"✗ {os.path.basename(path)}: {error}")
+        else:
+            print(f"✓ {os.path.basename(path)} -> {result['midi']} ({result['note_count']} notes)")
+
+    start = time.perf_counter()
+    try:
+        if args.files:
+            service.transcribe_many(args.files, args.output, report, args.skip_duplicates)
+            print(f"{len(args.files)} file(s) in {time.perf_counter() - start:.1f}s")
+        if args.watch:
+            print(f"Watching {args.watch} (Ctrl+C to stop)...")
+            service.watch(args.watch, args.output, on_result=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
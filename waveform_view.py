@@ -0,0 +1,154 @@
+"""
+Level-of-detail waveform and piano-roll drawing for music_studio_gui.py.
+
+WaveformPyramid streams the whole file once through ffmpeg and keeps
+min/max envelopes at several zoom levels (base bins of 256 samples, each
+level 4x coarser), cached by content hash. WaveformView redraws only the
+visible span from the coarsest level that still has one bin per pixel, so
+zooming and panning an hour-long file touches a few thousand points.
+
+draw_piano_roll() draws every note as one PolyCollection instead of a
+barh() artist per note.
+"""
+import numpy as np
+from matplotlib.collections import PolyCollection
+
+from artifact_cache import get_cache
+from audio_stream import pcm_blocks, probe
+
+BASE_BIN = 256
+FACTOR = 4
+
+
+class WaveformPyramid:
+    """levels[k] = (mins, maxs) over bins of BASE_BIN * FACTOR**k samples"""
+    def __init__(self, levels, sample_rate, base_bin=BASE_BIN, factor=FACTOR):
+        self.levels = levels
+        self.sample_rate = sample_rate
+        self.base_bin = base_bin
+        self.factor = factor
+
+    @property
+    def duration(self):
+        return len(self.levels[0][0]) * self.base_bin / self.sample_rate
+
+    @classmethod
+    def from_file(cls, path, base_bin=BASE_BIN, factor=FACTOR):
+        """Build (or load from the artifact cache) the pyramid of a file"""
+        sample_rate = probe(path)['sample_rate']
+
+        def compute():
+            mins, maxs = _base_level(path, sample_rate, base_bin)
+            arrays = {}
+            for k, (lo, hi) in enumerate(_build_levels(mins, maxs, factor)):
+                arrays[f'min{k}'], arrays[f'max{k}'] = lo, hi
+            return arrays
+
+        data = get_cache().arrays(path, "waveform", compute, base_bin=base_bin, factor=factor)
+        levels = [(data[f'min{k}'], data[f'max{k}']) for k in range(len(data) // 2)]
+        return cls(levels, sample_rate, base_bin, factor)
+
+    def envelope(self, t0, t1, max_points=2000):
+        """(times, mins, maxs) for [t0, t1] with at most ~max_points bins"""
+        span = max(t1 - t0, 0.0) * self.sample_rate
+        level = 0
+        while level + 1 < len(self.levels) and \
+                span / (self.base_bin * self.factor ** level) > max_points:
+            level += 1
+        bin_size = self.base_bin * self.factor ** level
+        mins, maxs = self.levels[level]
+        i0 = max(0, int(t0 * self.sample_rate // bin_size))
+        i1 = min(len(mins), int(np.ceil(t1 * self.sample_rate / bin_size)) + 1)
+        times = (np.arange(i0, i1) + 0.5) * bin_size / self.sample_rate
+        return times, mins[i0:i1], maxs[i0:i1]
+
+
+def _base_level(path, sample_rate, base_bin):
+    """Per-bin min/max of the mono downmix, one decoded block at a time"""
+    mins, maxs = [], []
+    carry = np.zeros(0, dtype=np.float32)
+    for block in pcm_blocks(path, sample_rate, 1):
+        samples = np.concatenate([carry, block[:, 0]])
+        full = len(samples) // base_bin * base_bin
+        bins = samples[:full].reshape(-1, base_bin)
+        mins.append(bins.min(axis=1))
+        maxs.append(bins.max(axis=1))
+        carry = samples[full:].copy()
+    if len(carry):
+        mins.append(carry.min(keepdims=True))
+        maxs.append(carry.max(keepdims=True))
+    if not mins:
+        return np.zeros(1, np.float32), np.zeros(1, np.float32)
+    return np.concatenate(mins), np.concatenate(maxs)
+
+
+def _build_levels(mins, maxs, factor, min_bins=512):
+    levels = [(mins, maxs)]
+    while len(mins) > min_bins:
+        pad = -len(mins) % factor
+        mins = np.pad(mins, (0, pad), mode='edge').reshape(-1, factor).min(axis=1)
+        maxs = np.pad(maxs, (0, pad), mode='edge').reshape(-1, factor).max(axis=1)
+        levels.append((mins, maxs))
+    return levels
+
+
+class WaveformView:
+    """Keeps one fill artist on `ax` in sync with its x-limits.
+
+    Don't call ax.clear() afterwards: it drops the xlim callback.
+    """
+    def __init__(self, ax, color='#E94560', alpha=0.8):
+        self.ax = ax
+        self.color = color
+        self.alpha = alpha
+        self.pyramid = None
+        self._artist = None
+        ax.callbacks.connect('xlim_changed', lambda _ax: self.redraw())
+
+    def set_pyramid(self, pyramid):
+        self.pyramid = pyramid
+        self.ax.set_ylim(-1.05, 1.05)
+        self.ax.set_xlim(0, pyramid.duration)  # triggers redraw()
+
+    def redraw(self):
+        if self.pyramid is None:
+            return
+        t0, t1 = self.ax.get_xlim()
+        # Two bins per horizontal pixel is visually indistinguishable from all samples
+        max_points = max(200, int(self.ax.bbox.width * 2))
+        times, mins, maxs = self.pyramid.envelope(max(t0, 0.0), t1, max_points)
+        if self._artist is not None:
+            self._artist.remove()
+        self._artist = self.ax.fill_between(times, mins, maxs, color=self.color,
+                                            alpha=self.alpha, linewidth=0)
+        self.ax.figure.canvas.draw_idle()
+
+
+def note_rectangles(starts, pitches, durations, height=0.8):
+    """(n, 4, 2) vertex array of note rectangles, built without a Python loop"""
+    starts = np.asarray(starts, dtype=float)
+    ends = starts + np.asarray(durations, dtype=float)
+    low = np.asarray(pitches, dtype=float) - height / 2
+    high = low + height
+    return np.stack([
+        np.column_stack([starts, low]),
+        np.column_stack([starts, high]),
+        np.column_stack([ends, high]),
+        np.column_stack([ends, low]),
+    ], axis=1)
+
+
+def draw_piano_roll(ax, midi_data, facecolor='#0F3460', edgecolor='#E94560'):
+    """Draw every non-drum note of a PrettyMIDI as a single PolyCollection"""
+    notes = np.array([(n.start, n.pitch, n.end - n.start)
+                      for inst in midi_data.instruments if not inst.is_drum
+                      for n in inst.notes], dtype=float).reshape(-1, 3)
+    if not len(notes):
+        return None
+    starts, pitches, durations = notes.T
+    collection = PolyCollection(note_rectangles(starts, pitches, durations),
+                                facecolors=facecolor, edgecolors=edgecolor, linewidths=0.5)
+    ax.add_collection(collection)
+    ax.set_ylim(pitches.min() - 2, pitches.max() + 2)
+    ax.set_xlim(0, (starts + durations).max())
+    return collection